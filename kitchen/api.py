@@ -0,0 +1,212 @@
+"""
+Read-only JSON API for the kitchen display clients.
+
+Rows are serialized straight from ``values()`` projections: only the
+columns named in ``?fields=`` are selected, many-to-many ids are
+aggregated in the database (or read from the ``DishCard`` of each dish)
+and no model instances are built. Lists take
+the filters of the matching HTML list view and are paginated by keyset
+with opaque ``cursor`` tokens; ``limit`` sets the page size.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.views import generic
+
+from kitchen.conditional import ConditionalGetMixin
+from kitchen.expressions import related_ids
+from kitchen.models import Dish, DishCard, DishType, Ingredient, Suggestion
+from kitchen.pagination import KeysetPaginator
+from kitchen.search import search, search_related
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiView(LoginRequiredMixin, ConditionalGetMixin, generic.View):
+    """
+    List (and, given ``pk``, detail) endpoint over ``model``.
+
+    ``fields`` maps each public field name to ``None`` for the model
+    column of that name or to the expression computing it.
+    """
+
+    model = None
+    fields = {}
+    ordering = ("id",)
+    search_param = None
+    search_relation = None
+    # the model ``search_param`` is matched as, when it isn't ``model``
+    search_model = None
+    page_size = 50
+    max_page_size = 200
+    raise_exception = True
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def filter_queryset(self, queryset):
+        query = self.request.GET.get(self.search_param or "", "").strip()
+        if not query:
+            return queryset
+        if self.search_relation:
+            return search_related(queryset, self.search_relation, query)
+        return search(queryset, query, self.search_model)
+
+    def get_field_names(self):
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.fields)
+        names = list(dict.fromkeys(
+            name.strip() for name in requested.split(",") if name.strip()
+        ))
+        if not names:
+            raise ApiError("fields is empty.")
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}")
+        return names
+
+    def get_page_size(self):
+        try:
+            size = int(self.request.GET.get("limit", self.page_size))
+        except ValueError:
+            raise ApiError("limit must be an integer.")
+        return max(1, min(size, self.max_page_size))
+
+    def project(self, queryset, names):
+        # The ordering columns are always selected for the cursor keys.
+        columns = [name.lstrip("-") for name in self.ordering]
+        columns += [name for name in names if self.fields[name] is None]
+        expressions = {
+            name: self.fields[name]
+            for name in names
+            if self.fields[name] is not None
+        }
+        return queryset.values(*dict.fromkeys(columns), **expressions)
+
+    def get(self, request, pk=None):
+        try:
+            names = self.get_field_names()
+            if pk is not None:
+                return self.detail(names, pk)
+            return self.list(names)
+        except ApiError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+
+    def detail(self, names, pk):
+        row = self.project(self.get_queryset(), names).filter(pk=pk).first()
+        if row is None:
+            return JsonResponse({"error": "Not found."}, status=404)
+        return JsonResponse({name: row[name] for name in names})
+
+    def list(self, names):
+        queryset = self.project(
+            self.filter_queryset(self.get_queryset()), names
+        )
+        paginator = KeysetPaginator(
+            queryset, self.ordering, self.get_page_size()
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except Http404:
+            raise ApiError("Invalid cursor.")
+        return JsonResponse({
+            "results": [
+                {name: row[name] for name in names} for row in page
+            ],
+            "next": self.page_url(page.next_cursor),
+            "previous": self.page_url(page.previous_cursor),
+        })
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params["cursor"] = cursor
+        return f"{self.request.path}?{params.urlencode()}"
+
+
+class DishApiView(ApiView):
+    model = DishCard
+    watermark_models = (Dish, DishType)
+    ordering = ("name", "dish_id")
+    search_param = "name"
+    search_model = Dish
+    fields = {
+        "id": F("dish_id"),
+        "name": None,
+        "description": None,
+        "price": None,
+        "dish_type_id": None,
+        "dish_type_name": None,
+        "ingredient_ids": None,
+        "cook_ids": None,
+    }
+
+
+class IngredientApiView(ApiView):
+    model = Ingredient
+    watermark_models = (Ingredient, Dish)
+    ordering = ("name", "id")
+    search_param = "name"
+    fields = {
+        "id": None,
+        "name": None,
+        "dish_count": None,
+    }
+
+
+class DishTypeApiView(ApiView):
+    model = DishType
+    watermark_models = (DishType, Dish)
+    ordering = ("name", "id")
+    search_param = "name"
+    fields = {
+        "id": None,
+        "name": None,
+        "dish_count": None,
+    }
+
+
+class CookApiView(ApiView):
+    model = get_user_model()
+    watermark_models = (Dish,)
+    ordering = ("username", "id")
+    search_param = "username"
+    fields = {
+        "id": None,
+        "username": None,
+        "first_name": None,
+        "last_name": None,
+        "years_of_experience": None,
+        "is_staff": None,
+        "dish_ids": related_ids(Dish.cooks.through, "cook", "dish"),
+    }
+
+
+class SuggestionApiView(ApiView):
+    model = Suggestion
+    watermark_models = (Suggestion, Dish)
+    ordering = ("approved", "-created_at", "id")
+    search_param = "dish_name"
+    search_relation = "dish"
+    fields = {
+        "id": None,
+        "text": None,
+        "approved": None,
+        "rejected": None,
+        "created_at": None,
+        "dish_id": None,
+        "dish_name": F("dish__name"),
+        "cook_id": None,
+        "cook_username": F("cook__username"),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(cook=self.request.user)
+        return queryset
@@ -1,6 +1,33 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def reinstall_search_indexes(sender, using, apps=None, **kwargs):
+    from django.db import connections
+
+    from kitchen.search import install_search_indexes
+
+    if apps is not None and apps.is_installed("kitchen"):
+        install_search_indexes(connections[using], apps)
 
 
 class KitchenConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kitchen'
+
+    def ready(self):
+        from kitchen import signals  # noqa: F401
+        from kitchen.metrics import registry
+        from kitchen.middleware import install_query_observer
+        from kitchen.pooling import pool_metrics
+        from kitchen.routing import install_alias_metrics
+
+        post_migrate.connect(reinstall_search_indexes, sender=self)
+        connection_created.connect(
+            install_query_observer, dispatch_uid="kitchen_query_observer"
+        )
+        connection_created.connect(
+            install_alias_metrics, dispatch_uid="kitchen_alias_metrics"
+        )
+        registry.register_collector(pool_metrics)
@@ -0,0 +1,143 @@
+"""
+Cook/dish assignments written straight to the ``Dish.cooks`` through table.
+
+``dish.cooks.add()`` and ``remove()`` read the existing rows first, so
+two clicks racing each other can both decide to insert. Each helper here
+is a single ``INSERT ... ON CONFLICT DO NOTHING`` (``INSERT OR IGNORE``
+on SQLite) or ``DELETE``: repeating a request changes nothing and the
+unique constraint settles races. Only the rows that really changed are
+reported through ``m2m_changed``, so fragment versions and conditional
+GET watermarks follow as they do for the related managers.
+"""
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+from django.db.models.constants import OnConflict
+from django.db.models.signals import m2m_changed
+
+from kitchen import cards, dish_counts
+from kitchen.models import Dish
+
+Through = Dish.cooks.through
+
+BULK_BATCH_SIZE = 500
+
+
+def _connection():
+    return connections[router.db_for_write(Through)]
+
+
+def _through_fields():
+    opts = Through._meta
+    return opts.get_field("dish"), opts.get_field("cook")
+
+
+def _insert_ignoring_conflicts(connection, rows_sql) -> str:
+    ops = connection.ops
+    fields = _through_fields()
+    columns = ", ".join(ops.quote_name(field.column) for field in fields)
+    return " ".join(filter(None, (
+        ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        ops.quote_name(Through._meta.db_table),
+        f"({columns})",
+        rows_sql,
+        ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None),
+    )))
+
+
+def _send_changed(action, cook, dish_ids, using):
+    m2m_changed.send(
+        sender=Through,
+        instance=cook,
+        action=action,
+        reverse=True,
+        model=Dish,
+        pk_set=set(dish_ids),
+        using=using,
+    )
+
+
+def assign_cook(cook, dish_id) -> bool:
+    """
+    Add ``cook`` to the dish with ``dish_id``. Returns whether a row was
+    inserted; a missing dish inserts nothing.
+    """
+    connection = _connection()
+    qn = connection.ops.quote_name
+    dish_pk = qn(Dish._meta.pk.column)
+    sql = _insert_ignoring_conflicts(
+        connection,
+        f"SELECT {dish_pk}, %s FROM {qn(Dish._meta.db_table)} "
+        f"WHERE {dish_pk} = %s",
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [cook.pk, dish_id])
+        created = cursor.rowcount > 0
+    if created:
+        _send_changed("post_add", cook, [dish_id], connection.alias)
+    return created
+
+
+def unassign_cook(cook, dish_id) -> bool:
+    """Remove ``cook`` from the dish; returns whether a row was deleted."""
+    connection = _connection()
+    qn = connection.ops.quote_name
+    dish_field, cook_field = _through_fields()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(Through._meta.db_table)} "
+            f"WHERE {qn(dish_field.column)} = %s "
+            f"AND {qn(cook_field.column)} = %s",
+            [dish_id, cook.pk],
+        )
+        deleted = cursor.rowcount > 0
+    if deleted:
+        _send_changed("post_remove", cook, [dish_id], connection.alias)
+    return deleted
+
+
+def bulk_assign(cooks, dishes, batch_size=BULK_BATCH_SIZE) -> int:
+    """
+    Assign every cook in ``cooks`` to every dish in ``dishes`` and return
+    the number of new assignments. Existing pairs are read with one query
+    and the rest inserted ``batch_size`` rows per statement.
+    """
+    cooks = list(cooks)
+    dish_ids = sorted({dish.pk for dish in dishes})
+    existing = set(
+        Through.objects.filter(
+            cook__in=cooks, dish_id__in=dish_ids
+        ).values_list("cook_id", "dish_id")
+    )
+    missing = [
+        (dish_id, cook.pk)
+        for cook in cooks
+        for dish_id in dish_ids
+        if (cook.pk, dish_id) not in existing
+    ]
+
+    connection = _connection()
+    created = 0
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                cursor.execute(
+                    _insert_ignoring_conflicts(
+                        connection,
+                        "VALUES " + ", ".join(["(%s, %s)"] * len(batch)),
+                    ),
+                    [value for row in batch for value in row],
+                )
+                created += cursor.rowcount
+
+    added = defaultdict(list)
+    for dish_id, cook_id in missing:
+        added[cook_id].append(dish_id)
+    with dish_counts.deferred(), cards.deferred():
+        for cook in cooks:
+            if added[cook.pk]:
+                _send_changed(
+                    "post_add", cook, added[cook.pk], connection.alias
+                )
+    return created
@@ -0,0 +1,253 @@
+"""
+Async versions of the kitchen read views.
+
+They are routed instead of the sync ones when
+``settings.KITCHEN_ASYNC_VIEWS`` is on and the project is served through
+``asgi.py`` (see the README). Querysets, context and templates come from
+``kitchen.views``; only the database access changes. Every query is
+awaited, so a worker keeps serving other clients while one request
+waits on Postgres, and the independent queries of a page (a list's
+COUNT and its rows, the dashboard counters and the session) are started
+together.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import InvalidPage
+from django.db import close_old_connections, connections
+from django.http import Http404, HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.translation import gettext as _
+from django.views import generic
+
+from kitchen import views
+from kitchen.buffered import visits
+from kitchen.conditional import add_validators, compute_validators
+from kitchen.counters import aread_counters
+from kitchen.pagination import PAGINATION_CURSOR
+from kitchen.routing import settled_reads
+
+
+def _isolated(func):
+    def run():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+
+    return run
+
+
+def _in_transaction():
+    return any(
+        conn.in_atomic_block
+        for conn in connections.all(initialized_only=True)
+    )
+
+
+async def gather_queries(*funcs):
+    """
+    Run the blocking ORM calls ``funcs`` concurrently and return their
+    results in order.
+
+    Each one gets its own executor thread and connection, so the queries
+    overlap in the database; size the connection limit for that. Inside
+    a transaction, whose uncommitted rows other connections can't see,
+    or with ``settings.KITCHEN_ASYNC_PARALLEL_QUERIES`` off, they run one
+    after another on the request's database thread like any async ORM
+    call.
+    """
+    if (
+        settings.KITCHEN_ASYNC_PARALLEL_QUERIES
+        and not await sync_to_async(_in_transaction)()
+    ):
+        calls = [
+            sync_to_async(_isolated(func), thread_sensitive=False)
+            for func in funcs
+        ]
+    else:
+        calls = [sync_to_async(func) for func in funcs]
+    return await asyncio.gather(*(call() for call in calls))
+
+
+@login_required
+async def index(request: HttpRequest) -> HttpResponse:
+    # Resolved already by login_required; pinning it keeps the template
+    # context processors from loading the user a second time.
+    request.user = await request.auser()
+    await visits.aincrement(request.user.pk)
+    counters, num_visits = await asyncio.gather(
+        aread_counters(),
+        visits.avalue(request.user.pk),
+    )
+
+    return TemplateResponse(
+        request=request,
+        template="kitchen/index.html",
+        context={
+            "num_dishes": counters["dishes"],
+            "num_ingredients": counters["ingredients"],
+            "num_dish_types": counters["dish_types"],
+            "num_cooks": counters["cooks"],
+            "num_visits": num_visits
+        }
+    )
+
+
+class AsyncReadMixin:
+    """
+    Async ``dispatch`` for a read view built from ``LoginRequiredMixin``
+    and ``ConditionalGetMixin``, whose sync ``dispatch`` would touch
+    ``request.user`` and the cache from the event loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        if request.method not in ("GET", "HEAD"):
+            return await generic.View.dispatch(self, request, *args, **kwargs)
+
+        etag, last_modified = await sync_to_async(compute_validators)(
+            request, self.get_watermark_models()
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            with settled_reads(last_modified) as on_primary:
+                response = await generic.View.dispatch(
+                    self, request, *args, **kwargs
+                )
+                if on_primary and hasattr(response, "render"):
+                    # Templates render after dispatch, cached cards too.
+                    await sync_to_async(response.render)()
+            if response.status_code != 200:
+                return response
+
+        return add_validators(response, etag, last_modified)
+
+
+class AsyncListMixin(AsyncReadMixin):
+    """
+    Fetch the page rows and the paginator count at the same time, then
+    build the context from the already evaluated page.
+    """
+
+    page_state = None
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size and self.get_pagination_mode() != PAGINATION_CURSOR:
+            self.page_state = await self.apaginate_queryset(
+                self.object_list, page_size
+            )
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_state is not None:
+            return self.page_state
+        return super().paginate_queryset(queryset, page_size)
+
+    async def apaginate_queryset(self, queryset, page_size):
+        queryset = self.sort_queryset(queryset)
+        orphans = self.get_paginate_orphans()
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=orphans,
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        page = (
+            self.kwargs.get(self.page_kwarg)
+            or self.request.GET.get(self.page_kwarg)
+            or 1
+        )
+        try:
+            number = int(page)
+        except ValueError:
+            if page != "last":
+                raise Http404(
+                    _("Page is not “last”, nor can it be converted to an "
+                      "int.")
+                )
+            await sync_to_async(lambda: paginator.count)()
+            number = paginator.num_pages
+
+        bottom = (max(number, 1) - 1) * page_size
+        # Enough rows to absorb orphans, or to tell whether a page follows
+        # an inexact count; trimmed once the count is known.
+        rows_query = queryset[bottom:bottom + page_size + max(orphans, 1)]
+        _count, rows = await gather_queries(
+            lambda: paginator.count, lambda: list(rows_query)
+        )
+        probed = getattr(paginator, "is_probed", None)
+        try:
+            number = paginator.validate_number(number)
+            if probed and probed(number):
+                page = paginator.probed_page(number, rows)
+                return (
+                    paginator, page, page.object_list, page.has_other_pages()
+                )
+        except InvalidPage as error:
+            raise Http404(
+                _("Invalid page (%(page_number)s): %(message)s")
+                % {"page_number": page, "message": str(error)}
+            )
+
+        top = bottom + page_size
+        if top + orphans >= paginator.count:
+            top = paginator.count
+        page = paginator._get_page(rows[:top - bottom], number, paginator)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AsyncDetailMixin(AsyncReadMixin):
+    async def get(self, request, *args, **kwargs):
+        self.object = await sync_to_async(self.get_object)()
+        context = await sync_to_async(self.get_context_data)(
+            object=self.object
+        )
+        return self.render_to_response(context)
+
+
+class DishListView(AsyncListMixin, views.DishListView):
+    pass
+
+
+class DishDetailView(AsyncDetailMixin, views.DishDetailView):
+    pass
+
+
+class IngredientListView(AsyncListMixin, views.IngredientListView):
+    pass
+
+
+class DishTypeListView(AsyncListMixin, views.DishTypeListView):
+    pass
+
+
+class DishTypeDetailView(AsyncDetailMixin, views.DishTypeDetailView):
+    pass
+
+
+class CookListView(AsyncListMixin, views.CookListView):
+    pass
+
+
+class CookDetailView(AsyncDetailMixin, views.CookDetailView):
+    pass
+
+
+class SuggestionListView(AsyncListMixin, views.SuggestionListView):
+    pass
+
+
+class SuggestionDetailView(AsyncDetailMixin, views.SuggestionDetailView):
+    pass
@@ -0,0 +1,496 @@
+"""
+HTTP benchmarks for every kitchen route, run against a seeded database.
+
+Each ``Case`` is one request. In process, requests go through the Django
+test client: latency percentiles come from repeated timed requests, the
+query count from the query observer used by ``PerformanceMiddleware``
+and the peak allocation from ``tracemalloc`` on one extra request (so
+tracing doesn't slow the timed ones). Requests that write run inside a
+transaction that is rolled back, so the data stays the same between
+runs. Against a running server (``base_url``) only latency is measured
+and writing cases are skipped.
+
+Results are compared against a stored baseline; a case regresses when
+a metric grows past its threshold.
+"""
+import json
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+from math import ceil
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, reverse
+
+from kitchen.middleware import RequestTimings, observe_queries
+from kitchen.models import Dish, DishType, Ingredient, Suggestion
+
+PERCENTILES = (50, 95, 99)
+DEFAULT_THRESHOLDS = {
+    # relative growth allowed before a case counts as regressed
+    "latency": 0.5,
+    "memory": 0.25,
+    # absolute number of extra queries allowed
+    "queries": 0,
+}
+# latency changes smaller than this are noise, whatever the ratio
+LATENCY_FLOOR_MS = 2.0
+# the streamed exports serialize every row and their median wanders by
+# a few garbage collections between runs
+EXPORT_LATENCY_FLOOR_MS = 25.0
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Case:
+    def __init__(
+        self, name, url_name, args=(), params=None, method="GET",
+        data=None, writes=None, status=200, latency_floor_ms=None,
+    ):
+        self.name = name
+        self.url_name = url_name
+        self.args = args
+        self.params = params or {}
+        self.method = method
+        self.data = data or {}
+        self.writes = method != "GET" if writes is None else writes
+        self.status = status
+        self.latency_floor_ms = latency_floor_ms
+
+    @property
+    def url(self):
+        return reverse(f"kitchen:{self.url_name}", args=self.args)
+
+
+class Sample:
+    """The existing rows the cases point at."""
+
+    def __init__(self):
+        self.dish = Dish.objects.order_by("pk").first()
+        self.dish_type = DishType.objects.order_by("pk").first()
+        self.ingredient = Ingredient.objects.order_by("pk").first()
+        self.cook = (
+            get_user_model().objects.filter(is_staff=False)
+            .order_by("pk").first()
+        )
+        self.suggestion = Suggestion.objects.order_by("pk").first()
+        if None in (
+            self.dish, self.dish_type, self.ingredient, self.cook,
+            self.suggestion,
+        ):
+            raise BenchmarkError(
+                "The database needs dishes, cooks and suggestions; "
+                "run seed_kitchen first."
+            )
+
+
+def build_cases(sample):
+    dish = sample.dish.pk
+    dish_type = sample.dish_type.pk
+    ingredient = sample.ingredient.pk
+    cook = sample.cook.pk
+    suggestion = sample.suggestion.pk
+    dish_data = {
+        "name": "Benchmark dish",
+        "description": "Benchmark",
+        "price": "9.99",
+        "dish_type": dish_type,
+        "ingredients": [ingredient],
+        "cooks": [cook],
+    }
+    password = {
+        "password1": "Plum-Lantern-83!", "password2": "Plum-Lantern-83!"
+    }
+
+    cases = [
+        Case("index", "index"),
+        Case("metrics", "metrics"),
+        Case(
+            "export-dishes-csv", "export", args=["dishes", "csv"],
+            latency_floor_ms=EXPORT_LATENCY_FLOOR_MS,
+        ),
+        Case(
+            "export-suggestions-jsonl", "export",
+            args=["suggestions", "jsonl"],
+            latency_floor_ms=EXPORT_LATENCY_FLOOR_MS,
+        ),
+        Case("dish-create-form", "dish-create"),
+        Case(
+            "dish-create", "dish-create", method="POST", data=dish_data,
+            status=302,
+        ),
+        Case(
+            "dish-update", "dish-update", args=[dish], method="POST",
+            data=dish_data, status=302,
+        ),
+        Case(
+            "dish-delete", "dish-delete", args=[dish], method="POST",
+            status=302,
+        ),
+        Case(
+            "dish-toggle-button", "dish-toggle-button", args=[dish],
+            writes=True, status=302,
+        ),
+        Case(
+            "dish-assign", "dish-assign", args=[dish], method="POST",
+            status=302,
+        ),
+        Case(
+            "dish-unassign", "dish-unassign", args=[dish], method="POST",
+            status=302,
+        ),
+        Case(
+            "dish-cook-assign", "dish-cook-assign", method="POST",
+            data={"dishes": [dish], "cooks": [cook]}, status=302,
+        ),
+        Case(
+            "ingredient-create", "ingredient-create", method="POST",
+            data={"name": "Benchmark"}, status=302,
+        ),
+        Case(
+            "ingredient-update", "ingredient-update", args=[ingredient],
+            method="POST", data={"name": "Benchmark"}, status=302,
+        ),
+        Case(
+            "ingredient-delete", "ingredient-delete", args=[ingredient],
+            method="POST", status=302,
+        ),
+        Case(
+            "dish-type-create", "dish-type-create", method="POST",
+            data={"name": "Benchmark"}, status=302,
+        ),
+        Case(
+            "dish-type-update", "dish-type-update", args=[dish_type],
+            method="POST", data={"name": "Benchmark"}, status=302,
+        ),
+        Case(
+            "dish-type-delete", "dish-type-delete", args=[dish_type],
+            method="POST", status=302,
+        ),
+        Case(
+            "cook-create", "cook-create", method="POST",
+            data={
+                "username": "new-line-cook",
+                "years_of_experience": 1,
+                **password,
+            },
+            status=302,
+        ),
+        Case(
+            "cook-update", "cook-update", args=[cook], method="POST",
+            data={
+                "username": sample.cook.username,
+                "years_of_experience": 3,
+            },
+            status=302,
+        ),
+        Case(
+            "cook-password-reset", "cook-password-reset", args=[cook],
+            method="POST", data=password, status=302,
+        ),
+        Case(
+            "cook-delete", "cook-delete", args=[cook], method="POST",
+            status=302,
+        ),
+        Case(
+            "suggestion-create", "suggestion-create", args=[dish],
+            method="POST", data={"text": "Benchmark"}, status=302,
+        ),
+        Case(
+            "suggestion-approve", "suggestion-approve", args=[suggestion],
+            method="POST", status=302,
+        ),
+        Case(
+            "suggestion-reject", "suggestion-reject", args=[suggestion],
+            method="POST", status=302,
+        ),
+        Case(
+            "dish-autocomplete", "dish-autocomplete",
+            params={"term": sample.dish.name[:2]},
+        ),
+        Case(
+            "ingredient-autocomplete", "ingredient-autocomplete",
+            params={"term": sample.ingredient.name[:2]},
+        ),
+        Case(
+            "cook-autocomplete", "cook-autocomplete",
+            params={"term": sample.cook.username[:2]},
+        ),
+        Case("suggestion-moderation", "suggestion-moderation"),
+        Case(
+            "suggestion-moderation-search", "suggestion-moderation",
+            params={"cook": sample.cook.username[:4]},
+        ),
+        Case(
+            "suggestion-moderation-approve", "suggestion-moderation",
+            method="POST",
+            data={"action": "approve", "suggestions": [suggestion]},
+            status=302,
+        ),
+    ]
+    cases.append(Case(
+        "dish-list-facets", "dish-list",
+        params={
+            "dish_type": dish_type, "ingredient": ingredient,
+            "min_price": 1, "max_price": 100,
+        },
+    ))
+    # the lists sortable by their stored dish counts
+    for url_name in ("ingredient", "dish-type", "cook"):
+        cases.append(Case(
+            f"{url_name}-list-popular", f"{url_name}-list",
+            params={"sort": "popular"},
+        ))
+    # searches use the prefix of an existing name so they find rows
+    for url_name, search_param, term, pk in (
+        ("dish", "name", sample.dish.name, dish),
+        ("ingredient", "name", sample.ingredient.name, None),
+        ("dish-type", "name", sample.dish_type.name, dish_type),
+        ("cook", "username", sample.cook.username, cook),
+        ("suggestion", "dish_name", sample.dish.name, suggestion),
+    ):
+        term = term[:4]
+        cases += [
+            Case(f"{url_name}-list", f"{url_name}-list"),
+            Case(
+                f"{url_name}-list-search", f"{url_name}-list",
+                params={search_param: term},
+            ),
+            Case(
+                f"{url_name}-list-last-page", f"{url_name}-list",
+                params={"page": "last"},
+            ),
+            Case(
+                f"api-{url_name}-list", f"api-{url_name}-list",
+                params={search_param: term},
+            ),
+            Case(
+                f"api-{url_name}-detail", f"api-{url_name}-detail",
+                args=[pk or ingredient],
+            ),
+        ]
+        if pk is not None:
+            cases.append(
+                Case(f"{url_name}-detail", f"{url_name}-detail", args=[pk])
+            )
+    return cases
+
+
+def url_names(patterns=None):
+    """Names of every route in ``kitchen.urls``."""
+    if patterns is None:
+        from kitchen import urls
+        patterns = urls.urlpatterns
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= url_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class Runner:
+    """Runs cases through the test client as ``user``."""
+
+    def __init__(self, user, iterations=20, warmup=1):
+        self.user = user
+        self.iterations = iterations
+        self.warmup = warmup
+        self.client = Client()
+        self.client.force_login(user)
+
+    def request(self, case):
+        method = getattr(self.client, case.method.lower())
+        if case.method == "GET":
+            response = method(case.url, case.params)
+        else:
+            response = method(case.url, case.data)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    def measure(self, case):
+        timings = RequestTimings()
+        with observe_queries(timings):
+            status = self.call(case)
+        if status != case.status:
+            raise BenchmarkError(
+                f"{case.name}: expected status {case.status}, got {status}"
+            )
+        for _ in range(self.warmup):
+            self.call(case)
+
+        latencies = []
+        for _ in range(self.iterations):
+            start = perf_counter()
+            self.call(case)
+            latencies.append((perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        try:
+            self.call(case)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return summarize(
+            latencies, queries=timings.db_queries, peak_kib=peak // 1024
+        )
+
+    def call(self, case):
+        if not case.writes:
+            return self.request(case)
+        with transaction.atomic():
+            status = self.request(case)
+            transaction.set_rollback(True)
+        return status
+
+    def run(self, cases):
+        # The test client talks to "testserver".
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            return {case.name: self.measure(case) for case in cases}
+
+
+class ServerRunner(Runner):
+    """Runs the read-only cases against a server at ``base_url``."""
+
+    def __init__(self, base_url, user, iterations=20, warmup=1):
+        super().__init__(user, iterations, warmup)
+        self.base_url = base_url.rstrip("/")
+        self.cookie = "; ".join(
+            f"{name}={morsel.value}"
+            for name, morsel in self.client.cookies.items()
+        )
+
+    def request(self, case):
+        url = self.base_url + case.url
+        if case.params:
+            url += "?" + urllib.parse.urlencode(case.params)
+        request = urllib.request.Request(url, headers={"Cookie": self.cookie})
+        opener = urllib.request.build_opener(_NoRedirect)
+        try:
+            with opener.open(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    def measure(self, case):
+        status = self.request(case)
+        if status != case.status:
+            raise BenchmarkError(
+                f"{case.name}: expected status {case.status}, got {status}"
+            )
+        for _ in range(self.warmup):
+            self.request(case)
+        latencies = []
+        for _ in range(self.iterations):
+            start = perf_counter()
+            self.request(case)
+            latencies.append((perf_counter() - start) * 1000)
+        return summarize(latencies, queries=None, peak_kib=None)
+
+    def run(self, cases):
+        return {
+            case.name: self.measure(case)
+            for case in cases
+            if not case.writes
+        }
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def summarize(latencies, queries, peak_kib):
+    result = {
+        f"p{percent}_ms": round(percentile(latencies, percent), 3)
+        for percent in PERCENTILES
+    }
+    result["queries"] = queries
+    result["peak_kib"] = peak_kib
+    return result
+
+
+def compare(results, baseline, thresholds=None,
+            latency_floor_ms=LATENCY_FLOOR_MS, floors=None):
+    """
+    Regression messages for ``results`` against ``baseline``; metrics
+    missing on either side (server runs, new cases) are skipped.
+    ``floors`` maps case names to a wider latency floor than
+    ``latency_floor_ms``.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    floors = floors or {}
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        floor = max(latency_floor_ms, floors.get(name, 0))
+        checks = (
+            # the median; the tail is too noisy to gate on
+            (
+                "p50_ms",
+                previous["p50_ms"] * (1 + thresholds["latency"]) + floor,
+            ),
+            ("queries", _plus(previous.get("queries"), thresholds["queries"])),
+            (
+                "peak_kib",
+                _times(previous.get("peak_kib"), 1 + thresholds["memory"]),
+            ),
+        )
+        for metric, limit in checks:
+            value = current.get(metric)
+            if value is None or limit is None:
+                continue
+            if value > limit:
+                regressions.append(
+                    f"{name}: {metric} {value} > {round(limit, 3)} "
+                    f"(baseline {previous[metric]})"
+                )
+    return regressions
+
+
+def _plus(value, extra):
+    return None if value is None else value + extra
+
+
+def _times(value, factor):
+    return None if value is None else value * factor
+
+
+def row_counts():
+    """Table sizes saved with the results; timings only compare at equal
+    sizes."""
+    return {
+        model._meta.model_name: model._default_manager.count()
+        for model in (Dish, DishType, Ingredient, get_user_model(), Suggestion)
+    }
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as stream:
+        return json.load(stream)
+
+
+def save_results(path, results, **meta):
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump({"meta": meta, "cases": results}, stream, indent=2,
+                  sort_keys=True)
+        stream.write("\n")
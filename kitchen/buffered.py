@@ -0,0 +1,139 @@
+"""
+Counters buffered in memory and written in batches.
+
+A hit on a busy page shouldn't cost a write. ``BufferedCounter.add``
+only bumps an in-process delta. Once ``flush_size`` increments are
+pending, or ``flush_interval`` seconds passed since the last flush, the
+deltas of every key go out in one upsert that adds them to the stored
+values. Each worker process has its own buffer; what is shown adds that
+worker's pending delta to the stored value, and a worker that dies
+without exiting cleanly loses at most one buffer of increments.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+
+from kitchen.models import VisitCount
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedCounter:
+    """
+    Counts per key of ``model``: its primary key is a foreign key to the
+    counted object and ``value`` holds the total.
+    """
+
+    def __init__(self, model, flush_size_setting, flush_interval_setting):
+        self.model = model
+        self.flush_size_setting = flush_size_setting
+        self.flush_interval_setting = flush_interval_setting
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_total = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, key, delta=1) -> bool:
+        """Buffer ``delta`` for ``key``; returns whether a flush is due."""
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + delta
+            self._pending_total += delta
+            return (
+                self._pending_total
+                >= getattr(settings, self.flush_size_setting)
+                or time.monotonic() - self._last_flush
+                >= getattr(settings, self.flush_interval_setting)
+            )
+
+    def pending(self, key) -> int:
+        return self._pending.get(key, 0)
+
+    def increment(self, key, delta=1):
+        if self.add(key, delta):
+            self.flush()
+
+    async def aincrement(self, key, delta=1):
+        if self.add(key, delta):
+            await sync_to_async(self.flush)()
+
+    def value(self, key) -> int:
+        stored = self.model._default_manager.filter(pk=key).values_list(
+            "value", flat=True
+        ).first()
+        return (stored or 0) + self.pending(key)
+
+    async def avalue(self, key) -> int:
+        stored = await self.model._default_manager.filter(
+            pk=key
+        ).values_list("value", flat=True).afirst()
+        return (stored or 0) + self.pending(key)
+
+    def discard(self):
+        """Drop the pending increments (tests)."""
+        with self._lock:
+            self._pending, self._pending_total = {}, 0
+
+    def flush(self):
+        """Write the pending deltas in one statement."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_total = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            self._write(pending)
+        except DatabaseError:
+            logger.exception("Could not flush %s", self.model.__name__)
+            with self._lock:
+                for key, delta in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + delta
+                    self._pending_total += delta
+
+    def _write(self, pending):
+        opts = self.model._meta
+        target = opts.pk.remote_field.model
+        connection = connections[router.db_for_write(self.model)]
+        with transaction.atomic(using=connection.alias):
+            # Keys deleted since they were counted would fail the
+            # foreign key.
+            keys = set(
+                target._default_manager.using(connection.alias)
+                .filter(pk__in=pending)
+                .values_list("pk", flat=True)
+            )
+            rows = [(key, pending[key]) for key in pending if key in keys]
+            if not rows:
+                return
+            qn = connection.ops.quote_name
+            table = qn(opts.db_table)
+            key_column = qn(opts.pk.column)
+            value_column = qn(opts.get_field("value").column)
+            placeholders = ", ".join(["(%s, %s)"] * len(rows))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} ({key_column}, {value_column}) "
+                    f"VALUES {placeholders} "
+                    f"ON CONFLICT ({key_column}) DO UPDATE SET "
+                    f"{value_column} = {table}.{value_column} "
+                    f"+ EXCLUDED.{value_column}",
+                    [value for row in rows for value in row],
+                )
+
+
+visits = BufferedCounter(
+    VisitCount, "KITCHEN_VISITS_FLUSH_SIZE", "KITCHEN_VISITS_FLUSH_SECONDS"
+)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        visits.flush()
+    except Exception:
+        logger.exception("Could not flush visits on exit")
@@ -0,0 +1,42 @@
+"""
+Catch-up for writes that bypass model signals.
+
+``bulk_create``, ``QuerySet.update`` and raw SQL skip the receivers in
+``kitchen.signals``. Code writing that way calls ``after_bulk_write``
+with the models it touched once it is done, so the denormalized state
+those receivers normally maintain is brought up to date.
+"""
+from kitchen import cards, conditional, dish_counts
+from kitchen.counters import (
+    counter_for_model,
+    increment,
+    reconcile_counters,
+)
+
+
+def after_bulk_write(*models, created=None, dish_ids=None):
+    """
+    Without more to go on, every counter, dish count and card the
+    ``models`` feed is recounted or rebuilt. Writers that only inserted
+    rows say so: ``created`` maps each model to how many rows it got,
+    and the dashboard counters move by that; ``dish_ids`` are the dishes
+    inserted, links included, and only their counts and cards are added.
+    """
+    if created is not None:
+        for model, count in created.items():
+            name = counter_for_model(model)
+            if name and count:
+                increment(name, count)
+    # Rows of models without a counter can't have moved one.
+    elif not models or any(counter_for_model(model) for model in models):
+        reconcile_counters()
+    if dish_ids is not None:
+        dish_counts.count_new_dishes(dish_ids)
+        cards.refresh(dish_ids)
+    else:
+        if not models or set(models) & set(dish_counts.dish_models()):
+            dish_counts.reconcile()
+        if not models or set(models) & set(cards.card_models()):
+            cards.rebuild()
+    if models:
+        conditional.touch(*models)
@@ -0,0 +1,170 @@
+"""
+The ``DishCard`` read model behind the dish list and the dish API.
+
+A dish card holds everything those pages show of a dish, the dish type
+name and the linked ingredients and cooks included, so a page of dishes
+is one query on ``kitchen_dishcard`` without joins. The receivers in
+``kitchen.signals`` call ``refresh`` with the dishes whose card changed;
+it rebuilds just those rows from the source tables in one upsert.
+An edited dish or a renamed dish type only rewrites its own columns on
+the cards. Bulk imports and seeding add the cards of the dishes they
+inserted through ``kitchen.bulk.after_bulk_write``; other bulk writes
+rebuild every card there, and so does ``manage.py rebuild_dish_cards``.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.text import Truncator
+
+from kitchen.models import Dish, DishCard, DishType, Ingredient
+
+REBUILD_BATCH_SIZE = 1000
+
+# names shown on a card per relation; the ids are all kept
+SHOWN_NAMES = 2
+
+EXCERPT_WORDS = 10
+
+_deferred = threading.local()
+
+
+def card_models():
+    """The models whose rows a dish card is built from."""
+    return (
+        Dish,
+        Dish.ingredients.through,
+        Dish.cooks.through,
+        DishType,
+        Ingredient,
+        get_user_model(),
+    )
+
+
+def shown_field(model):
+    """The field a linked ingredient or cook is shown by on a card."""
+    return "username" if model is get_user_model() else "name"
+
+
+def _linked(through, target, name, dishes):
+    linked = defaultdict(list)
+    for dish_id, pk, label in (
+        through.objects.filter(dish__in=dishes)
+        .order_by("dish_id", f"{target}__{name}", f"{target}_id")
+        .values_list("dish_id", f"{target}_id", f"{target}__{name}")
+    ):
+        linked[dish_id].append((pk, label))
+    return linked
+
+
+def build_cards(dish_ids) -> list:
+    """Unsaved cards for the dishes of ``dish_ids`` that exist."""
+    dishes = list(
+        Dish.objects.filter(pk__in=dish_ids).select_related("dish_type")
+    )
+    ingredients = _linked(
+        Dish.ingredients.through, "ingredient", shown_field(Ingredient),
+        dishes,
+    )
+    cooks = _linked(
+        Dish.cooks.through, "cook", shown_field(get_user_model()), dishes
+    )
+    cards = []
+    for dish in dishes:
+        dish_ingredients = ingredients[dish.pk]
+        dish_cooks = cooks[dish.pk]
+        cards.append(DishCard(
+            dish_id=dish.pk,
+            name=dish.name,
+            description=dish.description,
+            excerpt=Truncator(dish.description).words(EXCERPT_WORDS),
+            price=dish.price,
+            dish_type_id=dish.dish_type_id,
+            dish_type_name=dish.dish_type.name,
+            ingredient_ids=sorted(pk for pk, _name in dish_ingredients),
+            ingredient_names=[
+                name for _pk, name in dish_ingredients[:SHOWN_NAMES]
+            ],
+            cook_ids=sorted(pk for pk, _name in dish_cooks),
+            cook_names=[name for _pk, name in dish_cooks[:SHOWN_NAMES]],
+        ))
+    return cards
+
+
+def _write(dish_ids):
+    dish_ids = sorted(set(dish_ids))
+    for start in range(0, len(dish_ids), REBUILD_BATCH_SIZE):
+        cards = build_cards(dish_ids[start:start + REBUILD_BATCH_SIZE])
+        DishCard.objects.bulk_create(
+            cards,
+            update_conflicts=True,
+            unique_fields=["dish"],
+            update_fields=[
+                field.name
+                for field in DishCard._meta.concrete_fields
+                if not field.primary_key
+            ],
+        )
+
+
+def refresh(dish_ids):
+    """Rebuild the cards of ``dish_ids`` from the source tables."""
+    dish_ids = [pk for pk in dish_ids if pk is not None]
+    if not dish_ids:
+        return
+    pending = getattr(_deferred, "pending", None)
+    if pending is None:
+        _write(dish_ids)
+    else:
+        pending.update(dish_ids)
+
+
+@contextmanager
+def deferred():
+    """
+    Hold the refreshes asked for inside the block and rebuild every
+    card involved once when it exits.
+    """
+    if getattr(_deferred, "pending", None) is not None:
+        yield
+        return
+    _deferred.pending = pending = set()
+    try:
+        yield
+    finally:
+        _deferred.pending = None
+    if pending:
+        _write(pending)
+
+
+def update_dish(dish):
+    """
+    Copy the fields of a saved ``dish`` onto its card in one ``UPDATE``;
+    its ingredients and cooks are left as they are.
+    """
+    updated = DishCard.objects.filter(dish=dish).update(
+        name=dish.name,
+        description=dish.description,
+        excerpt=Truncator(dish.description).words(EXCERPT_WORDS),
+        price=dish.price,
+        dish_type_id=dish.dish_type_id,
+        dish_type_name=dish.dish_type.name,
+    )
+    if not updated:
+        refresh([dish.pk])
+
+
+def rename_dish_type(dish_type):
+    DishCard.objects.filter(dish_type=dish_type).update(
+        dish_type_name=dish_type.name
+    )
+
+
+def rebuild():
+    """Rebuild every card; returns how many dishes have one."""
+    with transaction.atomic():
+        dish_ids = list(Dish.objects.values_list("pk", flat=True))
+        _write(dish_ids)
+    return len(dish_ids)
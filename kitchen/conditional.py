@@ -0,0 +1,117 @@
+"""
+Conditional GET support for the kitchen read views.
+
+Every tracked model has a "last changed" watermark in the cache, moved
+forward by the receivers in ``kitchen.signals``. A view's validators are
+derived from the watermarks of the models it renders, the current user,
+the CSRF cookie and the full path, so an unchanged page is answered with
+304 Not Modified before any queryset runs or any template renders.
+Watermarks move once the change has committed, and a page rendered
+shortly after reads from the primary (``routing.settled_reads``), so a
+validator is never sent with data older than it.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from kitchen.routing import settled_reads
+
+
+def _key(model) -> str:
+    return f"kitchen:watermark:{model._meta.label_lower}"
+
+
+def touch(*models):
+    """Record that rows of ``models`` changed, once that has committed."""
+    transaction.on_commit(lambda: cache.set_many(
+        dict.fromkeys(map(_key, models), time.time()), timeout=None
+    ))
+
+
+def get_watermarks(models) -> list:
+    """
+    Watermarks for ``models`` in order. A missing watermark is reset to
+    now, which can only cause a spurious full response, never a stale 304.
+    """
+    keys = [_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        cache.set_many({key: now for key in missing}, timeout=None)
+        found.update(dict.fromkeys(missing, now))
+    return [found[key] for key in keys]
+
+
+def compute_validators(request, models):
+    """Return ``(etag, last_modified_timestamp)`` for ``request``."""
+    watermarks = get_watermarks(models)
+    # Pages embed the CSRF token; make sure the cookie secret exists now
+    # rather than being generated during rendering.
+    get_token(request)
+    parts = [
+        settings.KITCHEN_RELEASE,
+        str(request.user.pk),
+        request.META.get("CSRF_COOKIE", ""),
+        request.get_full_path(),
+        *(repr(watermark) for watermark in watermarks),
+    ]
+    digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()
+    return f'"{digest}"', int(max(watermarks))
+
+
+def add_validators(response, etag, last_modified):
+    response.headers.setdefault("ETag", etag)
+    response.headers.setdefault("Last-Modified", http_date(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET/HEAD with 304 when nothing the page shows has changed.
+
+    Put it after the access mixins so permissions are checked first, and
+    list every model the template renders in ``watermark_models``. The
+    user model is always included since the sidebar shows the current
+    cook.
+    """
+
+    watermark_models = ()
+    # read-only pages, served from a replica when there is one
+    use_replica = True
+
+    def get_watermark_models(self):
+        user_model = get_user_model()
+        models = list(self.watermark_models)
+        if user_model not in models:
+            models.append(user_model)
+        return models
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = compute_validators(
+            request, self.get_watermark_models()
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            with settled_reads(last_modified) as on_primary:
+                response = super().dispatch(request, *args, **kwargs)
+                if on_primary and hasattr(response, "render"):
+                    # Templates render after dispatch, cached cards too.
+                    response.render()
+            if response.status_code != 200:
+                return response
+
+        return add_validators(response, etag, last_modified)
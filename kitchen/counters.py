@@ -0,0 +1,93 @@
+"""
+Denormalized row counts for the home page dashboard.
+
+Each counter is one ``DashboardCounter`` row kept current by the
+post_save/post_delete receivers in ``kitchen.signals``; the dashboard
+reads all of them with a single query. ``reconcile_counters`` recounts
+the real tables and repairs any drift (bulk operations such as
+``bulk_create`` and ``QuerySet.delete`` on raw SQL bypass signals).
+"""
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+# counter name -> label of the model it counts
+COUNTED_MODELS = {
+    "dishes": "kitchen.Dish",
+    "ingredients": "kitchen.Ingredient",
+    "dish_types": "kitchen.DishType",
+    "cooks": settings.AUTH_USER_MODEL,
+}
+
+_COUNTER_BY_LABEL = {
+    label.lower(): name for name, label in COUNTED_MODELS.items()
+}
+
+
+def counter_for_model(model):
+    return _COUNTER_BY_LABEL.get(model._meta.label_lower)
+
+
+def _counter_model():
+    return apps.get_model("kitchen", "DashboardCounter")
+
+
+def _recount(name) -> int:
+    model = apps.get_model(COUNTED_MODELS[name])
+    value = model._default_manager.count()
+    _counter_model().objects.update_or_create(
+        name=name, defaults={"value": value}
+    )
+    return value
+
+
+def increment(name, delta=1):
+    updated = _counter_model().objects.filter(name=name).update(
+        value=F("value") + delta
+    )
+    if not updated:
+        _recount(name)
+
+
+def read_counters() -> dict:
+    counters = dict(_counter_model().objects.values_list("name", "value"))
+    for name in COUNTED_MODELS.keys() - counters.keys():
+        counters[name] = _recount(name)
+    return counters
+
+
+async def aread_counters() -> dict:
+    counters = {
+        name: value
+        async for name, value in _counter_model().objects.values_list(
+            "name", "value"
+        )
+    }
+    for name in COUNTED_MODELS.keys() - counters.keys():
+        counters[name] = await sync_to_async(_recount)(name)
+    return counters
+
+
+def reconcile_counters(dry_run=False) -> dict:
+    """
+    Recount every counted table and return ``{name: (stored, actual)}``
+    for the counters that had drifted.
+    """
+    drift = {}
+    with transaction.atomic():
+        stored = dict(
+            _counter_model().objects.select_for_update().values_list(
+                "name", "value"
+            )
+        )
+        for name, label in COUNTED_MODELS.items():
+            actual = apps.get_model(label)._default_manager.count()
+            if stored.get(name) != actual:
+                drift[name] = (stored.get(name), actual)
+                if not dry_run:
+                    _counter_model().objects.update_or_create(
+                        name=name, defaults={"value": actual}
+                    )
+    return drift
@@ -0,0 +1,187 @@
+"""
+Stored number of dishes per dish type, ingredient and cook.
+
+The list pages show how many dishes use each row and can sort by it.
+Instead of a ``COUNT`` over the dish tables on every page, each of those
+models keeps a ``dish_count`` column. The receivers in ``kitchen.signals``
+adjust it by what changed: ``adjust`` for a dish's type and for links
+reported through ``m2m_changed``, ``adjust_linked`` for links about to be
+deleted without one. Every adjustment is a single ``UPDATE`` adding a
+delta, so concurrent writers don't overwrite each other's counts.
+
+Writes that skip the signals (``bulk_create``, raw SQL) go through
+``kitchen.bulk.after_bulk_write``: dishes inserted with their links are
+counted in with ``count_new_dishes``, anything else is recounted with
+``reconcile``; ``manage.py reconcile_dish_counts`` does that on demand.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from kitchen.models import Dish, DishType, Ingredient
+
+
+def dish_models():
+    """The models whose rows hold or link dishes."""
+    return (Dish, Dish.ingredients.through, Dish.cooks.through)
+
+
+def counted_relations():
+    """
+    ``(model, dishes_table, column)``: the model with a ``dish_count``,
+    the table linking it to dishes and that table's column pointing at it.
+    """
+    return (
+        (DishType, Dish, "dish_type"),
+        (Ingredient, Dish.ingredients.through, "ingredient"),
+        (get_user_model(), Dish.cooks.through, "cook"),
+    )
+
+
+# dishes read per query, and rows written per UPDATE, by count_new_dishes
+BATCH_SIZE = 500
+
+_deferred = threading.local()
+
+
+def _write(model, deltas):
+    """Add ``deltas[pk]`` to each ``dish_count``, ``BATCH_SIZE`` at a time."""
+    pks = sorted(deltas)
+    for start in range(0, len(pks), BATCH_SIZE):
+        _write_batch(model, {
+            pk: deltas[pk] for pk in pks[start:start + BATCH_SIZE]
+        })
+
+
+def _write_batch(model, deltas):
+    amounts = set(deltas.values())
+    if len(amounts) == 1:
+        (amount,) = amounts
+        delta = Value(amount)
+    else:
+        delta = Case(
+            *(When(pk=pk, then=Value(amount))
+              for pk, amount in deltas.items()),
+            default=Value(0),
+        )
+    count = F("dish_count") + delta
+    if min(amounts) < 0:
+        # A count that already drifted low must not fail the write;
+        # reconcile() puts it right.
+        count = Greatest(count, 0)
+    model._default_manager.filter(pk__in=deltas).update(dish_count=count)
+
+
+def adjust(model, pks, delta=1):
+    """Add ``delta`` to the ``dish_count`` of each of ``pks``."""
+    pks = [pk for pk in pks if pk is not None]
+    if pks and delta:
+        _add(model, dict.fromkeys(pks, delta))
+
+
+def _add(model, deltas):
+    pending = getattr(_deferred, "pending", None)
+    if pending is None:
+        _write(model, deltas)
+        return
+    for pk, delta in deltas.items():
+        pending[model][pk] += delta
+
+
+@contextmanager
+def deferred():
+    """
+    Hold the adjustments made inside the block and write them when it
+    exits, one ``UPDATE`` per model, for code that reports many changes
+    one object at a time.
+    """
+    if getattr(_deferred, "pending", None) is not None:
+        yield
+        return
+    _deferred.pending = pending = defaultdict(lambda: defaultdict(int))
+    try:
+        yield
+    finally:
+        _deferred.pending = None
+    for model, deltas in pending.items():
+        deltas = {pk: delta for pk, delta in deltas.items() if delta}
+        if deltas:
+            _write(model, deltas)
+
+
+def adjust_linked(model, through, column, dish_ids, delta):
+    """
+    Add ``delta`` once per link between ``dish_ids`` and ``model`` rows;
+    run before deleting links, while they can still be read.
+    """
+    dish = "pk" if through is Dish else "dish"
+    counts = (
+        through._default_manager.filter(**{f"{dish}__in": dish_ids})
+        .values(column)
+        .annotate(links=Count("pk"))
+        .values_list(column, "links")
+    )
+    deltas = {pk: delta * links for pk, links in counts}
+    if deltas:
+        _add(model, deltas)
+
+
+def count_new_dishes(dish_ids):
+    """
+    Count in ``dish_ids``, dishes just inserted together with all their
+    links, without recounting the rows they point at.
+    """
+    dish_ids = sorted(set(dish_ids))
+    with deferred():
+        for start in range(0, len(dish_ids), BATCH_SIZE):
+            batch = dish_ids[start:start + BATCH_SIZE]
+            for model, through, column in counted_relations():
+                adjust_linked(model, through, column, batch, 1)
+
+
+def _actual_counts(through, column):
+    return Coalesce(
+        Subquery(
+            through._default_manager.filter(**{column: OuterRef("pk")})
+            .order_by()
+            .values(column)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def reconcile(dry_run=False) -> dict:
+    """
+    Recount every ``dish_count`` and return ``{(label, pk): (stored,
+    actual)}`` for the rows that had drifted.
+    """
+    drift = {}
+    with transaction.atomic():
+        for model, through, column in counted_relations():
+            actual = _actual_counts(through, column)
+            rows = model._default_manager.exclude(dish_count=actual)
+            drifted = {
+                (model._meta.label, pk): (stored, count)
+                for pk, stored, count in rows.annotate(
+                    actual=actual
+                ).values_list("pk", "dish_count", "actual")
+            }
+            drift.update(drifted)
+            if drifted and not dry_run:
+                rows.update(dish_count=actual)
+    return drift
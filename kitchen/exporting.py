@@ -0,0 +1,171 @@
+"""
+Streaming CSV/JSONL exports of dishes, cooks and suggestions.
+
+Rows come from ``values_list`` projections read with server-side
+chunked iteration, so memory use does not grow with the table and the
+first chunk is ready as soon as the first rows are. The dish export
+flattens ingredients and cooks by walking the through tables in dish id
+order next to the dishes (a merge join), one query per relation rather
+than one per dish. Its columns match ``kitchen.importing``, so an export
+can be loaded back with ``import_menu``.
+"""
+import csv
+import json
+from itertools import groupby
+from operator import itemgetter
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from kitchen.importing import LIST_SEPARATOR, MENU_COLUMNS
+from kitchen.models import Dish, Suggestion
+
+CHUNK_SIZE = 2000
+# bytes collected before a chunk is handed to the server
+BUFFER_SIZE = 64 * 1024
+
+
+class _RelatedNames:
+    """Names of one relation, walked in step with ascending dish ids."""
+
+    def __init__(self, pairs):
+        self._groups = groupby(pairs, key=itemgetter(0))
+        self._current = next(self._groups, None)
+
+    def names_for(self, dish_id) -> list:
+        while self._current is not None and self._current[0] < dish_id:
+            self._current = next(self._groups, None)
+        if self._current is None or self._current[0] != dish_id:
+            return []
+        names = [name for _, name in self._current[1]]
+        self._current = next(self._groups, None)
+        return names
+
+
+def dish_rows():
+    ingredients = _RelatedNames(
+        Dish.ingredients.through.objects.order_by(
+            "dish_id", "ingredient_id"
+        ).values_list("dish_id", "ingredient__name").iterator(CHUNK_SIZE)
+    )
+    cooks = _RelatedNames(
+        Dish.cooks.through.objects.order_by(
+            "dish_id", "cook_id"
+        ).values_list("dish_id", "cook__username").iterator(CHUNK_SIZE)
+    )
+    dishes = Dish.objects.order_by("id").values_list(
+        "id", "name", "description", "price", "dish_type__name"
+    )
+    for dish_id, *values in dishes.iterator(CHUNK_SIZE):
+        yield (
+            dish_id,
+            *values,
+            ingredients.names_for(dish_id),
+            cooks.names_for(dish_id),
+        )
+
+
+def cook_rows():
+    return get_user_model().objects.order_by("id").values_list(
+        *COLUMNS["cooks"]
+    ).iterator(CHUNK_SIZE)
+
+
+def suggestion_rows():
+    return Suggestion.objects.order_by("id").values_list(
+        "id",
+        "created_at",
+        "dish__name",
+        "cook__username",
+        "approved",
+        "rejected",
+        "text",
+    ).iterator(CHUNK_SIZE)
+
+
+COLUMNS = {
+    "dishes": ("id",) + MENU_COLUMNS,
+    "cooks": (
+        "id",
+        "username",
+        "first_name",
+        "last_name",
+        "email",
+        "years_of_experience",
+        "is_staff",
+        "date_joined",
+    ),
+    "suggestions": (
+        "id",
+        "created_at",
+        "dish",
+        "cook",
+        "approved",
+        "rejected",
+        "text",
+    ),
+}
+
+ROWS = {
+    "dishes": dish_rows,
+    "cooks": cook_rows,
+    "suggestions": suggestion_rows,
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def render_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([
+            LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+            for value in row
+        ])
+
+
+def render_jsonl(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder)
+        yield "\n"
+
+
+RENDERERS = {
+    "csv": render_csv,
+    "jsonl": render_jsonl,
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+
+def _buffered(parts, size=BUFFER_SIZE):
+    # The first part goes out alone so clients see bytes immediately.
+    parts = iter(parts)
+    first = next(parts, None)
+    if first is not None:
+        yield first
+    buffer = []
+    length = 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield "".join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def export(name, file_format, buffer_size=BUFFER_SIZE):
+    """Iterate over the text chunks of export ``name`` in ``file_format``."""
+    return _buffered(
+        RENDERERS[file_format](COLUMNS[name], ROWS[name]()), buffer_size
+    )
@@ -0,0 +1,53 @@
+"""
+Query expressions shared by the projection-based read paths.
+"""
+from django.db import models
+from django.db.models import Aggregate, OuterRef, Subquery
+
+
+class IdListField(models.Field):
+    """
+    Output field for ``IdList``: turns the aggregated value into a
+    sorted list of ints.
+    """
+
+    def get_internal_type(self):
+        return "TextField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = value.split(",")
+        return sorted(int(item) for item in value)
+
+
+class IdList(Aggregate):
+    """
+    Ids aggregated in the database: ``ARRAY_AGG`` on Postgres,
+    ``GROUP_CONCAT`` on SQLite and MySQL.
+    """
+
+    function = "GROUP_CONCAT"
+    name = "IdList"
+    output_field = IdListField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, function="ARRAY_AGG", **extra_context
+        )
+
+
+def related_ids(through, source, target):
+    """
+    Correlated subquery listing the ``target`` ids linked to the outer
+    row through the many-to-many table ``through``. One subquery per
+    relation avoids the row explosion of joining two relations at once.
+    """
+    return Subquery(
+        through.objects.filter(**{source: OuterRef("pk")})
+        .values(source)
+        .annotate(ids=IdList(f"{target}_id"))
+        .values("ids"),
+        output_field=IdListField(),
+    )
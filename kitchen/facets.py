@@ -0,0 +1,281 @@
+"""
+Faceted filters for the dish list.
+
+``DishFilters`` holds what the list is filtered by: the name search, dish
+types, ingredients (any or all of them), cooks and a price range.
+``facet_counts`` returns, for every option of every facet, how many
+dishes match: one ``GROUP BY`` per facet, sent together as a single
+``UNION ALL`` statement. A facet's counts ignore its own selection, so
+picking a second dish type or cook widens the list as the count says;
+ingredients in "all" mode keep it, since each one picked narrows it.
+
+The counts are cached under the watermarks of the models they read and
+the filters, so repeating a filter costs no query until something is
+written.
+"""
+import hashlib
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Value, When
+
+from kitchen.conditional import get_watermarks
+from kitchen.models import Dish, DishType, Ingredient
+from kitchen.search import search
+
+# (lower, upper) bounds of the price facet options; upper is exclusive
+PRICE_RANGES = (
+    (None, Decimal(10)),
+    (Decimal(10), Decimal(20)),
+    (Decimal(20), Decimal(50)),
+    (Decimal(50), None),
+)
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+
+
+@dataclass(frozen=True)
+class DishFilters:
+    name: str = ""
+    dish_type: tuple = ()
+    ingredient: tuple = ()
+    ingredient_match: str = MATCH_ANY
+    cook: tuple = ()
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+
+    @classmethod
+    def from_form(cls, form) -> "DishFilters":
+        """The filters of the valid fields of a bound ``DishFilterForm``."""
+        form.is_valid()
+        data = {
+            field: value
+            for field, value in form.cleaned_data.items()
+            if value not in (None, "", [])
+        }
+        for field in ("dish_type", "ingredient", "cook"):
+            if field in data:
+                data[field] = tuple(data[field])
+        if "name" in data:
+            data["name"] = data["name"].strip()
+        return cls(**data)
+
+    def apply(self, queryset, skip=None):
+        """Filter ``queryset`` of dishes by all but the ``skip`` facet."""
+        if self.name and skip != "name":
+            queryset = queryset.filter(
+                pk__in=search(Dish.objects.all(), self.name).values("pk")
+            )
+        if self.dish_type and skip != "dish_type":
+            queryset = queryset.filter(dish_type__in=self.dish_type)
+        if self.ingredient and (
+            skip != "ingredient" or self.ingredient_match == MATCH_ALL
+        ):
+            queryset = queryset.filter(pk__in=self._with_ingredients())
+        if self.cook and skip != "cook":
+            queryset = queryset.filter(
+                pk__in=Dish.cooks.through.objects.filter(
+                    cook__in=self.cook
+                ).values("dish")
+            )
+        if skip != "price":
+            if self.min_price is not None:
+                queryset = queryset.filter(price__gte=self.min_price)
+            if self.max_price is not None:
+                queryset = queryset.filter(price__lt=self.max_price)
+        return queryset
+
+    def _with_ingredients(self):
+        links = Dish.ingredients.through.objects.filter(
+            ingredient__in=self.ingredient
+        )
+        if self.ingredient_match != MATCH_ALL:
+            return links.values("dish")
+        return (
+            links.values("dish")
+            .annotate(matched=Count("ingredient"))
+            .filter(matched=len(self.ingredient))
+            .values("dish")
+        )
+
+
+def _price_bucket():
+    return Case(
+        *(
+            When(
+                **{
+                    f"price__{lookup}": bound
+                    for lookup, bound in (("gte", lower), ("lt", upper))
+                    if bound is not None
+                },
+                then=Value(index),
+            )
+            for index, (lower, upper) in enumerate(PRICE_RANGES)
+        ),
+        default=Value(None),
+    )
+
+
+def facet_fields():
+    """``{facet: (key, label)}`` expressions over ``Dish``."""
+    return {
+        "dish_type": (F("dish_type"), F("dish_type__name")),
+        "ingredient": (F("ingredients"), F("ingredients__name")),
+        "cook": (F("cooks"), F("cooks__username")),
+        "price": (_price_bucket(), Value("", output_field=CharField())),
+    }
+
+
+def choice_labels():
+    """``{facet: (model, label_field)}`` of the facets picking rows."""
+    return {
+        "dish_type": (DishType, "name"),
+        "ingredient": (Ingredient, "name"),
+        "cook": (get_user_model(), "username"),
+    }
+
+
+def _facet_query(filters, facet, key, label):
+    return (
+        filters.apply(Dish.objects.order_by(), skip=facet)
+        .annotate(facet=Value(facet), key=key, label=label)
+        .filter(key__isnull=False)
+        .values("facet", "key", "label")
+        .annotate(dishes=Count("pk"))
+        .values_list("facet", "key", "label", "dishes")
+    )
+
+
+def count_facets(filters) -> dict:
+    """``{facet: [(key, label, dishes), ...]}`` read in one query."""
+    first, *rest = (
+        _facet_query(filters, facet, key, label)
+        for facet, (key, label) in facet_fields().items()
+    )
+    counts = {facet: [] for facet in facet_fields()}
+    for facet, key, label, dishes in first.union(*rest, all=True):
+        counts[facet].append((key, label, dishes))
+    return counts
+
+
+def _cache_key(filters) -> str:
+    watermarks = get_watermarks(
+        (Dish, DishType, Ingredient, get_user_model())
+    )
+    parts = [repr(sorted(asdict(filters).items())), *map(repr, watermarks)]
+    digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()
+    return f"kitchen:facets:{digest}"
+
+
+def facet_counts(filters) -> dict:
+    """``count_facets`` from the cache, counted only on a miss."""
+    key = _cache_key(filters)
+    counts = cache.get(key)
+    if counts is None:
+        counts = count_facets(filters)
+        cache.set(key, counts, settings.KITCHEN_FACET_CACHE_TIMEOUT)
+    return counts
+
+
+@dataclass(frozen=True)
+class FacetOption:
+    label: str
+    dishes: int
+    selected: bool
+    # the query string toggling this option, back on the first page
+    query: str
+
+
+@dataclass(frozen=True)
+class Facet:
+    name: str
+    title: str
+    options: tuple
+
+
+def _query(params, **changes) -> str:
+    params = params.copy()
+    for name in ("page", "cursor"):
+        params.pop(name, None)
+    for name, values in changes.items():
+        params.setlist(name, [str(value) for value in values])
+    return params.urlencode()
+
+
+def _price_label(lower, upper) -> str:
+    if lower is None:
+        return f"Under ${upper}"
+    if upper is None:
+        return f"${lower} and over"
+    return f"${lower} – ${upper}"
+
+
+def _choice_options(filters, facet, counts, params):
+    selected = set(getattr(filters, facet))
+    # A selection other facets narrowed to no dishes isn't counted, but
+    # stays listed so it can be cleared.
+    missing = selected - {key for key, _label, _dishes in counts}
+    if missing:
+        model, field = choice_labels()[facet]
+        counts = [*counts, *(
+            (pk, label, 0)
+            for pk, label in model._default_manager.filter(
+                pk__in=missing
+            ).values_list("pk", field)
+        )]
+    ranked = sorted(counts, key=lambda row: (-row[2], row[1]))
+    shown = [
+        row for index, row in enumerate(ranked)
+        if index < settings.KITCHEN_FACET_OPTIONS or row[0] in selected
+    ]
+    return tuple(
+        FacetOption(
+            label=label,
+            dishes=dishes,
+            selected=key in selected,
+            query=_query(params, **{facet: sorted(selected ^ {key})}),
+        )
+        for key, label, dishes in shown
+    )
+
+
+def _price_options(filters, counts, params):
+    dishes = {key: count for key, _label, count in counts}
+    options = []
+    for index, (lower, upper) in enumerate(PRICE_RANGES):
+        selected = (filters.min_price, filters.max_price) == (lower, upper)
+        bounds = (lower, upper) if not selected else (None, None)
+        options.append(FacetOption(
+            label=_price_label(lower, upper),
+            dishes=dishes.get(index, 0),
+            selected=selected,
+            query=_query(params, **{
+                name: [] if bound is None else [bound]
+                for name, bound in zip(("min_price", "max_price"), bounds)
+            }),
+        ))
+    return tuple(options)
+
+
+def build_facets(filters, params) -> list:
+    """The facets of the dish list for request parameters ``params``."""
+    counts = facet_counts(filters)
+    return [
+        Facet("dish_type", "Dish type", _choice_options(
+            filters, "dish_type", counts["dish_type"], params
+        )),
+        Facet("ingredient", "Ingredients", _choice_options(
+            filters, "ingredient", counts["ingredient"], params
+        )),
+        Facet("cook", "Cooks", _choice_options(
+            filters, "cook", counts["cook"], params
+        )),
+        Facet("price", "Price", _price_options(
+            filters, counts["price"], params
+        )),
+    ]
@@ -1,8 +1,13 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django import forms
+from django.core.exceptions import ValidationError
+from django_select2.forms import ModelSelect2MultipleWidget
 
+from kitchen import cards
+from kitchen.facets import MATCH_ALL, MATCH_ANY
 from kitchen.models import Suggestion, Dish, Ingredient
+from kitchen.relations import set_related
 
 
 class CookCreationForm(UserCreationForm):
@@ -34,6 +39,43 @@ class CookPasswordResetForm(UserCreationForm):
         model = get_user_model()
         fields = ()
 
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        if commit:
+            # Nothing shown on a dish card changes with the password.
+            user.save(update_fields=["password"])
+        return user
+
+
+def cook_label(cook) -> str:
+    full_name = cook.get_full_name()
+    return f"{full_name} ({cook.username})" if full_name else cook.username
+
+
+class PrefixSearchWidget(ModelSelect2MultipleWidget):
+    """
+    Select2 picker backed by a kitchen autocomplete endpoint. Only the
+    selected options are rendered; the others are fetched a page at a
+    time while the user types.
+    """
+
+    def __init__(self, data_view, placeholder, label=str):
+        super().__init__(
+            data_view=data_view,
+            attrs={
+                "data-placeholder": placeholder,
+                "data-minimum-input-length": 1,
+            },
+        )
+        self.label = label
+
+    def label_from_instance(self, obj):
+        return self.label(obj)
+
+    def set_to_cache(self):
+        # The endpoints know their queryset; nothing to look up later.
+        pass
+
 
 class SuggestionForm(forms.ModelForm):
     class Meta:
@@ -44,13 +86,17 @@ class SuggestionForm(forms.ModelForm):
 class DishForm(forms.ModelForm):
     ingredients = forms.ModelMultipleChoiceField(
         queryset=Ingredient.objects.all(),
-        widget=forms.SelectMultiple(attrs={"id": "id_ingredients"}),
+        widget=PrefixSearchWidget(
+            "kitchen:ingredient-autocomplete", "Select ingredients..."
+        ),
         required=False,
     )
 
     cooks = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.all(),
-        widget=forms.SelectMultiple(attrs={"id": "id_cooks"}),
+        widget=PrefixSearchWidget(
+            "kitchen:cook-autocomplete", "Select cooks...", cook_label
+        ),
         required=False,
     )
 
@@ -58,6 +104,38 @@ class DishForm(forms.ModelForm):
         model = Dish
         fields = "__all__"
 
+    def save(self, commit=True):
+        # The dish and both relations change its card; build it once.
+        with cards.deferred():
+            return super().save(commit)
+
+    def _save_m2m(self):
+        # Write only the ingredients and cooks that changed instead of
+        # letting each field's set() diff through the related manager.
+        for name in ("ingredients", "cooks"):
+            if name in self.cleaned_data:
+                set_related(
+                    self.instance,
+                    name,
+                    [obj.pk for obj in self.cleaned_data[name]],
+                )
+
+
+class DishCookAssignForm(forms.Form):
+    dishes = forms.ModelMultipleChoiceField(
+        queryset=Dish.objects.all(),
+        widget=PrefixSearchWidget(
+            "kitchen:dish-autocomplete", "Select dishes..."
+        ),
+    )
+
+    cooks = forms.ModelMultipleChoiceField(
+        queryset=get_user_model().objects.all(),
+        widget=PrefixSearchWidget(
+            "kitchen:cook-autocomplete", "Select cooks...", cook_label
+        ),
+    )
+
 
 class CookSearchForm(forms.Form):
     username = forms.CharField(
@@ -122,3 +200,69 @@ class SuggestionSearchForm(forms.Form):
             }
         )
     )
+
+
+class SuggestionModerationSearchForm(SuggestionSearchForm):
+    cook = forms.CharField(
+        required=False,
+        max_length=255,
+        label="",
+        widget=forms.TextInput(
+            attrs={
+                "placeholder": "Search by cook"
+            }
+        )
+    )
+
+
+# the largest primary key a 64-bit id column holds
+MAX_ID = 2 ** 63 - 1
+
+
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            pks = {int(pk) for pk in value or ()}
+        except (TypeError, ValueError):
+            raise ValidationError("Enter whole numbers.", code="invalid")
+        if any(not 1 <= pk <= MAX_ID for pk in pks):
+            raise ValidationError("Enter valid ids.", code="invalid")
+        return sorted(pks)
+
+
+class DishFilterForm(DishSearchForm):
+    """The dish list facets; selections travel as hidden fields."""
+
+    dish_type = IdListField(required=False)
+    ingredient = IdListField(required=False)
+    ingredient_match = forms.ChoiceField(
+        required=False,
+        choices=[(MATCH_ANY, "Any"), (MATCH_ALL, "All")],
+        widget=forms.HiddenInput,
+    )
+    cook = IdListField(required=False)
+    min_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_digits=6,
+        decimal_places=2,
+        label="",
+        widget=forms.NumberInput(attrs={"placeholder": "Min price"}),
+    )
+    max_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_digits=6,
+        decimal_places=2,
+        label="",
+        widget=forms.NumberInput(attrs={"placeholder": "Max price"}),
+    )
+
+
+class SuggestionModerationForm(forms.Form):
+    action = forms.ChoiceField(
+        choices=[("approve", "Approve"), ("reject", "Reject")]
+    )
+    suggestions = IdListField()
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from kitchen.versions import get_versions
+
+DISH_CARD_TEMPLATE = "includes/dish_card.html"
+
+
+def _dish_card_key(pk, version) -> str:
+    return f"kitchen:dish-card:{pk}:{version}"
+
+
+def render_dish_cards(dish_cards) -> list:
+    """
+    Rendered HTML for each ``DishCard``, in order.
+
+    The HTML is cached under the dish's current version, so a fully
+    cached page costs two cache round trips. Only the cards that miss
+    are rendered, straight from the card row.
+    """
+    dish_cards = list(dish_cards)
+    versions = get_versions("dish", [card.pk for card in dish_cards])
+    keys = {
+        card.pk: _dish_card_key(card.pk, versions[card.pk])
+        for card in dish_cards
+    }
+    rendered = cache.get_many(keys.values())
+
+    missing = {
+        keys[card.pk]: render_to_string(DISH_CARD_TEMPLATE, {"card": card})
+        for card in dish_cards
+        if keys[card.pk] not in rendered
+    }
+    if missing:
+        cache.set_many(missing, settings.KITCHEN_FRAGMENT_CACHE_TIMEOUT)
+        rendered.update(missing)
+
+    return [mark_safe(rendered[keys[card.pk]]) for card in dish_cards]
@@ -0,0 +1,209 @@
+"""
+Streaming menu import.
+
+A menu file has one dish per row with the columns in ``MENU_COLUMNS``.
+``ingredients`` and ``cooks`` are lists: JSON arrays in JSONL files,
+``|``-separated in CSV files. Dish types and ingredients are created on
+first use; cooks are matched by username and must already exist.
+
+Rows are consumed ``batch_size`` at a time, each batch in its own
+transaction together with the dish counts, cards and dashboard counters
+it adds. Names are resolved through in-memory maps of the (small)
+lookup tables, and dishes and both through tables are written with one
+``bulk_create`` each, so memory stays flat however long the file is.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from kitchen.bulk import after_bulk_write
+from kitchen.models import Dish, DishType, Ingredient
+
+MENU_COLUMNS = (
+    "name",
+    "description",
+    "price",
+    "dish_type",
+    "ingredients",
+    "cooks",
+)
+LIST_SEPARATOR = "|"
+DEFAULT_BATCH_SIZE = 1000
+
+
+class MenuImportError(Exception):
+    def __init__(self, row, message):
+        super().__init__(f"row {row}: {message}")
+        self.row = row
+
+
+def _split(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(LIST_SEPARATOR)
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        row["ingredients"] = _split(row.get("ingredients"))
+        row["cooks"] = _split(row.get("cooks"))
+        yield row
+
+
+def read_jsonl(stream):
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            raise MenuImportError(number, f"invalid JSON: {error}")
+        row["ingredients"] = _split(row.get("ingredients"))
+        row["cooks"] = _split(row.get("cooks"))
+        yield row
+
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+}
+
+
+class MenuImporter:
+    """
+    Import dish rows into the database.
+
+    ``unknown_cooks`` collects usernames that matched no cook; their
+    assignments are skipped rather than failing the import.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.dish_types = dict(DishType.objects.values_list("name", "id"))
+        self.ingredients = dict(Ingredient.objects.values_list("name", "id"))
+        self.cooks = dict(
+            get_user_model().objects.values_list("username", "id")
+        )
+        self.unknown_cooks = set()
+        self.counts = dict.fromkeys(
+            ("dishes", "dish_types", "ingredients", "assignments"), 0
+        )
+        self._rows_read = 0
+
+    def run(self, rows):
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+        return self.counts
+
+    def import_batch(self, rows):
+        first_row = self._rows_read + 1
+        self._rows_read += len(rows)
+        dishes = [
+            self.clean(row, number)
+            for number, row in enumerate(rows, start=first_row)
+        ]
+        with transaction.atomic():
+            dish_types = self.create_missing(
+                DishType, self.dish_types,
+                {dish["dish_type"] for dish in dishes},
+            )
+            ingredients = self.create_missing(
+                Ingredient, self.ingredients,
+                {name for dish in dishes for name in dish["ingredients"]},
+            )
+            created = Dish.objects.bulk_create(
+                Dish(
+                    name=dish["name"],
+                    description=dish["description"],
+                    price=dish["price"],
+                    dish_type_id=self.dish_types[dish["dish_type"]],
+                )
+                for dish in dishes
+            )
+            assignments = self.create_assignments(created, dishes)
+            # Counts and cards commit with the batch they describe.
+            after_bulk_write(
+                Dish, DishType, Ingredient,
+                created={
+                    Dish: len(created),
+                    DishType: dish_types,
+                    Ingredient: ingredients,
+                },
+                dish_ids=[dish.pk for dish in created],
+            )
+        self.counts["dish_types"] += dish_types
+        self.counts["ingredients"] += ingredients
+        self.counts["dishes"] += len(created)
+        self.counts["assignments"] += assignments
+
+    def clean(self, row, number):
+        try:
+            row = {
+                "name": self._clean_field(Dish, "name", row.get("name")),
+                "description": self._clean_field(
+                    Dish, "description", row.get("description")
+                ),
+                "price": self._clean_field(Dish, "price", row.get("price")),
+                "dish_type": self._clean_field(
+                    DishType, "name", row.get("dish_type")
+                ),
+                "ingredients": [
+                    self._clean_field(Ingredient, "name", name)
+                    for name in row["ingredients"]
+                ],
+                "cooks": row["cooks"],
+            }
+        except ValidationError as error:
+            raise MenuImportError(number, "; ".join(error.messages))
+        return row
+
+    @staticmethod
+    def _clean_field(model, name, value):
+        if isinstance(value, str):
+            value = value.strip()
+        return model._meta.get_field(name).clean(value, None)
+
+    def create_missing(self, model, lookup, names):
+        missing = sorted(names - lookup.keys())
+        if not missing:
+            return 0
+        created = model.objects.bulk_create(
+            model(name=name) for name in missing
+        )
+        if any(obj.pk is None for obj in created):
+            # Backends that can't return ids from a bulk insert.
+            created = model.objects.filter(name__in=missing)
+        lookup.update((obj.name, obj.pk) for obj in created)
+        return len(missing)
+
+    def create_assignments(self, created, dishes):
+        IngredientLink = Dish.ingredients.through
+        CookLink = Dish.cooks.through
+        ingredient_links = []
+        cook_links = []
+        for dish, row in zip(created, dishes):
+            for ingredient_id in dict.fromkeys(
+                self.ingredients[name] for name in row["ingredients"]
+            ):
+                ingredient_links.append(
+                    IngredientLink(
+                        dish_id=dish.pk, ingredient_id=ingredient_id
+                    )
+                )
+            for username in dict.fromkeys(row["cooks"]):
+                cook_id = self.cooks.get(username)
+                if cook_id is None:
+                    self.unknown_cooks.add(username)
+                    continue
+                cook_links.append(CookLink(dish_id=dish.pk, cook_id=cook_id))
+        IngredientLink.objects.bulk_create(ingredient_links)
+        CookLink.objects.bulk_create(cook_links)
+        return len(cook_links)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from kitchen.benchmarking import BenchmarkError, Sample, build_cases
+from kitchen.plans import DEFAULT_MIN_ROWS, audit
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the queries of every list and detail view against the "
+        "current (seeded) database and flag full scans and sorts of "
+        "large tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows", type=int, default=DEFAULT_MIN_ROWS,
+            help="Tables with at least this many rows count as large.",
+        )
+        parser.add_argument(
+            "--case", action="append", default=[],
+            help="Only audit cases whose name contains this; repeatable.",
+        )
+        parser.add_argument(
+            "--username", default="benchmark",
+            help="Staff user making the requests; created if missing.",
+        )
+        parser.add_argument(
+            "--strict", action="store_true",
+            help="Exit with an error when anything is flagged.",
+        )
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username=options["username"],
+            defaults={"is_staff": True, "password": "!"},
+        )
+        try:
+            cases = build_cases(Sample())
+        except BenchmarkError as error:
+            raise CommandError(error)
+        cases = [
+            case for case in cases
+            if not case.writes
+            and case.url_name.endswith(("-list", "-detail"))
+            and (
+                not options["case"]
+                or any(part in case.name for part in options["case"])
+            )
+        ]
+
+        flagged = 0
+        for case, sql, plan, problems in audit(
+            cases, user, options["min_rows"]
+        ):
+            if not problems and options["verbosity"] < 2:
+                continue
+            flagged += bool(problems)
+            style = self.style.WARNING if problems else self.style.SUCCESS
+            self.stdout.write(style(
+                f"{case.name}: {'; '.join(problems) or 'ok'}"
+            ))
+            self.stdout.write(f"  {sql}")
+            for line in plan:
+                self.stdout.write(f"    {line}")
+
+        if flagged and options["strict"]:
+            raise CommandError(f"{flagged} flagged query plan(s).")
+        self.stdout.write(f"{flagged} flagged query plan(s).")
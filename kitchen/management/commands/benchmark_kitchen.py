@@ -0,0 +1,171 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from kitchen.benchmarking import (
+    DEFAULT_THRESHOLDS,
+    LATENCY_FLOOR_MS,
+    BenchmarkError,
+    Runner,
+    Sample,
+    ServerRunner,
+    build_cases,
+    compare,
+    load_baseline,
+    row_counts,
+    save_results,
+)
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every kitchen route against the current (seeded) "
+        "database and compare the results with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=20,
+            help="Timed requests per case.",
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=1,
+            help="Untimed requests per case before timing.",
+        )
+        parser.add_argument(
+            "--case", action="append", default=[],
+            help="Only run cases whose name contains this; repeatable.",
+        )
+        parser.add_argument(
+            "--base-url",
+            help=(
+                "Benchmark a running server (uvicorn, gunicorn) instead of "
+                "the test client; only read-only cases and latency."
+            ),
+        )
+        parser.add_argument(
+            "--username", default="benchmark",
+            help="Staff user making the requests; created if missing.",
+        )
+        parser.add_argument(
+            "--baseline", default=str(DEFAULT_BASELINE),
+            help="Baseline JSON to compare against.",
+        )
+        parser.add_argument(
+            "--save-baseline", action="store_true",
+            help="Write the results to --baseline instead of comparing.",
+        )
+        parser.add_argument(
+            "-o", "--output",
+            help="Also write the results to this JSON file.",
+        )
+        parser.add_argument(
+            "--latency-threshold", type=float,
+            default=DEFAULT_THRESHOLDS["latency"],
+            help="Allowed relative median latency growth (0.5 is +50%%).",
+        )
+        parser.add_argument(
+            "--memory-threshold", type=float,
+            default=DEFAULT_THRESHOLDS["memory"],
+            help="Allowed relative peak memory growth.",
+        )
+        parser.add_argument(
+            "--query-threshold", type=int,
+            default=DEFAULT_THRESHOLDS["queries"],
+            help="Allowed number of extra queries.",
+        )
+        parser.add_argument(
+            "--latency-floor", type=float, default=LATENCY_FLOOR_MS,
+            help="Median growth in ms always tolerated as noise.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be positive.")
+        user, _ = get_user_model().objects.get_or_create(
+            username=options["username"],
+            defaults={"is_staff": True, "password": "!"},
+        )
+        if not user.is_staff:
+            raise CommandError(f"{user.username} must be a staff user.")
+
+        try:
+            cases = build_cases(Sample())
+        except BenchmarkError as error:
+            raise CommandError(error)
+        if options["case"]:
+            cases = [
+                case for case in cases
+                if any(part in case.name for part in options["case"])
+            ]
+
+        if options["base_url"]:
+            runner = ServerRunner(
+                options["base_url"], user,
+                options["iterations"], options["warmup"],
+            )
+        else:
+            runner = Runner(user, options["iterations"], options["warmup"])
+        try:
+            results = runner.run(cases)
+        except BenchmarkError as error:
+            raise CommandError(error)
+
+        for name, result in sorted(results.items()):
+            self.stdout.write(
+                "{name:<32} p50 {p50_ms:>9.2f} ms  p95 {p95_ms:>9.2f} ms  "
+                "p99 {p99_ms:>9.2f} ms  queries {queries!s:>4}  "
+                "peak {peak_kib!s:>7} KiB".format(name=name, **result)
+            )
+
+        meta = {
+            "iterations": options["iterations"],
+            "base_url": options["base_url"],
+            "rows": row_counts(),
+        }
+        if options["output"]:
+            save_results(options["output"], results, **meta)
+        if options["save_baseline"]:
+            Path(options["baseline"]).parent.mkdir(exist_ok=True)
+            save_results(options["baseline"], results, **meta)
+            self.stdout.write(self.style.SUCCESS(
+                f"Saved the baseline to {options['baseline']}."
+            ))
+            return
+
+        try:
+            baseline = load_baseline(options["baseline"])
+        except OSError:
+            self.stderr.write(
+                f"No baseline at {options['baseline']}, nothing to compare."
+            )
+            return
+        if baseline["meta"].get("rows") != meta["rows"]:
+            self.stderr.write(
+                "The database size differs from the baseline's "
+                f"{baseline['meta'].get('rows')}; timings may not compare."
+            )
+        regressions = compare(
+            results,
+            baseline["cases"],
+            thresholds={
+                "latency": options["latency_threshold"],
+                "memory": options["memory_threshold"],
+                "queries": options["query_threshold"],
+            },
+            latency_floor_ms=options["latency_floor"],
+            floors={
+                case.name: case.latency_floor_ms
+                for case in cases
+                if case.latency_floor_ms is not None
+            },
+        )
+        for regression in regressions:
+            self.stderr.write(regression)
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s).")
+        self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kitchen.exporting import COLUMNS, RENDERERS, export
+
+
+class Command(BaseCommand):
+    help = "Stream dishes, cooks or suggestions out as CSV or JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(COLUMNS))
+        parser.add_argument(
+            "--format",
+            choices=sorted(RENDERERS),
+            default="csv",
+            help="Output format (default: csv).",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            help="File to write; standard output by default.",
+        )
+
+    def handle(self, *args, **options):
+        chunks = export(options["name"], options["format"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        try:
+            with open(
+                options["output"], "w", newline="", encoding="utf-8"
+            ) as out:
+                for chunk in chunks:
+                    out.write(chunk)
+        except OSError as error:
+            raise CommandError(error)
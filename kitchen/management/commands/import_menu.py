@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kitchen.importing import (
+    DEFAULT_BATCH_SIZE,
+    READERS,
+    MenuImporter,
+    MenuImportError,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import dishes with their dish types, ingredients and cook "
+        "assignments from a CSV or JSONL file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Menu file to import, or - to read standard input.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="File format; taken from the file extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Rows written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or Path(path).suffix.lstrip(".")
+        if file_format not in READERS:
+            raise CommandError(
+                "Cannot tell the file format, pass --format csv or jsonl."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        importer = MenuImporter(batch_size=options["batch_size"])
+        if path == "-":
+            stream = sys.stdin
+        else:
+            try:
+                stream = open(path, newline="", encoding="utf-8")
+            except OSError as error:
+                raise CommandError(error)
+        try:
+            counts = importer.run(READERS[file_format](stream))
+        except MenuImportError as error:
+            raise CommandError(
+                f"{error} (rows before this batch were imported)"
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for username in sorted(importer.unknown_cooks):
+            self.stderr.write(f"Unknown cook {username!r}, not assigned.")
+        self.stdout.write(self.style.SUCCESS(
+            "Imported {dishes} dish(es), {dish_types} new dish type(s), "
+            "{ingredients} new ingredient(s) and {assignments} cook "
+            "assignment(s).".format(**counts)
+        ))
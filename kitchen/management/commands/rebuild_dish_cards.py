@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from kitchen.cards import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the dish card of every dish from the dishes, dish types, "
+        "ingredients and cooks."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {count} dish card(s)."
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from kitchen.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the dashboard tables and repair drifted counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing the corrected values.",
+        )
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(dry_run=options["dry_run"])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("All counters are accurate."))
+            return
+
+        for name, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{name}: stored {stored}, actual {actual}")
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drift)} counter(s) drifted, nothing written."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Repaired {len(drift)} counter(s)."
+            ))
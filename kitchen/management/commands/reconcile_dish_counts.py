@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from kitchen.dish_counts import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the dishes of every dish type, ingredient and cook and "
+        "repair drifted dish counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing the corrected values.",
+        )
+
+    def handle(self, *args, **options):
+        drift = reconcile(dry_run=options["dry_run"])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS(
+                "All dish counts are accurate."
+            ))
+            return
+
+        for (label, pk), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f"{label} {pk}: stored {stored}, actual {actual}"
+            )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drift)} dish count(s) drifted, nothing written."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Repaired {len(drift)} dish count(s)."
+            ))
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from kitchen.seeding import DEFAULT_BATCH_SIZE, KitchenSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with deterministic synthetic dishes, dish "
+        "types, ingredients, cooks and suggestions for load testing."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ("dishes", 1000),
+            ("cooks", 100),
+            ("ingredients", 300),
+            ("suggestions", 10000),
+            ("dish-types", 12),
+        ):
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Number of {name.replace('-', ' ')} to create.",
+            )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed; the same seed produces the same data.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Rows per bulk insert.",
+        )
+        parser.add_argument(
+            "--password",
+            default="kitchen",
+            help="Password shared by every generated cook.",
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name]
+            for name in (
+                "dishes", "cooks", "ingredients", "suggestions", "dish_types"
+            )
+        }
+        if any(count < 0 for count in counts.values()):
+            raise CommandError("Counts cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        if counts["dishes"] and not counts["dish_types"]:
+            raise CommandError("Dishes need at least one dish type.")
+
+        seeder = KitchenSeeder(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            password=options["password"],
+            log=self.stdout.write,
+        )
+        try:
+            seeder.run(**counts)
+        except IntegrityError as error:
+            raise CommandError(
+                f"{error}. Generated usernames repeat across runs, seed "
+                f"an empty database."
+            )
+        self.stdout.write(self.style.SUCCESS("Seeded the kitchen."))
@@ -0,0 +1,147 @@
+"""
+In-process metrics, rendered in the Prometheus text exposition format.
+
+Each worker process keeps its own registry; scrape every worker (or
+aggregate with ``sum by``) and use ``histogram_quantile`` for p50/p99.
+"""
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            yield bound, total
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"'),
+        )
+        for key, value in pairs
+    )
+    return "{" + rendered + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._histograms = {}
+        self._counters = {}
+        self._collectors = []
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_collector(self, collector):
+        """
+        Add a callable yielding ``(name, labels, value)`` gauge samples,
+        evaluated on every scrape.
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def _header(self, lines, name, kind):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                self._header(lines, name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                seen.add(name)
+                self._header(lines, name, "histogram")
+            for bound, total in histogram.cumulative():
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, le=bound)} {total}"
+                )
+            lines.append(
+                f"{name}_sum{_format_labels(labels)} {histogram.sum}"
+            )
+            lines.append(
+                f"{name}_count{_format_labels(labels)} {histogram.count}"
+            )
+
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                if name not in seen:
+                    seen.add(name)
+                    self._header(lines, name, "gauge")
+                labels = tuple(sorted(labels.items()))
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+registry.describe(
+    "kitchen_request_duration_seconds", "Total time spent handling a request."
+)
+registry.describe(
+    "kitchen_view_duration_seconds",
+    "Time spent in the view outside template rendering.",
+)
+registry.describe(
+    "kitchen_template_duration_seconds", "Time spent rendering templates."
+)
+registry.describe(
+    "kitchen_db_duration_seconds", "Time spent executing database queries."
+)
+registry.describe(
+    "kitchen_db_queries", "Number of database queries run per request."
+)
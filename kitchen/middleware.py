@@ -0,0 +1,261 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from kitchen.metrics import QUERY_COUNT_BUCKETS, registry
+from kitchen.nplusone import (
+    NPlusOneError,
+    QueryRepeatDetector,
+    format_offenders,
+    logger as nplusone_logger,
+)
+from kitchen.routing import (
+    STICKY_SESSION_KEY,
+    choose_replica,
+    is_sticky,
+    is_write,
+    reading_from,
+    sticky_until,
+    uses_replica,
+)
+
+# Execute wrappers of the request being handled. Connections belong to
+# threads, and async views run their queries in executor threads, so the
+# wrappers travel with the request context instead of being attached to
+# one thread's connections.
+_query_observers = ContextVar("kitchen_query_observers", default=())
+
+
+def _observe_query(execute, sql, params, many, context):
+    for observer in reversed(_query_observers.get()):
+        execute = partial(observer, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_observer(connection, **kwargs):
+    """``connection_created`` receiver routing queries to the observers."""
+    if _observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_observe_query)
+
+
+@contextmanager
+def observe_queries(observer):
+    """Pass every query run in the current context through ``observer``."""
+    for connection in connections.all(initialized_only=True):
+        install_query_observer(connection)
+    token = _query_observers.set(_query_observers.get() + (observer,))
+    try:
+        yield observer
+    finally:
+        _query_observers.reset(token)
+
+
+class RequestTimings:
+    """Timings collected for one request by ``PerformanceMiddleware``."""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.db_queries += 1
+
+    def render_started(self):
+        self._render_started = perf_counter()
+
+    def render_finished(self, response):
+        if self._render_started is not None:
+            self.template_time += perf_counter() - self._render_started
+            self._render_started = None
+
+
+class PerformanceMiddleware:
+    """
+    Measure DB query count/time, template render time and total time for
+    every request. The numbers go out as a ``Server-Timing`` header and
+    into the per-view histograms in ``kitchen.metrics``.
+
+    Template time is measured for ``TemplateResponse`` objects; views
+    that render eagerly report it as part of the view time.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = request.timings = RequestTimings()
+        start = perf_counter()
+        with observe_queries(timings):
+            response = self.get_response(request)
+        return self.record(request, response, perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = request.timings = RequestTimings()
+        start = perf_counter()
+        with observe_queries(timings):
+            response = await self.get_response(request)
+        return self.record(request, response, perf_counter() - start)
+
+    def record(self, request, response, total):
+        timings = request.timings
+        view_time = total - timings.template_time
+
+        if settings.KITCHEN_SERVER_TIMING:
+            response["Server-Timing"] = ", ".join((
+                f'db;dur={timings.db_time * 1000:.1f};'
+                f'desc="{timings.db_queries} queries"',
+                f"tpl;dur={timings.template_time * 1000:.1f}",
+                f"view;dur={view_time * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ))
+
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            view = match.view_name
+            registry.observe(
+                "kitchen_request_duration_seconds", total, view=view
+            )
+            registry.observe(
+                "kitchen_view_duration_seconds", view_time, view=view
+            )
+            registry.observe(
+                "kitchen_template_duration_seconds",
+                timings.template_time,
+                view=view,
+            )
+            registry.observe(
+                "kitchen_db_duration_seconds", timings.db_time, view=view
+            )
+            registry.observe(
+                "kitchen_db_queries",
+                timings.db_queries,
+                buckets=QUERY_COUNT_BUCKETS,
+                view=view,
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        timings = request.timings
+        timings.render_started()
+        response.add_post_render_callback(timings.render_finished)
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Report queries repeated from one call site within a request.
+
+    ``settings.KITCHEN_NPLUSONE_MODE`` is ``"log"`` to log a warning,
+    ``"raise"`` to raise ``NPlusOneError`` (used by the test suite) or
+    ``None`` to disable the check.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.KITCHEN_NPLUSONE_MODE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with observe_queries(self.detector()) as detector:
+            response = self.get_response(request)
+        self.report(request, detector)
+        return response
+
+    async def __acall__(self, request):
+        with observe_queries(self.detector()) as detector:
+            response = await self.get_response(request)
+        self.report(request, detector)
+        return response
+
+    def detector(self):
+        return QueryRepeatDetector(settings.KITCHEN_NPLUSONE_THRESHOLD)
+
+    def report(self, request, detector):
+        offenders = detector.offenders()
+        if offenders:
+            message = format_offenders(request.path, offenders)
+            if settings.KITCHEN_NPLUSONE_MODE == "raise":
+                raise NPlusOneError(message)
+            nplusone_logger.warning(message)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pin the reads of each request to a replica or to the primary; see
+    ``kitchen.routing``. Goes after ``SessionMiddleware``, which stores
+    the stickiness window. Unused without ``KITCHEN_READ_REPLICAS``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.KITCHEN_READ_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        view = self.resolve_view(request)
+        alias = None
+        if view is not None and is_write(request, view):
+            request.session[STICKY_SESSION_KEY] = sticky_until()
+        elif view is not None and uses_replica(view):
+            if not is_sticky(request.session.get(STICKY_SESSION_KEY)):
+                alias = choose_replica()
+        with reading_from(alias):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        view = self.resolve_view(request)
+        alias = None
+        if view is not None and is_write(request, view):
+            await request.session.aset(STICKY_SESSION_KEY, sticky_until())
+        elif view is not None and uses_replica(view):
+            until = await request.session.aget(STICKY_SESSION_KEY)
+            if not is_sticky(until):
+                alias = choose_replica()
+        with reading_from(alias):
+            return await self.get_response(request)
+
+    def resolve_view(self, request):
+        try:
+            return resolve(
+                request.path_info, getattr(request, "urlconf", None)
+            ).func
+        except Resolver404:
+            return None
@@ -0,0 +1,87 @@
+from django.db import migrations, transaction
+
+# The search columns as of this migration. The SQL is spelled out here
+# so later changes to kitchen.search don't rewrite migration history.
+SEARCH_COLUMNS = {
+    'kitchen_dish': ('name',),
+    'kitchen_dishtype': ('name',),
+    'kitchen_ingredient': ('name',),
+    'kitchen_cook': ('username', 'first_name', 'last_name'),
+}
+
+
+def sqlite_statements(table, columns):
+    search_table = f'{table}_search'
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    delete_old = (
+        f'INSERT INTO {search_table}({search_table}, rowid, {column_list}) '
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = (
+        f'INSERT INTO {search_table}(rowid, {column_list}) '
+        f'VALUES (new.id, {new_values});'
+    )
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {search_table} '
+        f"USING fts5({column_list}, content='{table}', "
+        f"content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {search_table}_ai '
+        f'AFTER INSERT ON {table} BEGIN {insert_new} END',
+        f'CREATE TRIGGER IF NOT EXISTS {search_table}_ad '
+        f'AFTER DELETE ON {table} BEGIN {delete_old} END',
+        f'CREATE TRIGGER IF NOT EXISTS {search_table}_au '
+        f'AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END',
+        f"INSERT INTO {search_table}({search_table}) VALUES ('rebuild')",
+    ]
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                schema_editor.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS '
+                    f'{table}_{column}_trgm '
+                    f'ON {table} USING gin ({column} gin_trgm_ops)'
+                )
+    elif vendor == 'sqlite':
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for table, columns in SEARCH_COLUMNS.items():
+                for statement in sqlite_statements(table, columns):
+                    schema_editor.execute(statement)
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                schema_editor.execute(
+                    f'DROP INDEX CONCURRENTLY IF EXISTS {table}_{column}_trgm'
+                )
+    elif vendor == 'sqlite':
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for table in SEARCH_COLUMNS:
+                search_table = f'{table}_search'
+                for suffix in ('ai', 'ad', 'au'):
+                    schema_editor.execute(
+                        f'DROP TRIGGER IF EXISTS {search_table}_{suffix}'
+                    )
+                schema_editor.execute(f'DROP TABLE IF EXISTS {search_table}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('kitchen', '0003_alter_suggestion_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import migrations, models
+
+COUNTED_MODELS = {
+    "dishes": "kitchen.Dish",
+    "ingredients": "kitchen.Ingredient",
+    "dish_types": "kitchen.DishType",
+    "cooks": settings.AUTH_USER_MODEL,
+}
+
+
+def seed_counters(apps, schema_editor):
+    counter = apps.get_model("kitchen", "DashboardCounter")
+    counter.objects.bulk_create(
+        counter(name=name, value=apps.get_model(label).objects.count())
+        for name, label in COUNTED_MODELS.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kitchen', '0004_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('name', models.CharField(max_length=63, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
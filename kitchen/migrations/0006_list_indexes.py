@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+from kitchen.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('kitchen', '0005_dashboardcounter'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='dish',
+            index=models.Index(fields=['name', 'id'], name='dish_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='dishtype',
+            index=models.Index(
+                fields=['name', 'id'], name='dishtype_name_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='ingredient',
+            index=models.Index(
+                fields=['name', 'id'], name='ingredient_name_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='suggestion',
+            index=models.Index(
+                fields=['approved', '-created_at', 'id'],
+                name='suggestion_order_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='suggestion',
+            index=models.Index(
+                fields=['cook', 'approved', '-created_at', 'id'],
+                name='suggestion_cook_order_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kitchen', '0006_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitCount',
+            fields=[
+                ('cook', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='visit_count', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
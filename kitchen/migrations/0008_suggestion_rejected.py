@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kitchen', '0007_visitcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestion',
+            name='rejected',
+            field=models.BooleanField(default=False),
+        ),
+    ]
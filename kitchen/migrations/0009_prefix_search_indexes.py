@@ -0,0 +1,46 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from kitchen.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('kitchen', '0008_suggestion_rejected'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='cook',
+            index=models.Index(
+                django.db.models.functions.text.Lower('username'),
+                models.F('id'),
+                name='cook_username_lower_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='cook',
+            index=models.Index(
+                django.db.models.functions.text.Lower('first_name'),
+                name='cook_first_lower_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='cook',
+            index=models.Index(
+                django.db.models.functions.text.Lower('last_name'),
+                name='cook_last_lower_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='ingredient',
+            index=models.Index(
+                django.db.models.functions.text.Lower('name'),
+                models.F('id'),
+                name='ingredient_name_lower_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# model -> (model holding the dishes link, its column pointing at model)
+COUNTED_RELATIONS = {
+    "kitchen.DishType": ("kitchen.Dish", "dish_type"),
+    "kitchen.Ingredient": ("kitchen.Dish_ingredients", "ingredient"),
+    settings.AUTH_USER_MODEL: ("kitchen.Dish_cooks", "cook"),
+}
+
+
+def fill_dish_counts(apps, schema_editor):
+    for label, (through_label, column) in COUNTED_RELATIONS.items():
+        through = apps.get_model(through_label)
+        apps.get_model(label).objects.update(
+            dish_count=Coalesce(
+                Subquery(
+                    through.objects.filter(**{column: OuterRef("pk")})
+                    .order_by()
+                    .values(column)
+                    .annotate(total=Count("pk"))
+                    .values("total")
+                ),
+                Value(0),
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kitchen', '0009_prefix_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cook',
+            name='dish_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='dishtype',
+            name='dish_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='dish_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_dish_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+from kitchen.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('kitchen', '0010_dish_counts'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='cook',
+            index=models.Index(
+                fields=['-dish_count', 'id'], name='cook_popular_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='dishtype',
+            index=models.Index(
+                fields=['-dish_count', 'id'], name='dishtype_popular_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='ingredient',
+            index=models.Index(
+                fields=['-dish_count', 'id'], name='ingredient_popular_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def _linked(through, target, name):
+    linked = defaultdict(list)
+    for dish_id, pk, label in (
+        through.objects.order_by(
+            'dish_id', f'{target}__{name}', f'{target}_id'
+        ).values_list('dish_id', f'{target}_id', f'{target}__{name}')
+    ):
+        linked[dish_id].append((pk, label))
+    return linked
+
+
+def build_cards(apps, schema_editor):
+    Dish = apps.get_model('kitchen', 'Dish')
+    DishCard = apps.get_model('kitchen', 'DishCard')
+    ingredients = _linked(
+        apps.get_model('kitchen', 'Dish_ingredients'), 'ingredient', 'name'
+    )
+    cooks = _linked(
+        apps.get_model('kitchen', 'Dish_cooks'), 'cook', 'username'
+    )
+    DishCard.objects.bulk_create(
+        (
+            DishCard(
+                dish_id=dish.pk,
+                name=dish.name,
+                description=dish.description,
+                excerpt=Truncator(dish.description).words(10),
+                price=dish.price,
+                dish_type_id=dish.dish_type_id,
+                dish_type_name=dish.dish_type.name,
+                ingredient_ids=sorted(pk for pk, _ in ingredients[dish.pk]),
+                ingredient_names=[name for _, name in ingredients[dish.pk][:2]],
+                cook_ids=sorted(pk for pk, _ in cooks[dish.pk]),
+                cook_names=[name for _, name in cooks[dish.pk][:2]],
+            )
+            for dish in Dish.objects.select_related('dish_type').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kitchen', '0011_dish_count_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DishCard',
+            fields=[
+                ('dish', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='kitchen.dish')),
+                ('name', models.CharField(max_length=63)),
+                ('description', models.TextField()),
+                ('excerpt', models.CharField(max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('dish_type_name', models.CharField(max_length=63)),
+                ('ingredient_ids', models.JSONField(default=list)),
+                ('ingredient_names', models.JSONField(default=list)),
+                ('cook_ids', models.JSONField(default=list)),
+                ('cook_names', models.JSONField(default=list)),
+                ('dish_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kitchen.dishtype')),
+            ],
+            options={
+                'ordering': ['name', 'dish'],
+                'indexes': [models.Index(fields=['name', 'dish'], name='dishcard_name_idx')],
+            },
+        ),
+        migrations.RunPython(build_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from kitchen.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('kitchen', '0012_dishcard'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='dish',
+            index=models.Index(
+                django.db.models.functions.text.Lower('name'),
+                models.F('id'),
+                name='dish_name_lower_idx',
+            ),
+        ),
+    ]
@@ -1,24 +1,64 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class DishType(models.Model):
     name = models.CharField(max_length=63)
+    # kept by kitchen.dish_counts
+    dish_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "id"], name="dishtype_name_idx"),
+            models.Index(
+                fields=["-dish_count", "id"], name="dishtype_popular_idx"
+            ),
+        ]
+
 
 class Ingredient(models.Model):
     name = models.CharField(max_length=63)
+    # kept by kitchen.dish_counts
+    dish_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "id"], name="ingredient_name_idx"),
+            # prefix search for the dish form autocomplete
+            models.Index(
+                Lower("name"), "id", name="ingredient_name_lower_idx"
+            ),
+            models.Index(
+                fields=["-dish_count", "id"], name="ingredient_popular_idx"
+            ),
+        ]
+
 
 class Cook(AbstractUser):
     years_of_experience = models.IntegerField(default=0)
+    # kept by kitchen.dish_counts
+    dish_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        # prefix search for the dish form autocomplete
+        indexes = [
+            models.Index(
+                Lower("username"), "id", name="cook_username_lower_idx"
+            ),
+            models.Index(Lower("first_name"), name="cook_first_lower_idx"),
+            models.Index(Lower("last_name"), name="cook_last_lower_idx"),
+            models.Index(
+                fields=["-dish_count", "id"], name="cook_popular_idx"
+            ),
+        ]
 
 
 class Dish(models.Model):
@@ -45,6 +85,11 @@ class Dish(models.Model):
     class Meta:
         verbose_name = "dish"
         verbose_name_plural = "dishes"
+        indexes = [
+            models.Index(fields=["name", "id"], name="dish_name_idx"),
+            # prefix search for the cook assignment autocomplete
+            models.Index(Lower("name"), "id", name="dish_name_lower_idx"),
+        ]
 
 
 class Suggestion(models.Model):
@@ -61,9 +106,88 @@ class Suggestion(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     text = models.TextField()
     approved = models.BooleanField(default=False)
+    rejected = models.BooleanField(default=False)
 
     def __str__(self):
         return f"Suggestion by {self.cook.username} on {self.dish.name}"
 
     class Meta:
         ordering = ["approved", "-created_at"]
+        indexes = [
+            # the list ordering, with id as the keyset tie-breaker
+            models.Index(
+                fields=["approved", "-created_at", "id"],
+                name="suggestion_order_idx",
+            ),
+            # a cook's own suggestions, in list order
+            models.Index(
+                fields=["cook", "approved", "-created_at", "id"],
+                name="suggestion_cook_order_idx",
+            ),
+        ]
+
+
+class DashboardCounter(models.Model):
+    name = models.CharField(max_length=63, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.value}"
+
+
+class VisitCount(models.Model):
+    cook = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="visit_count"
+    )
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.cook_id}: {self.value}"
+
+
+class DishCard(models.Model):
+    """
+    What the dish list and the dish API show of a dish, one row per dish
+    kept current by kitchen.cards.
+    """
+
+    dish = models.OneToOneField(
+        Dish,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="card"
+    )
+    name = models.CharField(max_length=63)
+    description = models.TextField()
+    excerpt = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=6, decimal_places=2)
+    dish_type = models.ForeignKey(
+        DishType,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    dish_type_name = models.CharField(max_length=63)
+    ingredient_ids = models.JSONField(default=list)
+    ingredient_names = models.JSONField(default=list)
+    cook_ids = models.JSONField(default=list)
+    cook_names = models.JSONField(default=list)
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def ingredient_count(self) -> int:
+        return len(self.ingredient_ids)
+
+    @property
+    def cook_count(self) -> int:
+        return len(self.cook_ids)
+
+    class Meta:
+        ordering = ["name", "dish"]
+        indexes = [
+            models.Index(fields=["name", "dish"], name="dishcard_name_idx"),
+        ]
@@ -0,0 +1,33 @@
+"""
+Approving and rejecting suggestions in bulk.
+
+``moderate`` decides any number of suggestions with one
+``UPDATE ... WHERE id IN (...)`` per ``MODERATION_BATCH_SIZE`` ids,
+instead of loading and saving each row. Rows that already carry the
+decision are left alone, so the count returned is what really changed.
+"""
+from django.db import transaction
+
+from kitchen.bulk import after_bulk_write
+from kitchen.models import Suggestion
+
+MODERATION_BATCH_SIZE = 500
+
+
+def moderate(suggestion_ids, approve, batch_size=MODERATION_BATCH_SIZE):
+    """
+    Approve (or, with ``approve=False``, reject) the suggestions with
+    ``suggestion_ids``; returns the number of rows updated.
+    """
+    ids = sorted(set(suggestion_ids))
+    updated = 0
+    with transaction.atomic():
+        for start in range(0, len(ids), batch_size):
+            updated += Suggestion.objects.filter(
+                pk__in=ids[start:start + batch_size]
+            ).exclude(
+                approved=approve, rejected=not approve
+            ).update(approved=approve, rejected=not approve)
+    if updated:
+        after_bulk_write(Suggestion)
+    return updated
@@ -0,0 +1,98 @@
+"""
+Detection of N+1 query patterns.
+
+Every query run while handling a request is reduced to a shape (the SQL
+with parameters and ``IN`` lists collapsed) and attributed to the
+template line or project source line that triggered it. The same shape
+coming from the same place ``threshold`` times in one request is almost
+always a lazy per-row relation access that should be prefetched.
+"""
+import logging
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+logger = logging.getLogger("kitchen.nplusone")
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_ORM_DIR = str(Path(sys.modules["django.db"].__file__).parent)
+# async views reach the ORM through asgiref's executor threads
+_ASGIREF_DIR = str(Path(sys.modules["asgiref"].__file__).parent)
+_INSTRUMENTATION = {
+    __file__,
+    str(Path(__file__).with_name("middleware.py")),
+    str(Path(__file__).with_name("plans.py")),
+    str(Path(__file__).with_name("routing.py")),
+}
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def query_shape(sql: str) -> str:
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", sql)).strip()
+
+
+def _template_site(frame):
+    node = frame.f_locals.get("self")
+    origin = getattr(node, "origin", None)
+    token = getattr(node, "token", None)
+    if origin is None or token is None:
+        return None
+    return f"{origin.template_name}:{token.lineno}"
+
+
+def _is_internal(filename) -> bool:
+    return (
+        filename.startswith((_ORM_DIR, _ASGIREF_DIR))
+        or filename in _INSTRUMENTATION
+    )
+
+
+def call_site() -> str:
+    """
+    Where the current query comes from: the innermost template node
+    being rendered, else the innermost frame outside the ORM.
+    """
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "render_annotated":
+            site = _template_site(frame)
+            if site:
+                return site
+        if fallback is None and not _is_internal(code.co_filename):
+            fallback = f"{code.co_filename}:{frame.f_lineno}"
+        frame = frame.f_back
+    return fallback or "<unknown>"
+
+
+class QueryRepeatDetector:
+    """``execute_wrapper`` counting query shapes per call site."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[(query_shape(sql), call_site())] += 1
+        return execute(sql, params, many, context)
+
+    def offenders(self):
+        return [
+            (site, shape, count)
+            for (shape, site), count in self.counts.items()
+            if count >= self.threshold
+        ]
+
+
+def format_offenders(path, offenders) -> str:
+    lines = [f"Repeated queries while handling {path}:"]
+    for site, shape, count in offenders:
+        lines.append(f"  {count}x at {site}: {shape}")
+    return "\n".join(lines)
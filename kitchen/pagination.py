@@ -0,0 +1,353 @@
+import base64
+import binascii
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+PAGINATION_OFFSET = "offset"
+PAGINATION_APPROXIMATE = "approximate"
+PAGINATION_CURSOR = "cursor"
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep full microsecond precision so datetime keys seek exactly."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values, forward=True) -> str:
+    payload = json.dumps(
+        {"d": "n" if forward else "p", "k": list(values)},
+        cls=CursorEncoder,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Return ``(values, forward)`` or raise ``ValueError``."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload["k"], payload["d"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if direction not in ("n", "p") or not isinstance(values, list):
+        raise ValueError("Malformed cursor")
+    return values, direction == "n"
+
+
+class CursorPage:
+    """Page of a keyset-paginated queryset with opaque neighbour tokens."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate by seeking past the last seen ``ordering`` key instead of
+    using OFFSET, so every page costs the same and no COUNT(*) is run.
+
+    ``ordering`` must end with a unique column (usually ``id``) so the
+    composite key is stable.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page)
+        self.fields = [name.lstrip("-") for name in self.ordering]
+        self.descending = [name.startswith("-") for name in self.ordering]
+
+    def _to_python(self, values):
+        if len(values) != len(self.fields):
+            raise ValueError("Cursor does not match ordering")
+        model = self.queryset.model
+        return [
+            model._meta.get_field(name).to_python(value)
+            for name, value in zip(self.fields, values)
+        ]
+
+    def _row_key(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name in self.fields]
+        return [getattr(row, name) for name in self.fields]
+
+    def _seek(self, values, forward):
+        clauses = []
+        for index, name in enumerate(self.fields):
+            after = self.descending[index] != forward
+            lookup = f"{name}__{'gt' if after else 'lt'}"
+            clause = Q(**{lookup: values[index]})
+            for prev_name, prev_value in zip(
+                self.fields[:index], values[:index]
+            ):
+                clause &= Q(**{prev_name: prev_value})
+            clauses.append(clause)
+        return reduce(or_, clauses)
+
+    def _order(self, forward):
+        if forward:
+            return self.ordering
+        return tuple(
+            name[1:] if name.startswith("-") else f"-{name}"
+            for name in self.ordering
+        )
+
+    def page(self, cursor=None) -> CursorPage:
+        queryset = self.queryset
+        forward = True
+        if cursor:
+            try:
+                values, forward = decode_cursor(cursor)
+                values = self._to_python(values)
+            except (ValueError, ValidationError) as exc:
+                raise Http404("Invalid cursor.") from exc
+            queryset = queryset.filter(self._seek(values, forward))
+
+        rows = list(
+            queryset.order_by(*self._order(forward))[: self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows)
+
+        has_next = has_more if forward else True
+        has_previous = bool(cursor) if forward else has_more
+        return CursorPage(
+            rows,
+            next_cursor=(
+                encode_cursor(self._row_key(rows[-1])) if has_next else None
+            ),
+            previous_cursor=(
+                encode_cursor(self._row_key(rows[0]), forward=False)
+                if has_previous
+                else None
+            ),
+        )
+
+
+def estimated_row_count(queryset):
+    """
+    Planner estimate of the table size for an unfiltered queryset on
+    Postgres, ``None`` when no cheap estimate is available.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return row[0]
+
+
+class ApproximatePage(Page):
+    """Page at or past the end of an inexact count."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def end_index(self) -> int:
+        return self.start_index() + len(self) - 1
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator whose count never scans more than ``count_limit`` rows.
+
+    Small results are counted exactly. Past the limit the Postgres
+    planner estimate is used for unfiltered querysets, otherwise the
+    count is capped at ``count_limit``. An inexact count doesn't bound
+    the page numbers: pages from its last one on read one row more than
+    they show to find out whether another page follows.
+    """
+
+    def __init__(self, *args, count_limit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_limit = (
+            count_limit or settings.KITCHEN_PAGINATION_COUNT_LIMIT
+        )
+
+    @cached_property
+    def _bounded_count(self):
+        """``(count, is_exact, is_capped)``."""
+        if not hasattr(self.object_list, "query"):
+            return len(self.object_list), True, False
+        capped = self.object_list[: self.count_limit].count()
+        if capped < self.count_limit:
+            return capped, True, False
+        estimate = estimated_row_count(self.object_list)
+        if estimate is not None and estimate > capped:
+            return estimate, False, False
+        return capped, False, True
+
+    @cached_property
+    def count(self):
+        return self._bounded_count[0]
+
+    @property
+    def count_is_exact(self) -> bool:
+        return self._bounded_count[1]
+
+    @property
+    def count_is_capped(self) -> bool:
+        """The count is only the lower bound ``count_limit``."""
+        return self._bounded_count[2]
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def is_probed(self, number) -> bool:
+        """Whether page ``number`` needs its rows to know if it's last."""
+        return not self.count_is_exact and number >= self.num_pages
+
+    def probed_page(self, number, rows):
+        """
+        Page ``number`` from its rows followed by at least one more, if
+        there is one.
+        """
+        rows = list(rows)
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        return ApproximatePage(
+            rows[: self.per_page],
+            number,
+            self,
+            has_next=len(rows) > self.per_page,
+        )
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_probed(number):
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self.probed_page(
+            number, self.object_list[bottom:bottom + self.per_page + 1]
+        )
+
+
+class KitchenPaginationMixin:
+    """
+    Pagination for the kitchen list views.
+
+    The mode comes from ``settings.KITCHEN_PAGINATION_MODE`` (``offset``,
+    ``approximate`` or ``cursor``); a ``cursor`` query parameter always
+    switches the request to keyset pagination over ``cursor_ordering``.
+    A ``sort`` query parameter naming one of ``sort_orderings`` orders
+    the page, and the cursor, by that ordering instead.
+    """
+
+    cursor_ordering = ("id",)
+    cursor_param = "cursor"
+    pagination_mode = None
+    sort_orderings = {}
+    sort_param = "sort"
+
+    def get_sort(self):
+        sort = self.request.GET.get(self.sort_param)
+        return sort if sort in self.sort_orderings else None
+
+    def get_cursor_ordering(self) -> tuple:
+        sort = self.get_sort()
+        return self.sort_orderings[sort] if sort else self.cursor_ordering
+
+    def get_pagination_mode(self) -> str:
+        if self.cursor_param in self.request.GET:
+            return PAGINATION_CURSOR
+        return self.pagination_mode or settings.KITCHEN_PAGINATION_MODE
+
+    def get_paginator(
+        self, queryset, per_page, orphans=0,
+        allow_empty_first_page=True, **kwargs
+    ):
+        # Only the exact count knows where the last page is.
+        wants_last = self.request.GET.get(self.page_kwarg) == "last"
+        if (
+            self.get_pagination_mode() == PAGINATION_APPROXIMATE
+            and not wants_last
+        ):
+            return ApproximateCountPaginator(
+                queryset,
+                per_page,
+                orphans=orphans,
+                allow_empty_first_page=allow_empty_first_page,
+                **kwargs,
+            )
+        return super().get_paginator(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            **kwargs,
+        )
+
+    def sort_queryset(self, queryset):
+        if self.get_sort():
+            return queryset.order_by(*self.get_cursor_ordering())
+        return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        queryset = self.sort_queryset(queryset)
+        if self.get_pagination_mode() != PAGINATION_CURSOR:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(
+            queryset, self.get_cursor_ordering(), page_size
+        )
+        page = paginator.page(self.request.GET.get(self.cursor_param))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["sort"] = self.get_sort()
+        return context
@@ -0,0 +1,129 @@
+"""
+Query plan audit for the kitchen read views.
+
+The list and detail cases of ``kitchen.benchmarking`` are requested
+through the test client while every ``SELECT`` they run is recorded;
+each distinct statement is then passed through ``EXPLAIN``. Plans that
+scan a large table without an index, or sort rows from one, are
+flagged: those are the queries that get slower as the table grows.
+"""
+import json
+
+from django.apps import apps
+from django.db import connection
+from django.test.utils import override_settings
+
+from kitchen.benchmarking import Runner
+from kitchen.middleware import observe_queries
+
+DEFAULT_MIN_ROWS = 1000
+
+
+class StatementRecorder:
+    """Query observer keeping each distinct ``SELECT`` once."""
+
+    def __init__(self):
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            self.statements.setdefault(sql, params)
+        return execute(sql, params, many, context)
+
+
+def table_sizes(using=connection):
+    """Row counts of the kitchen tables, through tables included."""
+    sizes = {}
+    with using.cursor() as cursor:
+        for model in apps.get_app_config("kitchen").get_models(
+            include_auto_created=True
+        ):
+            table = model._meta.db_table
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {using.ops.quote_name(table)}"
+            )
+            sizes[table] = cursor.fetchone()[0]
+    return sizes
+
+
+def explain(sql, params, using=connection):
+    """The plan of ``sql`` as a list of lines."""
+    with using.cursor() as cursor:
+        if using.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return list(_postgres_lines(plan[0]["Plan"]))
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _postgres_lines(node, depth=0):
+    relation = node.get("Relation Name")
+    line = node["Node Type"]
+    if relation:
+        line += f" on {relation}"
+    if node.get("Index Name"):
+        line += f" using {node['Index Name']}"
+    if node.get("Sort Key"):
+        line += f" by {', '.join(node['Sort Key'])}"
+    yield "  " * depth + line
+    for child in node.get("Plans", ()):
+        yield from _postgres_lines(child, depth + 1)
+
+
+def problems(plan, sql, large_tables, sorts_matter=True):
+    """
+    Flags for ``plan``: full scans of a table in ``large_tables`` and,
+    with ``sorts_matter``, sorts in statements reading one.
+    """
+    found = []
+    for line in plan:
+        words = line.split()
+        # SQLite: "SCAN kitchen_dish"; Postgres: "Seq Scan on kitchen_dish"
+        if words[:1] == ["SCAN"] and len(words) == 2:
+            table = words[1]
+        elif words[:3] == ["Seq", "Scan", "on"]:
+            table = words[3]
+        else:
+            continue
+        if table in large_tables:
+            found.append(f"full scan of {table}")
+    touched = [
+        table for table in sorted(large_tables) if f'"{table}"' in sql
+    ]
+    sorts = any(
+        "TEMP B-TREE" in line or line.strip().startswith("Sort")
+        for line in plan
+    )
+    if sorts_matter and sorts and touched:
+        found.append(f"sort over {', '.join(touched)}")
+    return found
+
+
+def audit(cases, user, min_rows=DEFAULT_MIN_ROWS):
+    """
+    Yield ``(case, sql, plan, problems)`` for every distinct statement
+    the ``cases`` run. Sorts are only flagged on list pages; a detail
+    page sorts the few rows of one object.
+    """
+    large_tables = {
+        table for table, size in table_sizes().items() if size >= min_rows
+    }
+    runner = Runner(user)
+    seen = set()
+    for case in cases:
+        recorder = StatementRecorder()
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            with observe_queries(recorder):
+                runner.request(case)
+        for sql, params in recorder.statements.items():
+            if sql in seen:
+                continue
+            seen.add(sql)
+            plan = explain(sql, params)
+            yield case, sql, plan, problems(
+                plan, sql, large_tables,
+                sorts_matter=not case.url_name.endswith("-detail"),
+            )
@@ -0,0 +1,47 @@
+"""
+Connection pool warm-up and statistics.
+
+With ``POSTGRES_POOL_MODE=pool`` every database alias has a psycopg pool
+per worker process. Django opens it on the first query, so the first
+requests of a fresh worker would pay for the connection handshakes;
+``warm_connections`` opens the pools when the worker loads the
+application instead. ``pool_metrics`` exposes the pool statistics on
+``/metrics/``.
+"""
+import logging
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+POOL_OPEN_TIMEOUT = 10
+
+
+def pooled_aliases():
+    return [
+        alias
+        for alias in connections
+        if connections.settings[alias].get("OPTIONS", {}).get("pool")
+    ]
+
+
+def warm_connections():
+    """Open the pools and wait until each holds its ``min_size``."""
+    for alias in pooled_aliases():
+        try:
+            connections[alias].pool.open(
+                wait=True, timeout=POOL_OPEN_TIMEOUT
+            )
+        except Exception:
+            # The pool keeps trying in the background and requests wait
+            # for it; don't keep the worker from starting.
+            logger.exception("Could not warm the %s connection pool", alias)
+
+
+def pool_metrics():
+    """Registry collector: one gauge per psycopg pool statistic."""
+    for alias in pooled_aliases():
+        stats = connections[alias].pool.get_stats()
+        for name, value in sorted(stats.items()):
+            name = name.removeprefix("pool_")
+            yield f"kitchen_db_pool_{name}", {"alias": alias}, value
@@ -0,0 +1,82 @@
+"""
+Many-to-many updates that write only the difference.
+
+``set_related`` replaces the targets of a many-to-many relation on one
+object. The current through rows are read once; the ids that were added
+go out in one ``INSERT`` (conflicts ignored, so a concurrent edit adding
+the same row doesn't fail it) and the ids that were removed in one
+``DELETE``. ``m2m_changed`` is sent with just those ids, and not at all
+when nothing changed, so the receivers in ``kitchen.signals`` bump only
+what really moved.
+"""
+from django.db import connections, router, transaction
+from django.db.models.signals import m2m_changed
+
+
+def _send(action, instance, field, pk_set, using):
+    m2m_changed.send(
+        sender=field.remote_field.through,
+        instance=instance,
+        action=action,
+        reverse=False,
+        model=field.related_model,
+        pk_set=pk_set,
+        using=using,
+    )
+
+
+def _delete_rows(connection, through, source, target, source_id, target_ids):
+    # QuerySet.delete() would first select the rows to send post_delete
+    # for each of them.
+    qn = connection.ops.quote_name
+    opts = through._meta
+    placeholders = ", ".join(["%s"] * len(target_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(opts.db_table)} "
+            f"WHERE {qn(opts.get_field(source).column)} = %s "
+            f"AND {qn(opts.get_field(target).column)} IN ({placeholders})",
+            [source_id, *sorted(target_ids)],
+        )
+
+
+def set_related(instance, name, target_ids):
+    """
+    Make ``target_ids`` the targets of the many-to-many field ``name``
+    of ``instance``; returns ``(added, removed)`` id sets.
+    """
+    field = instance._meta.get_field(name)
+    through = field.remote_field.through
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    source_id = through._meta.get_field(source).attname
+    target_id = through._meta.get_field(target).attname
+    using = router.db_for_write(through, instance=instance)
+    rows = through._default_manager.using(using)
+
+    wanted = set(target_ids)
+    with transaction.atomic(using=using, savepoint=False):
+        current = set(
+            rows.filter(**{source_id: instance.pk}).values_list(
+                target_id, flat=True
+            )
+        )
+        added, removed = wanted - current, current - wanted
+        if removed:
+            _send("pre_remove", instance, field, removed, using)
+            _delete_rows(
+                connections[using], through, source, target,
+                instance.pk, removed,
+            )
+            _send("post_remove", instance, field, removed, using)
+        if added:
+            _send("pre_add", instance, field, added, using)
+            rows.bulk_create(
+                [
+                    through(**{source_id: instance.pk, target_id: pk})
+                    for pk in sorted(added)
+                ],
+                ignore_conflicts=True,
+            )
+            _send("post_add", instance, field, added, using)
+    return added, removed
@@ -0,0 +1,218 @@
+"""
+Cached read-only snapshots of dishes and cooks.
+
+The detail, suggestion and assignment views look up the same few dishes
+and cooks on every request. ``dishes`` and ``cooks`` serve them as small
+immutable snapshots from two tiers: a bounded LRU in the worker process
+and the shared default cache. Both tiers key a snapshot by the object's
+version from ``kitchen.versions``; the receivers in ``kitchen.signals``
+bump that version whenever the object or anything the snapshot embeds
+changes, so a lookup costs one cache round trip for the version. The
+bump waits for the change to commit: a snapshot read before then is
+stored under the old version, which a lookup stops asking for right
+after the commit. Only objects missing from both tiers are read from
+the database, and always from the primary: a lagging replica could
+otherwise store an old row under the version bumped for its update.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+
+from kitchen.models import Dish, Ingredient
+from kitchen.routing import reading_from
+from kitchen.versions import get_versions
+
+
+@dataclass(frozen=True)
+class Named:
+    pk: int
+    name: str
+
+
+@dataclass(frozen=True)
+class CookSnapshot:
+    pk: int
+    username: str
+    first_name: str
+    last_name: str
+    years_of_experience: int
+    is_staff: bool
+
+
+@dataclass(frozen=True)
+class DishSnapshot:
+    pk: int
+    name: str
+    description: str
+    price: Decimal
+    dish_type: Named
+    ingredients: tuple
+    cooks: tuple
+
+    @property
+    def ingredient_ids(self) -> frozenset:
+        return frozenset(ingredient.pk for ingredient in self.ingredients)
+
+    @property
+    def cook_ids(self) -> frozenset:
+        return frozenset(cook.pk for cook in self.cooks)
+
+
+class LRUCache:
+    """Thread-safe mapping holding the ``maxsize`` latest used entries."""
+
+    def __init__(self, maxsize_setting):
+        self.maxsize_setting = maxsize_setting
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self._entries[key]
+
+    def set(self, key, value):
+        maxsize = getattr(settings, self.maxsize_setting)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Repository:
+    """
+    Snapshots of one kind of object. ``load`` takes a list of primary
+    keys and returns ``{pk: snapshot}`` for the rows that exist.
+    """
+
+    def __init__(self, namespace, model, load):
+        self.namespace = namespace
+        self.model = model
+        self.load = load
+        self.local = LRUCache("KITCHEN_SNAPSHOT_LRU_SIZE")
+
+    def _key(self, pk, version) -> str:
+        return f"kitchen:snapshot:{self.namespace}:{pk}:{version}"
+
+    def get_many(self, pks) -> dict:
+        """``{pk: snapshot}`` for the ``pks`` that exist."""
+        versions = get_versions(self.namespace, set(pks))
+        keys = {
+            pk: self._key(pk, version) for pk, version in versions.items()
+        }
+
+        found = {}
+        for pk, key in keys.items():
+            snapshot = self.local.get(key)
+            if snapshot is not None:
+                found[pk] = snapshot
+
+        missing = {key: pk for pk, key in keys.items() if pk not in found}
+        if missing:
+            for key, snapshot in cache.get_many(missing).items():
+                self.local.set(key, snapshot)
+                found[missing.pop(key)] = snapshot
+
+        if missing:
+            with reading_from(None):
+                loaded = self.load(list(missing.values()))
+            shared = {}
+            for pk, snapshot in loaded.items():
+                self.local.set(keys[pk], snapshot)
+                shared[keys[pk]] = snapshot
+            cache.set_many(shared, settings.KITCHEN_SNAPSHOT_CACHE_TIMEOUT)
+            found.update(loaded)
+        return found
+
+    def get(self, pk):
+        """The snapshot of ``pk``; raises ``model.DoesNotExist``."""
+        try:
+            return self.get_many([pk])[pk]
+        except KeyError:
+            raise self.model.DoesNotExist(
+                f"No {self.model._meta.verbose_name} with pk {pk}"
+            ) from None
+
+    def get_or_404(self, pk):
+        try:
+            return self.get(pk)
+        except self.model.DoesNotExist:
+            raise Http404(
+                f"No {self.model._meta.verbose_name} found matching the query"
+            )
+
+
+def _load_cooks(pks) -> dict:
+    return {
+        cook.pk: CookSnapshot(
+            pk=cook.pk,
+            username=cook.username,
+            first_name=cook.first_name,
+            last_name=cook.last_name,
+            years_of_experience=cook.years_of_experience,
+            is_staff=cook.is_staff,
+        )
+        for cook in get_user_model().objects.filter(pk__in=pks).only(
+            "username",
+            "first_name",
+            "last_name",
+            "years_of_experience",
+            "is_staff",
+        )
+    }
+
+
+def _load_dishes(pks) -> dict:
+    dishes = list(Dish.objects.select_related("dish_type").filter(pk__in=pks))
+    if not dishes:
+        return {}
+    ingredients = {dish.pk: [] for dish in dishes}
+    for dish_id, pk, name in Ingredient.objects.filter(
+        dishes__in=dishes
+    ).order_by("name", "pk").values_list("dishes", "pk", "name"):
+        ingredients[dish_id].append(Named(pk, name))
+    cook_ids = {dish.pk: [] for dish in dishes}
+    for dish_id, cook_id in Dish.cooks.through.objects.filter(
+        dish__in=dishes
+    ).order_by("cook_id").values_list("dish_id", "cook_id"):
+        cook_ids[dish_id].append(cook_id)
+    # Cooks are shared between dishes; most come from their own cache.
+    all_cooks = cooks.get_many(
+        {pk for pks in cook_ids.values() for pk in pks}
+    )
+    return {
+        dish.pk: DishSnapshot(
+            pk=dish.pk,
+            name=dish.name,
+            description=dish.description,
+            price=dish.price,
+            dish_type=Named(dish.dish_type.pk, dish.dish_type.name),
+            ingredients=tuple(ingredients[dish.pk]),
+            cooks=tuple(
+                all_cooks[pk] for pk in cook_ids[dish.pk] if pk in all_cooks
+            ),
+        )
+        for dish in dishes
+    }
+
+
+cooks = Repository("cook", get_user_model(), _load_cooks)
+
+dishes = Repository("dish", Dish, _load_dishes)
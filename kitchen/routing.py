@@ -0,0 +1,134 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+``ReplicaRouter`` sends reads to the alias pinned for the current
+context by ``ReplicaRoutingMiddleware`` and everything else to
+``default``. The middleware pins a replica from
+``settings.KITCHEN_READ_REPLICAS`` for GET/HEAD requests to views
+marked ``use_replica`` (the conditional-GET list and detail views),
+unless the session wrote within the last
+``settings.KITCHEN_REPLICA_STICKY_SECONDS``: a cook who just edited
+something keeps reading from the primary until the replicas caught up.
+POSTs and views decorated with ``primary`` are writes; they run on the
+primary and start the stickiness window.
+
+Everyone else may read a replica that hasn't caught up with a write yet,
+but must not cache what they read under the versions and watermarks
+bumped for it. The conditional views wrap their rendering in
+``settled_reads``, which goes back to the primary for as long after the
+last change to what they show.
+"""
+import random
+from contextvars import ContextVar
+from contextlib import contextmanager
+from time import perf_counter, time
+
+from django.conf import settings
+
+from kitchen.metrics import registry
+
+STICKY_SESSION_KEY = "_kitchen_primary_until"
+
+_read_alias = ContextVar("kitchen_read_alias", default=None)
+
+registry.describe(
+    "kitchen_db_alias_queries_total", "Queries run, per database alias."
+)
+registry.describe(
+    "kitchen_db_alias_query_seconds_total",
+    "Time spent running queries, per database alias.",
+)
+
+
+def primary(view):
+    """Mark a function view that writes despite being a GET."""
+    view.writes = True
+    return view
+
+
+def choose_replica():
+    replicas = settings.KITCHEN_READ_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def reading_from(alias):
+    """Route the reads of the current context to ``alias``."""
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+@contextmanager
+def settled_reads(changed_at):
+    """
+    Read from the primary inside the block while the replicas may still
+    lag behind a change at ``changed_at``, a timestamp in whole seconds;
+    yields whether it does.
+    """
+    window = settings.KITCHEN_REPLICA_STICKY_SECONDS + 1
+    if _read_alias.get() is not None and changed_at + window > time():
+        with reading_from(None):
+            yield True
+    else:
+        yield False
+
+
+def is_write(request, view):
+    return request.method not in ("GET", "HEAD", "OPTIONS") or getattr(
+        view, "writes", False
+    )
+
+
+def uses_replica(view):
+    return getattr(getattr(view, "view_class", view), "use_replica", False)
+
+
+def sticky_until():
+    """When the stickiness window of a write starting now ends."""
+    return time() + settings.KITCHEN_REPLICA_STICKY_SECONDS
+
+
+def is_sticky(until):
+    return until is not None and until > time()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Sessions are written on the way out of the request that read
+        # them, so they always come from the primary.
+        if model._meta.app_label == "sessions":
+            return "default"
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, objects from either can relate.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.KITCHEN_READ_REPLICAS
+
+
+def count_alias_queries(execute, sql, params, many, context):
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        alias = context["connection"].alias
+        registry.increment("kitchen_db_alias_queries_total", alias=alias)
+        registry.increment(
+            "kitchen_db_alias_query_seconds_total",
+            perf_counter() - start,
+            alias=alias,
+        )
+
+
+def install_alias_metrics(connection, **kwargs):
+    """``connection_created`` receiver counting queries per alias."""
+    if count_alias_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_alias_queries)
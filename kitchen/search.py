@@ -0,0 +1,343 @@
+"""
+Indexed substring search for the kitchen list views.
+
+Postgres matches with ``ILIKE '%term%'`` on the bare column, the form the
+trigram GIN indexes answer (Django's ``icontains`` wraps the column in
+``UPPER()``, which they can't), and ranks by trigram similarity. SQLite
+keeps an FTS5 ``trigram`` shadow table per searchable model in sync
+through triggers and ranks with bm25. Any other database falls back to
+plain ``icontains`` filtering.
+
+``prefix_search`` serves autocomplete instead: it matches the start of a
+field as a range over ``LOWER(field)``, which the ``*_lower_idx``
+expression indexes answer on every database, in index order.
+"""
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Lower
+from django.db.models.lookups import IContains
+from django.utils.module_loading import import_string
+
+# model label -> columns matched by a search query
+SEARCH_FIELDS = {
+    "kitchen.dish": ("name",),
+    "kitchen.dishtype": ("name",),
+    "kitchen.ingredient": ("name",),
+    "kitchen.cook": ("username", "first_name", "last_name"),
+}
+
+# FTS5 trigram queries need at least three characters
+MIN_TRIGRAM_LENGTH = 3
+
+
+def search_fields(model):
+    return SEARCH_FIELDS[model._meta.label_lower]
+
+
+def fts_table(model) -> str:
+    return f"{model._meta.db_table}_search"
+
+
+class SubstringSearchBackend:
+    """Unindexed ``icontains`` matching, used where nothing better exists."""
+
+    def lookup(self, model, query):
+        return reduce(
+            or_,
+            (
+                Q(**{f"{field}__icontains": query})
+                for field in search_fields(model)
+            ),
+        )
+
+    def matching(self, model, query):
+        return model._default_manager.filter(
+            self.lookup(model, query)
+        ).values("pk")
+
+    def rank(self, model, query, outer=None):
+        return None
+
+    def search(self, queryset, query, model=None):
+        if model is None or model is queryset.model:
+            model = queryset.model
+            queryset = queryset.filter(self.lookup(model, query))
+        else:
+            # matched against the indexed source table
+            queryset = queryset.filter(pk__in=self.matching(model, query))
+        rank = self.rank(model, query, queryset.model)
+        if rank is None:
+            return queryset
+        return queryset.annotate(search_rank=rank).order_by(
+            F("search_rank").desc(), "pk"
+        )
+
+
+class TrigramIContains(IContains):
+    """
+    ``icontains`` compiled to ``column ILIKE '%term%'`` on Postgres, so
+    the ``gin_trgm_ops`` indexes on the plain columns can serve it.
+    """
+
+    lookup_name = "trigram_icontains"
+
+    def as_sql(self, compiler, connection):
+        return IContains(self.lhs, self.rhs).as_sql(compiler, connection)
+
+    def as_postgresql(self, compiler, connection):
+        lhs_sql, params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs_sql} ILIKE {rhs_sql}", [*params, *rhs_params]
+
+
+class TrigramSearchBackend(SubstringSearchBackend):
+    """
+    Postgres backend. Matches with ``TrigramIContains``, which the
+    ``gin_trgm_ops`` indexes created in migration 0004 serve.
+    """
+
+    def lookup(self, model, query):
+        return reduce(
+            or_,
+            (
+                Q(TrigramIContains(F(field), query))
+                for field in search_fields(model)
+            ),
+        )
+
+    def rank(self, model, query, outer=None):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        similarities = [
+            TrigramWordSimilarity(Value(query), field)
+            for field in search_fields(model)
+        ]
+        if len(similarities) == 1:
+            return similarities[0]
+        return Greatest(*similarities, output_field=FloatField())
+
+
+class FTS5SearchBackend(SubstringSearchBackend):
+    """SQLite backend matching against the FTS5 trigram shadow tables."""
+
+    @staticmethod
+    def match_expression(query) -> str:
+        return '"{}"'.format(query.replace('"', '""'))
+
+    def matching(self, model, query):
+        if len(query) < MIN_TRIGRAM_LENGTH:
+            return super().matching(model, query)
+        table = fts_table(model)
+        return RawSQL(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s",
+            [self.match_expression(query)],
+        )
+
+    def rank(self, model, query, outer=None):
+        if len(query) < MIN_TRIGRAM_LENGTH:
+            return None
+        table = fts_table(model)
+        outer = outer or model
+        # bm25 is negative with better matches lower, flip it so higher
+        # ranks sort first like the other backends.
+        return RawSQL(
+            f"SELECT -rank FROM {table} "
+            f"WHERE {table} MATCH %s "
+            f"AND rowid = {outer._meta.db_table}.{outer._meta.pk.column}",
+            [self.match_expression(query)],
+            output_field=FloatField(),
+        )
+
+    def search(self, queryset, query, model=None):
+        model = model or queryset.model
+        if len(query) < MIN_TRIGRAM_LENGTH:
+            return super().search(queryset, query, model)
+        return queryset.filter(
+            pk__in=self.matching(model, query)
+        ).annotate(
+            search_rank=self.rank(model, query, queryset.model)
+        ).order_by(F("search_rank").desc(), "pk")
+
+
+VENDOR_BACKENDS = {
+    "postgresql": TrigramSearchBackend,
+    "sqlite": FTS5SearchBackend,
+}
+
+
+@lru_cache
+def _backend_for(vendor, backend_path):
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(vendor, SubstringSearchBackend)()
+
+
+def get_search_backend(using="default"):
+    return _backend_for(
+        connections[using].vendor,
+        getattr(settings, "KITCHEN_SEARCH_BACKEND", None),
+    )
+
+
+def search(queryset, query, model=None):
+    """
+    Filter ``queryset`` down to rows matching ``query``, best first.
+    Given ``model``, the rows are matched as that model's rows: for a
+    read model sharing its primary keys and search field names.
+    """
+    return get_search_backend(queryset.db).search(queryset, query, model)
+
+
+def search_related(queryset, relation, query):
+    """Filter ``queryset`` by a search against the ``relation`` FK target."""
+    related_model = queryset.model._meta.get_field(relation).related_model
+    backend = get_search_backend(queryset.db)
+    return queryset.filter(
+        **{f"{relation}__in": backend.matching(related_model, query)}
+    )
+
+
+def _searchable_models(apps=None):
+    if apps is None:
+        from django.apps import apps
+
+    return [apps.get_model(label) for label in SEARCH_FIELDS]
+
+
+def _postgres_statements(model):
+    table = model._meta.db_table
+    for field in search_fields(model):
+        column = model._meta.get_field(field).column
+        yield (
+            f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm "
+            f"ON {table} USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def _sqlite_statements(model):
+    table = model._meta.db_table
+    search_table = fts_table(model)
+    pk = model._meta.pk.column
+    columns = [
+        model._meta.get_field(field).column for field in search_fields(model)
+    ]
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    delete_old = (
+        f"INSERT INTO {search_table}({search_table}, rowid, {column_list}) "
+        f"VALUES ('delete', old.{pk}, {old_values});"
+    )
+    insert_new = (
+        f"INSERT INTO {search_table}(rowid, {column_list}) "
+        f"VALUES (new.{pk}, {new_values});"
+    )
+    yield (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {search_table} "
+        f"USING fts5({column_list}, content='{table}', "
+        f"content_rowid='{pk}', tokenize='trigram')"
+    )
+    yield (
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_ai "
+        f"AFTER INSERT ON {table} BEGIN {insert_new} END"
+    )
+    yield (
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_ad "
+        f"AFTER DELETE ON {table} BEGIN {delete_old} END"
+    )
+    yield (
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_au "
+        f"AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END"
+    )
+
+
+def install_search_indexes(connection, apps=None):
+    """
+    Create the search indexes for ``connection`` if they are missing.
+
+    Safe to run repeatedly. On SQLite a table rebuild during a later
+    migration drops the sync triggers, so the FTS tables are rebuilt
+    whenever a trigger had to be recreated.
+    """
+    models = _searchable_models(apps)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for model in models:
+                for statement in _postgres_statements(model):
+                    cursor.execute(statement)
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            for model in models:
+                search_table = fts_table(model)
+                for statement in _sqlite_statements(model):
+                    cursor.execute(statement)
+                if f"{search_table}_ai" not in existing:
+                    cursor.execute(
+                        f"INSERT INTO {search_table}({search_table}) "
+                        f"VALUES ('rebuild')"
+                    )
+
+
+def remove_search_indexes(connection, apps=None):
+    models = _searchable_models(apps)
+    with connection.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            if connection.vendor == "postgresql":
+                for field in search_fields(model):
+                    column = model._meta.get_field(field).column
+                    cursor.execute(
+                        f"DROP INDEX IF EXISTS {table}_{column}_trgm"
+                    )
+            elif connection.vendor == "sqlite":
+                search_table = fts_table(model)
+                for suffix in ("ai", "ad", "au"):
+                    cursor.execute(
+                        f"DROP TRIGGER IF EXISTS {search_table}_{suffix}"
+                    )
+                cursor.execute(f"DROP TABLE IF EXISTS {search_table}")
+
+
+def _prefix_upper_bound(prefix) -> str:
+    """The smallest string greater than every string starting ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def prefix_search(queryset, prefix):
+    """
+    Rows of ``queryset`` with a search field starting with ``prefix``,
+    ignoring case, ordered by the first search field.
+
+    The range on ``LOWER(field)`` is what the indexes serve. Under a
+    linguistic collation it can take in a few strings that don't really
+    start with ``prefix``, so an ``istartswith`` on the same rows keeps
+    the result exact.
+    """
+    fields = search_fields(queryset.model)
+    if not prefix:
+        return queryset.order_by(Lower(fields[0]), "pk")
+    lowered = prefix.lower()
+    upper = _prefix_upper_bound(lowered)
+    aliases = {f"_prefix_{field}": Lower(field) for field in fields}
+    matches = reduce(
+        or_,
+        (
+            Q(**{
+                f"{alias}__gte": lowered,
+                f"{alias}__lt": upper,
+                f"{field}__istartswith": prefix,
+            })
+            for field, alias in zip(fields, aliases)
+        ),
+    )
+    first = next(iter(aliases))
+    return queryset.alias(**aliases).filter(matches).order_by(first, "pk")
@@ -0,0 +1,246 @@
+"""
+Deterministic synthetic data for load and performance testing.
+
+The same ``seed`` always produces the same rows. Popularity is skewed
+the way real menus are: a few ingredients appear in most dishes, a few
+cooks are assigned to many dishes and write most of the suggestions,
+and suggestions pile up on the popular dishes. Every table, through
+tables included, is written with batched ``bulk_create`` and rows are
+generated one batch at a time, so memory holds little more than the
+id lists of dishes and cooks. The whole seed is one transaction, so a
+failed run leaves nothing behind.
+"""
+import random
+from bisect import bisect
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from kitchen.bulk import after_bulk_write
+from kitchen.models import Dish, DishType, Ingredient, Suggestion
+
+DEFAULT_BATCH_SIZE = 5000
+# zipf exponent of the popularity curves
+SKEW = 1.1
+SUGGESTION_HISTORY_DAYS = 730
+
+DISH_TYPES = (
+    "Starter", "Soup", "Salad", "Main", "Pasta", "Pizza", "Grill",
+    "Seafood", "Vegetarian", "Side", "Dessert", "Drink",
+)
+ADJECTIVES = (
+    "Smoky", "Crispy", "Spicy", "Roasted", "Creamy", "Grilled", "Braised",
+    "Tangy", "Herbed", "Glazed", "Rustic", "Golden", "Zesty", "Slow-cooked",
+)
+BASES = (
+    "Chicken", "Beef", "Lamb", "Pork", "Salmon", "Tuna", "Shrimp",
+    "Tofu", "Mushroom", "Eggplant", "Lentil", "Chickpea", "Potato",
+    "Pumpkin", "Duck", "Cod", "Halloumi", "Risotto", "Gnocchi", "Noodle",
+)
+INGREDIENTS = (
+    "Salt", "Olive oil", "Garlic", "Onion", "Butter", "Black pepper",
+    "Tomato", "Lemon", "Parsley", "Basil", "Flour", "Egg", "Cream",
+    "Parmesan", "Chili", "Thyme", "Rosemary", "Ginger", "Soy sauce",
+    "Carrot", "Celery", "Rice", "Honey", "Paprika", "Cumin", "Coriander",
+    "Mint", "Spinach", "Feta", "Mozzarella", "Shallot", "Vinegar",
+)
+FIRST_NAMES = (
+    "Anna", "Marco", "Olena", "James", "Sofia", "Taras", "Emma", "Luca",
+    "Iryna", "Noah", "Mia", "Andrii", "Chloe", "Hugo", "Yuki", "Omar",
+)
+LAST_NAMES = (
+    "Kovalenko", "Rossi", "Smith", "Garcia", "Shevchenko", "Muller",
+    "Dubois", "Tanaka", "Silva", "Novak", "Brown", "Bondar", "Moreau",
+)
+SUGGESTION_TEXTS = (
+    "Use less salt.",
+    "Serve it warmer.",
+    "Add more herbs on top.",
+    "The portion could be bigger.",
+    "Try a crispier crust.",
+    "Offer a vegetarian version.",
+    "Plate it on the slate boards.",
+    "Cut the cooking time a little.",
+)
+
+
+class Popularity:
+    """Weighted picks over ``items`` following a zipf curve."""
+
+    def __init__(self, items, rng, skew=SKEW):
+        self.items = list(items)
+        # shuffle so popularity doesn't follow insertion order
+        rng.shuffle(self.items)
+        self.rng = rng
+        self.cumulative = list(accumulate(
+            1 / (rank + 1) ** skew for rank in range(len(self.items))
+        ))
+
+    def pick(self):
+        total = self.cumulative[-1]
+        index = bisect(self.cumulative, self.rng.random() * total)
+        return self.items[min(index, len(self.items) - 1)]
+
+    def sample(self, count):
+        """Up to ``count`` distinct items."""
+        count = min(count, len(self.items))
+        picked = dict.fromkeys(self.pick() for _ in range(count * 2))
+        return list(picked)[:count]
+
+
+class KitchenSeeder:
+    """
+    Writes a synthetic kitchen into an empty database; ``log`` receives
+    one line per table.
+    """
+
+    def __init__(self, seed=0, batch_size=DEFAULT_BATCH_SIZE,
+                 password="kitchen", log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.password = password
+        self.log = log or (lambda message: None)
+
+    def batches(self, total, build):
+        """Yield lists of ``build(index)`` results, ``batch_size`` long."""
+        for start in range(0, total, self.batch_size):
+            stop = min(start + self.batch_size, total)
+            yield [build(index) for index in range(start, stop)]
+
+    def create(self, model, total, build, keep_ids=True, restore=()):
+        """
+        Insert ``total`` rows built by ``build(index)``; returns their
+        ids unless ``keep_ids`` is false. The built values of the
+        ``restore`` fields, which ``bulk_create`` overwrites (like
+        ``auto_now_add``), are written back with an update per batch.
+        """
+        ids = []
+        count = 0
+        for batch in self.batches(total, build):
+            values = [
+                [getattr(obj, name) for name in restore] for obj in batch
+            ]
+            created = model.objects.bulk_create(batch)
+            if restore:
+                for obj, row in zip(created, values):
+                    for name, value in zip(restore, row):
+                        setattr(obj, name, value)
+                model.objects.bulk_update(created, restore)
+            count += len(created)
+            if keep_ids:
+                ids += [obj.pk for obj in created]
+        self.log(f"{model._meta.verbose_name_plural}: {count}")
+        return ids
+
+    def link(self, through, source, pairs):
+        """Insert ``(source_id, target_id)`` pairs in batches."""
+        source_field, target_field = (
+            field.attname
+            for field in through._meta.get_fields()
+            if field.is_relation and field.many_to_one
+        )
+        if source_field != f"{source}_id":
+            source_field, target_field = target_field, source_field
+        count = 0
+        batch = []
+        for source_id, target_id in pairs:
+            batch.append(through(**{
+                source_field: source_id, target_field: target_id
+            }))
+            if len(batch) >= self.batch_size:
+                count += len(through.objects.bulk_create(batch))
+                batch = []
+        count += len(through.objects.bulk_create(batch))
+        self.log(f"{through._meta.db_table}: {count}")
+
+    @transaction.atomic
+    def run(self, dishes, cooks, ingredients, suggestions,
+            dish_types=len(DISH_TYPES)):
+        rng = self.rng
+        password = make_password(self.password)
+
+        type_ids = self.create(DishType, dish_types, lambda index: DishType(
+            name=DISH_TYPES[index % len(DISH_TYPES)]
+            + (f" {index // len(DISH_TYPES) + 1}"
+               if index >= len(DISH_TYPES) else "")
+        ))
+        ingredient_ids = self.create(
+            Ingredient, ingredients, lambda index: Ingredient(
+                name=INGREDIENTS[index % len(INGREDIENTS)]
+                + (f" {index // len(INGREDIENTS) + 1}"
+                   if index >= len(INGREDIENTS) else "")
+            )
+        )
+        cook_ids = self.create(
+            get_user_model(), cooks, lambda index: self.build_cook(
+                index, password
+            )
+        )
+        type_popularity = Popularity(type_ids, rng, skew=0.6)
+        dish_ids = self.create(Dish, dishes, lambda index: Dish(
+            name=f"{rng.choice(ADJECTIVES)} {rng.choice(BASES)}",
+            description=f"House recipe number {index + 1}.",
+            price=Decimal(
+                min(round(rng.lognormvariate(2.5, 0.5), 2), 9999.99)
+            ).quantize(Decimal("0.01")),
+            dish_type_id=type_popularity.pick(),
+        ))
+
+        if ingredient_ids:
+            ingredient_popularity = Popularity(ingredient_ids, rng)
+            self.link(Dish.ingredients.through, "dish", (
+                (dish_id, ingredient_id)
+                for dish_id in dish_ids
+                for ingredient_id in ingredient_popularity.sample(
+                    rng.randint(2, 12)
+                )
+            ))
+        if cook_ids:
+            cook_popularity = Popularity(cook_ids, rng)
+            self.link(Dish.cooks.through, "dish", (
+                (dish_id, cook_id)
+                for dish_id in dish_ids
+                for cook_id in cook_popularity.sample(
+                    min(int(rng.expovariate(0.7)), 8)
+                )
+            ))
+
+        if suggestions and dish_ids and cook_ids:
+            dish_popularity = Popularity(dish_ids, rng)
+            now = timezone.now()
+            self.create(Suggestion, suggestions, lambda index: Suggestion(
+                dish_id=dish_popularity.pick(),
+                cook_id=cook_popularity.pick(),
+                text=rng.choice(SUGGESTION_TEXTS),
+                approved=rng.random() < 0.3,
+                created_at=now - timedelta(
+                    seconds=rng.randrange(SUGGESTION_HISTORY_DAYS * 24 * 3600)
+                ),
+            ), keep_ids=False, restore=["created_at"])
+
+        after_bulk_write(
+            DishType, Ingredient, get_user_model(), Dish, Suggestion,
+            created={
+                DishType: len(type_ids),
+                Ingredient: len(ingredient_ids),
+                get_user_model(): len(cook_ids),
+                Dish: len(dish_ids),
+            },
+            dish_ids=dish_ids,
+        )
+
+    def build_cook(self, index, password):
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        return get_user_model()(
+            username=f"{first_name}.{last_name}.{index + 1}".lower(),
+            first_name=first_name,
+            last_name=last_name,
+            password=password,
+            years_of_experience=min(int(self.rng.expovariate(0.2)), 40),
+        )
@@ -0,0 +1,279 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from kitchen import cards, conditional, counters, dish_counts
+from kitchen.models import Dish, DishType, Ingredient, Suggestion
+from kitchen.versions import bump_versions
+
+
+def is_login_update(update_fields) -> bool:
+    """Saves that only record a login don't change anything we show."""
+    return update_fields is not None and set(update_fields) == {"last_login"}
+
+
+def _dish_ids(instance):
+    return instance.dishes.values_list("pk", flat=True)
+
+
+def _cascaded_from(origin, model) -> bool:
+    """Whether a delete started at ``origin``, a ``model`` row or rows."""
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
+
+
+@receiver(post_save)
+def count_created(sender, instance, created, raw=False, **kwargs):
+    name = counters.counter_for_model(sender)
+    if name and created and not raw:
+        counters.increment(name)
+
+
+@receiver(post_delete)
+def count_deleted(sender, instance, origin=None, **kwargs):
+    name = counters.counter_for_model(sender)
+    # A dish type's dishes are counted down with it, in one UPDATE.
+    if sender is Dish and _cascaded_from(origin, DishType):
+        return
+    if name:
+        counters.increment(name, -1)
+    if sender is DishType and getattr(instance, "_deleted_dishes", 0):
+        counters.increment(
+            counters.counter_for_model(Dish), -instance._deleted_dishes
+        )
+
+
+@receiver(post_save, sender=Dish)
+@receiver(post_save, sender=DishType)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=Suggestion)
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=DishType)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=Suggestion)
+@receiver(post_delete, sender=get_user_model())
+def touch_watermark(sender, update_fields=None, origin=None, **kwargs):
+    if is_login_update(update_fields):
+        return
+    # A delete touches each model it cascades to once, not once per row.
+    if origin is not None:
+        touched = getattr(origin, "_touched_watermarks", None)
+        if touched is None:
+            touched = origin._touched_watermarks = set()
+        if sender in touched:
+            return
+        touched.add(sender)
+    conditional.touch(sender)
+
+
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+@receiver(m2m_changed, sender=Dish.cooks.through)
+def touch_dish_relations_watermark(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        conditional.touch(Dish)
+
+
+@receiver(pre_save, sender=Dish)
+def remember_dish_type(sender, instance, raw=False, update_fields=None,
+                       **kwargs):
+    if raw or instance.pk is None or (
+        update_fields is not None and "dish_type" not in update_fields
+    ):
+        instance._previous_dish_type_id = None
+        return
+    instance._previous_dish_type_id = sender.objects.filter(
+        pk=instance.pk
+    ).values_list("dish_type_id", flat=True).first()
+
+
+@receiver(post_save, sender=Dish)
+def count_dish_type(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance._previous_dish_type_id
+    if created or (previous and previous != instance.dish_type_id):
+        dish_counts.adjust(DishType, [previous], -1)
+        dish_counts.adjust(DishType, [instance.dish_type_id])
+
+
+def _uncount_links(dish_ids):
+    # The through rows go away without an m2m_changed signal.
+    dish_counts.adjust_linked(
+        Ingredient, Dish.ingredients.through, "ingredient", dish_ids, -1
+    )
+    dish_counts.adjust_linked(
+        get_user_model(), Dish.cooks.through, "cook", dish_ids, -1
+    )
+
+
+@receiver(pre_delete, sender=Dish)
+def uncount_dish_relations(sender, instance, origin=None, **kwargs):
+    # A dish type's dishes are uncounted together, see below.
+    if not _cascaded_from(origin, DishType):
+        _uncount_links([instance.pk])
+
+
+@receiver(pre_delete, sender=DishType)
+def uncount_cascaded_dishes(sender, instance, **kwargs):
+    # Its dishes are deleted with it; they and their links are still
+    # there until every pre_delete has been sent.
+    instance._deleted_dishes = instance.dishes.count()
+    if instance._deleted_dishes:
+        _uncount_links(instance.dishes.values("pk"))
+
+
+@receiver(post_delete, sender=Dish)
+def uncount_dish_type(sender, instance, origin=None, **kwargs):
+    # No need to count down a dish type that is being deleted.
+    if not _cascaded_from(origin, DishType):
+        dish_counts.adjust(DishType, [instance.dish_type_id], -1)
+
+
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+@receiver(m2m_changed, sender=Dish.cooks.through)
+def count_dish_relations(sender, instance, action, reverse, model, pk_set,
+                         **kwargs):
+    delta = {"post_add": 1, "post_remove": -1}.get(action)
+    if delta and pk_set:
+        if reverse:
+            dish_counts.adjust(
+                instance._meta.model, [instance.pk], delta * len(pk_set)
+            )
+        else:
+            dish_counts.adjust(model, pk_set, delta)
+    elif action == "pre_clear":
+        if reverse:
+            dish_counts.adjust(
+                instance._meta.model, [instance.pk], -len(_dish_ids(instance))
+            )
+        else:
+            dish_counts.adjust(
+                model,
+                model._default_manager.filter(dishes=instance).values_list(
+                    "pk", flat=True
+                ),
+                -1,
+            )
+
+
+@receiver(post_save, sender=Dish)
+def refresh_dish_card(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        cards.refresh([instance.pk])
+    else:
+        cards.update_dish(instance)
+
+
+@receiver(post_save, sender=DishType)
+def rename_dish_type_on_cards(sender, instance, created, raw=False,
+                              **kwargs):
+    if not created and not raw:
+        cards.rename_dish_type(instance)
+
+
+@receiver(pre_save, sender=Ingredient)
+@receiver(pre_save, sender=get_user_model())
+def remember_shown_name(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    field = cards.shown_field(sender)
+    if raw or instance.pk is None or (
+        update_fields is not None and field not in update_fields
+    ):
+        instance._previous_shown_name = None
+        return
+    instance._previous_shown_name = sender._default_manager.filter(
+        pk=instance.pk
+    ).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=get_user_model())
+def refresh_related_cards(sender, instance, created, raw=False, **kwargs):
+    # Cards only show the name; a password or profile change keeps them.
+    previous = getattr(instance, "_previous_shown_name", None)
+    if created or raw or previous is None:
+        return
+    if previous != getattr(instance, cards.shown_field(sender)):
+        cards.refresh(_dish_ids(instance))
+
+
+@receiver(pre_delete, sender=Ingredient)
+@receiver(pre_delete, sender=get_user_model())
+def remember_card_dishes(sender, instance, **kwargs):
+    # The through rows go away without an m2m_changed signal.
+    instance._card_dish_ids = list(_dish_ids(instance))
+
+
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=get_user_model())
+def refresh_cards_after_delete(sender, instance, **kwargs):
+    cards.refresh(getattr(instance, "_card_dish_ids", ()))
+
+
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+@receiver(m2m_changed, sender=Dish.cooks.through)
+def refresh_relation_cards(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if action in ("post_add", "post_remove"):
+        cards.refresh(pk_set if reverse else [instance.pk])
+    elif action == "pre_clear" and reverse:
+        instance._card_dish_ids = list(_dish_ids(instance))
+    elif action == "post_clear":
+        cards.refresh(
+            instance._card_dish_ids if reverse else [instance.pk]
+        )
+
+
+# Registered last: outside a transaction the bumps happen right away,
+# and the cards they invalidate must already be rewritten by then.
+@receiver(post_save, sender=Dish)
+@receiver(post_delete, sender=Dish)
+def bump_dish(sender, instance, **kwargs):
+    bump_versions("dish", [instance.pk])
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def bump_cook(sender, instance, update_fields=None, **kwargs):
+    if not is_login_update(update_fields):
+        bump_versions("cook", [instance.pk])
+
+
+@receiver(post_save, sender=DishType)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=get_user_model())
+def bump_related_dishes(sender, instance, created, update_fields=None,
+                        raw=False, **kwargs):
+    if created or raw or is_login_update(update_fields):
+        return
+    bump_versions("dish", _dish_ids(instance))
+
+
+@receiver(pre_delete, sender=Ingredient)
+@receiver(pre_delete, sender=get_user_model())
+def bump_dishes_before_delete(sender, instance, **kwargs):
+    # The through rows go away without an m2m_changed signal.
+    bump_versions("dish", _dish_ids(instance))
+
+
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+@receiver(m2m_changed, sender=Dish.cooks.through)
+def bump_dish_relations(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    if action in ("post_add", "post_remove"):
+        bump_versions("dish", pk_set if reverse else [instance.pk])
+    elif action == "pre_clear":
+        bump_versions(
+            "dish", _dish_ids(instance) if reverse else [instance.pk]
+        )
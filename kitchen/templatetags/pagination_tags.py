@@ -0,0 +1,14 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj, size=2):
+    """Page numbers within ``size`` of the current page."""
+    first = max(1, page_obj.number - size)
+    last = min(page_obj.paginator.num_pages, page_obj.number + size)
+    if getattr(page_obj.paginator, "count_is_exact", True) is False:
+        # Past an inexact count only the next page is known to exist.
+        last = max(last, page_obj.number + page_obj.has_next())
+    return range(first, last + 1)
@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen.models import DishType, Ingredient, Dish, Suggestion
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        cls.cook = get_user_model().objects.create_user(
+            username="cook", password="pass"
+        )
+        cls.dish_type = DishType.objects.create(name="Soup")
+        cls.beet = Ingredient.objects.create(name="Beet")
+        cls.dill = Ingredient.objects.create(name="Dill")
+        cls.dishes = [
+            Dish.objects.create(
+                name=f"Dish {index:02}",
+                description="desc",
+                price="9.50",
+                dish_type=cls.dish_type,
+            )
+            for index in range(5)
+        ]
+        cls.dishes[0].ingredients.add(cls.beet, cls.dill)
+        cls.dishes[0].cooks.add(cls.cook, cls.staff)
+        cls.own = Suggestion.objects.create(
+            cook=cls.cook, dish=cls.dishes[0], text="More dill"
+        )
+        Suggestion.objects.create(
+            cook=cls.staff, dish=cls.dishes[1], text="Less salt"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def test_dish_list_aggregates_related_ids(self):
+        response = self.client.get(reverse("kitchen:api-dish-list"))
+        first = response.json()["results"][0]
+        self.assertEqual(first["name"], "Dish 00")
+        self.assertEqual(first["price"], "9.50")
+        self.assertEqual(first["dish_type_name"], "Soup")
+        self.assertEqual(
+            first["ingredient_ids"], sorted([self.beet.pk, self.dill.pk])
+        )
+        self.assertEqual(
+            first["cook_ids"], sorted([self.cook.pk, self.staff.pk])
+        )
+        self.assertEqual(response.json()["results"][1]["cook_ids"], [])
+
+    def test_sparse_fieldsets(self):
+        response = self.client.get(
+            reverse("kitchen:api-dish-list"), {"fields": "id,name"}
+        )
+        self.assertEqual(
+            set(response.json()["results"][0]), {"id", "name"}
+        )
+
+    def test_unknown_field_is_bad_request(self):
+        response = self.client.get(
+            reverse("kitchen:api-dish-list"), {"fields": "id,secret"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", response.json()["error"])
+
+    def test_list_runs_a_single_data_query(self):
+        self.client.get(reverse("kitchen:api-dish-list"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("kitchen:api-dish-list"))
+        data_queries = [
+            query["sql"] for query in queries
+            if 'FROM "kitchen_dish' in query["sql"]
+        ]
+        self.assertEqual(len(data_queries), 1)
+        self.assertIn('FROM "kitchen_dishcard"', data_queries[0])
+        self.assertNotIn("JOIN", data_queries[0])
+
+    def test_cursor_pagination(self):
+        url = reverse("kitchen:api-dish-list")
+        names = []
+        response = self.client.get(url, {"limit": 2, "fields": "name"})
+        while True:
+            data = response.json()
+            names += [row["name"] for row in data["results"]]
+            if data["next"] is None:
+                break
+            response = self.client.get(data["next"])
+        self.assertEqual(names, [f"Dish {index:02}" for index in range(5)])
+
+    def test_invalid_cursor_is_bad_request(self):
+        response = self.client.get(
+            reverse("kitchen:api-dish-list"), {"cursor": "garbage"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_filter(self):
+        response = self.client.get(
+            reverse("kitchen:api-ingredient-list"), {"name": "dil"}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.dill.pk, "name": "Dill", "dish_count": 1}],
+        )
+
+    def test_detail(self):
+        response = self.client.get(
+            reverse("kitchen:api-cook-detail", args=[self.cook.pk]),
+            {"fields": "username,dish_ids"},
+        )
+        self.assertEqual(
+            response.json(),
+            {"username": "cook", "dish_ids": [self.dishes[0].pk]},
+        )
+        response = self.client.get(
+            reverse("kitchen:api-cook-detail", args=[self.cook.pk + 100])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_suggestions_are_limited_to_own_for_cooks(self):
+        self.client.force_login(self.cook)
+        response = self.client.get(reverse("kitchen:api-suggestion-list"))
+        self.assertEqual(
+            [row["id"] for row in response.json()["results"]],
+            [self.own.pk],
+        )
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(reverse("kitchen:api-dish-type-list"))
+        self.assertEqual(response.status_code, 403)
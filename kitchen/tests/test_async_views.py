@@ -0,0 +1,181 @@
+import threading
+
+from asgiref.sync import iscoroutinefunction
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import include, path, resolve, reverse
+
+from kitchen import async_views
+from kitchen.models import DishType, Ingredient, Dish, Suggestion
+from kitchen.urls import build_urlpatterns
+
+urlpatterns = [
+    path(
+        "",
+        include((build_urlpatterns(async_views), "kitchen")),
+    ),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncReadViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="cook",
+            password="pass",
+            is_staff=True,
+        )
+        cls.dish_type = DishType.objects.create(name="Soup")
+        cls.ingredient = Ingredient.objects.create(name="Leek")
+        cls.dishes = [
+            Dish.objects.create(
+                name=f"Dish {index:02}",
+                description="desc",
+                price=10,
+                dish_type=cls.dish_type,
+            )
+            for index in range(20)
+        ]
+        cls.dishes[0].ingredients.add(cls.ingredient)
+        cls.dishes[0].cooks.add(cls.user)
+        cls.suggestion = Suggestion.objects.create(
+            cook=cls.user, dish=cls.dishes[0], text="More salt"
+        )
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+
+    def test_read_views_are_async(self):
+        for url in (
+            reverse("kitchen:index"),
+            reverse("kitchen:dish-list"),
+            reverse("kitchen:dish-detail", args=[self.dishes[0].pk]),
+        ):
+            with self.subTest(url=url):
+                self.assertTrue(iscoroutinefunction(resolve(url).func))
+
+    async def test_index(self):
+        response = await self.async_client.get(reverse("kitchen:index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["num_dishes"], 20)
+        self.assertEqual(response.context["num_visits"], 1)
+
+        response = await self.async_client.get(reverse("kitchen:index"))
+        self.assertEqual(response.context["num_visits"], 2)
+
+    async def test_list_and_detail_views_render(self):
+        for name, args in (
+            ("kitchen:dish-list", ()),
+            ("kitchen:ingredient-list", ()),
+            ("kitchen:dish-type-list", ()),
+            ("kitchen:cook-list", ()),
+            ("kitchen:suggestion-list", ()),
+            ("kitchen:dish-detail", (self.dishes[0].pk,)),
+            ("kitchen:dish-type-detail", (self.dish_type.pk,)),
+            ("kitchen:cook-detail", (self.user.pk,)),
+            ("kitchen:suggestion-detail", (self.suggestion.pk,)),
+        ):
+            with self.subTest(name=name):
+                response = await self.async_client.get(
+                    reverse(name, args=args)
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("ETag", response)
+
+    async def test_pagination_matches_sync_view(self):
+        url = reverse("kitchen:dish-list")
+        response = await self.async_client.get(url, {"page": 2})
+        page = response.context["page_obj"]
+        self.assertEqual(page.number, 2)
+        self.assertEqual(page.paginator.count, 20)
+        self.assertEqual(
+            [dish.name for dish in page.object_list],
+            [f"Dish {index:02}" for index in range(15, 20)],
+        )
+
+        response = await self.async_client.get(url, {"page": "last"})
+        self.assertEqual(response.context["page_obj"].number, 2)
+
+    @override_settings(
+        KITCHEN_PAGINATION_MODE="approximate",
+        KITCHEN_PAGINATION_COUNT_LIMIT=4,
+    )
+    async def test_pages_past_an_approximate_count(self):
+        url = reverse("kitchen:dish-list")
+        response = await self.async_client.get(url, {"page": 2})
+        page = response.context["page_obj"]
+        self.assertEqual(len(page.object_list), 5)
+        self.assertFalse(page.has_next())
+        response = await self.async_client.get(url, {"page": 3})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_sorted_list_matches_sync_view(self):
+        await Ingredient.objects.acreate(name="Basil")
+        response = await self.async_client.get(
+            reverse("kitchen:ingredient-list"), {"sort": "popular"}
+        )
+        self.assertEqual(
+            [i.name for i in response.context["ingredient_list"]],
+            ["Leek", "Basil"],
+        )
+
+    async def test_invalid_page_is_not_found(self):
+        url = reverse("kitchen:dish-list")
+        for page in ("3", "0", "abc"):
+            with self.subTest(page=page):
+                response = await self.async_client.get(url, {"page": page})
+                self.assertEqual(response.status_code, 404)
+
+    async def test_missing_object_is_not_found(self):
+        response = await self.async_client.get(
+            reverse("kitchen:dish-detail", args=[self.dishes[-1].pk + 100])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_unchanged_page_is_not_modified(self):
+        url = reverse("kitchen:dish-list")
+        response = await self.async_client.get(url)
+        revalidated = await self.async_client.get(
+            url, headers={"if-none-match": response["ETag"]}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    async def test_anonymous_user_is_redirected_to_login(self):
+        await self.async_client.alogout()
+        for name in ("kitchen:index", "kitchen:dish-list"):
+            with self.subTest(name=name):
+                response = await self.async_client.get(reverse(name))
+                self.assertEqual(response.status_code, 302)
+                self.assertIn(reverse("login"), response["Location"])
+
+    async def test_queries_are_counted_by_middleware(self):
+        response = await self.async_client.get(reverse("kitchen:dish-list"))
+        self.assertRegex(
+            response["Server-Timing"], r'desc="[1-9][0-9]* queries"'
+        )
+
+    async def test_gathered_queries_see_the_open_transaction(self):
+        self.assertEqual(
+            await async_views.gather_queries(
+                Dish.objects.count, Suggestion.objects.count
+            ),
+            [20, 1],
+        )
+
+
+class GatherQueriesTests(TransactionTestCase):
+    async def test_queries_overlap(self):
+        # Neither query gets past the barrier until the other reaches it,
+        # so run one after another they would break it
+        barrier = threading.Barrier(2, timeout=5)
+
+        def count():
+            barrier.wait()
+            return DishType.objects.count()
+
+        self.assertEqual(
+            await async_views.gather_queries(count, count), [0, 0]
+        )
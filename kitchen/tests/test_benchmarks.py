@@ -0,0 +1,74 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from kitchen.benchmarking import Sample, build_cases, compare, url_names
+from kitchen.models import DishType, Ingredient, Dish, Suggestion
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cook = get_user_model().objects.create_user(
+            username="gordon", password="pass"
+        )
+        dish = Dish.objects.create(
+            name="Borscht", description="Beet soup", price="7.50",
+            dish_type=DishType.objects.create(name="Soup"),
+        )
+        dish.ingredients.add(Ingredient.objects.create(name="Beet"))
+        Suggestion.objects.create(cook=cook, dish=dish, text="More dill")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_every_route_has_a_case(self):
+        covered = {case.url_name for case in build_cases(Sample())}
+        self.assertEqual(url_names() - covered, set())
+
+    def test_compare(self):
+        baseline = {
+            "dish-list": {"p50_ms": 10.0, "queries": 4, "peak_kib": 100},
+            "index": {"p50_ms": 10.0, "queries": 2, "peak_kib": 100},
+        }
+        results = {
+            "dish-list": {"p50_ms": 30.0, "queries": 4, "peak_kib": 110},
+            "index": {"p50_ms": 11.0, "queries": 3, "peak_kib": None},
+            "new-case": {"p50_ms": 1.0, "queries": 1, "peak_kib": 1},
+        }
+        self.assertEqual(compare(results, baseline), [
+            "dish-list: p50_ms 30.0 > 17.0 (baseline 10.0)",
+            "index: queries 3 > 2 (baseline 2)",
+        ])
+
+    def test_compare_with_a_case_floor(self):
+        baseline = {"export": {"p50_ms": 20.0}, "index": {"p50_ms": 20.0}}
+        results = {"export": {"p50_ms": 40.0}, "index": {"p50_ms": 40.0}}
+        self.assertEqual(
+            compare(results, baseline, floors={"export": 25.0}),
+            ["index: p50_ms 40.0 > 32.0 (baseline 20.0)"],
+        )
+
+    def test_command_saves_and_compares(self):
+        baseline = self.directory / "baseline.json"
+        options = {
+            "case": ["api-dish-list"], "iterations": 2,
+            "baseline": str(baseline), "stdout": StringIO(),
+            "stderr": StringIO(),
+        }
+        call_command("benchmark_kitchen", save_baseline=True, **options)
+        saved = json.loads(baseline.read_text())
+        self.assertEqual(list(saved["cases"]), ["api-dish-list"])
+        self.assertEqual(saved["cases"]["api-dish-list"]["queries"], 2)
+
+        saved["cases"]["api-dish-list"]["queries"] = 1
+        baseline.write_text(json.dumps(saved))
+        with self.assertRaisesMessage(CommandError, "1 regression(s)"):
+            call_command("benchmark_kitchen", **options)
@@ -0,0 +1,143 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen import cards
+from kitchen.bulk import after_bulk_write
+from kitchen.models import Dish, DishCard, DishType, Ingredient
+
+
+class DishCardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.soup = DishType.objects.create(name="Soup")
+        cls.beet = Ingredient.objects.create(name="Beet")
+        cls.dill = Ingredient.objects.create(name="Dill")
+        cls.salt = Ingredient.objects.create(name="Salt")
+        cls.cook = get_user_model().objects.create_user(
+            username="cook", password="pw"
+        )
+        cls.dish = Dish.objects.create(
+            name="Borscht",
+            description=" ".join(f"word{index}" for index in range(12)),
+            price="8.50",
+            dish_type=cls.soup,
+        )
+
+    def card(self):
+        return DishCard.objects.get(dish=self.dish)
+
+    def assertMatchesRebuild(self):
+        expected = cards.build_cards(Dish.objects.values("pk"))
+        fields = [field.attname for field in DishCard._meta.concrete_fields]
+        self.assertEqual(
+            [[getattr(card, name) for name in fields]
+             for card in DishCard.objects.order_by("dish")],
+            [[getattr(card, name) for name in fields] for card in expected],
+        )
+
+    def test_card_is_built_with_the_dish(self):
+        card = self.card()
+        self.assertEqual(card.name, "Borscht")
+        self.assertEqual(card.dish_type_name, "Soup")
+        self.assertEqual(
+            card.excerpt,
+            "word0 word1 word2 word3 word4 word5 word6 word7 word8 word9…",
+        )
+        self.assertEqual((card.ingredient_ids, card.cook_ids), ([], []))
+
+    def test_card_keeps_two_names_and_every_id(self):
+        self.dish.ingredients.add(self.salt, self.dill, self.beet)
+        card = self.card()
+        self.assertEqual(card.ingredient_names, ["Beet", "Dill"])
+        self.assertEqual(
+            card.ingredient_ids,
+            sorted([self.beet.pk, self.dill.pk, self.salt.pk]),
+        )
+        self.assertEqual(card.ingredient_count, 3)
+
+    def test_card_follows_relation_changes(self):
+        self.dish.ingredients.add(self.beet)
+        self.cook.dishes.add(self.dish)
+        self.assertEqual(self.card().cook_names, ["cook"])
+
+        self.dish.ingredients.remove(self.beet)
+        self.cook.dishes.clear()
+        card = self.card()
+        self.assertEqual((card.ingredient_names, card.cook_names), ([], []))
+        self.assertMatchesRebuild()
+
+    def test_card_follows_renames_and_deletes(self):
+        self.dish.ingredients.add(self.beet, self.dill)
+        self.dish.cooks.add(self.cook)
+        self.soup.name = "Soups"
+        self.soup.save()
+        self.beet.name = "Red beet"
+        self.beet.save()
+        self.dish.price = 9
+        self.dish.save()
+        self.cook.delete()
+
+        card = self.card()
+        self.assertEqual(card.dish_type_name, "Soups")
+        self.assertEqual(card.ingredient_names, ["Dill", "Red beet"])
+        self.assertEqual(card.cook_ids, [])
+        self.assertMatchesRebuild()
+
+        self.dish.delete()
+        self.assertFalse(DishCard.objects.exists())
+
+    def test_cook_saves_without_a_rename_keep_cards(self):
+        self.dish.cooks.add(self.cook)
+        self.cook.set_password("new password")
+        self.cook.first_name = "Gordon"
+        with CaptureQueriesContext(connection) as queries:
+            self.cook.save()
+            self.cook.save(update_fields=["last_login"])
+        self.assertFalse(any(
+            "kitchen_dishcard" in query["sql"] for query in queries
+        ))
+        self.cook.username = "gordon"
+        self.cook.save(update_fields=["username"])
+        self.assertEqual(self.card().cook_names, ["gordon"])
+
+    def test_deferred_refreshes_write_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            with cards.deferred():
+                self.dish.ingredients.add(self.beet)
+                self.dish.cooks.add(self.cook)
+        upserts = [
+            query for query in queries
+            if query["sql"].startswith('INSERT INTO "kitchen_dishcard"')
+        ]
+        self.assertEqual(len(upserts), 1)
+        self.assertMatchesRebuild()
+
+    def test_bulk_writes_rebuild_cards(self):
+        Dish.objects.bulk_create([
+            Dish(name="Steak", description="", price=30, dish_type=self.soup)
+        ])
+        after_bulk_write(Dish)
+        self.assertEqual(
+            list(DishCard.objects.values_list("name", flat=True)),
+            ["Borscht", "Steak"],
+        )
+
+    def test_dish_list_reads_one_table(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.ingredients.add(self.beet)
+        self.client.force_login(self.cook)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("kitchen:dish-list"), {"pagination": "cursor"}
+            )
+        self.assertContains(response, "Beet")
+        dish_queries = [
+            query["sql"] for query in queries
+            if 'FROM "kitchen_dishcard"' in query["sql"]
+            and "COUNT(" not in query["sql"]
+        ]
+        self.assertEqual(len(dish_queries), 1)
+        self.assertNotIn("JOIN", dish_queries[0])
@@ -0,0 +1,333 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen.counters import read_counters
+from kitchen.dish_counts import reconcile
+from kitchen.importing import MenuImporter
+from kitchen.models import DishCard, DishType, Ingredient, Dish, Suggestion
+
+
+class CommandTestCase(TestCase):
+    def write_file(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def call(self, *args, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(*args, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+
+class ImportMenuCommandTests(CommandTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = get_user_model().objects.create_user(
+            username="gordon", password="pass"
+        )
+        cls.soup = DishType.objects.create(name="Soup")
+
+    def test_import_csv(self):
+        path = self.write_file(
+            "menu.csv",
+            "name,description,price,dish_type,ingredients,cooks\n"
+            "Borscht,Beet soup,7.50,Soup,Beet|Cabbage,gordon\n"
+            "Pizza,Cheese pizza,10,Main,Cheese|Tomato,gordon|nobody\n"
+            "Salad,Greens,5,Main,Tomato,\n",
+        )
+        stdout, stderr = self.call("import_menu", path, batch_size=2)
+
+        self.assertIn("Imported 3 dish(es)", stdout)
+        self.assertIn("'nobody'", stderr)
+        self.assertEqual(DishType.objects.count(), 2)
+        self.assertEqual(
+            set(Ingredient.objects.values_list("name", flat=True)),
+            {"Beet", "Cabbage", "Cheese", "Tomato"},
+        )
+        borscht = Dish.objects.get(name="Borscht")
+        self.assertEqual(borscht.dish_type, self.soup)
+        self.assertEqual(
+            set(borscht.ingredients.values_list("name", flat=True)),
+            {"Beet", "Cabbage"},
+        )
+        self.assertEqual(list(self.cook.dishes.order_by("name")), [
+            borscht, Dish.objects.get(name="Pizza")
+        ])
+
+    def test_import_jsonl(self):
+        rows = [
+            {
+                "name": "Ramen",
+                "description": "Noodle soup",
+                "price": "12.00",
+                "dish_type": "Soup",
+                "ingredients": ["Noodles", "Egg"],
+                "cooks": ["gordon"],
+            },
+        ]
+        path = self.write_file(
+            "menu.jsonl", "\n".join(json.dumps(row) for row in rows) + "\n"
+        )
+        self.call("import_menu", path)
+        ramen = Dish.objects.get(name="Ramen")
+        self.assertEqual(ramen.ingredients.count(), 2)
+        self.assertEqual(list(ramen.cooks.all()), [self.cook])
+
+    def test_counters_are_reconciled(self):
+        path = self.write_file(
+            "menu.csv",
+            "name,description,price,dish_type,ingredients,cooks\n"
+            "Pho,Soup,9,Soup,Noodles,\n",
+        )
+        self.call("import_menu", path)
+        counters = read_counters()
+        self.assertEqual(counters["dishes"], 1)
+        self.assertEqual(counters["ingredients"], 1)
+        self.assertEqual(Ingredient.objects.get().dish_count, 1)
+        self.assertEqual(DishType.objects.get().dish_count, 1)
+
+    def test_invalid_row_reports_its_number(self):
+        path = self.write_file(
+            "menu.csv",
+            "name,description,price,dish_type,ingredients,cooks\n"
+            "Pho,Soup,9,Soup,,\n"
+            "Bad,Soup,not-a-price,Soup,,\n",
+        )
+        with self.assertRaisesMessage(CommandError, "row 2"):
+            self.call("import_menu", path, batch_size=1)
+        self.assertTrue(Dish.objects.filter(name="Pho").exists())
+        self.assertTrue(DishCard.objects.filter(name="Pho").exists())
+        self.assertEqual(read_counters()["dishes"], 1)
+        self.assertEqual(DishType.objects.get().dish_count, 1)
+
+    def test_each_batch_is_carded_when_it_commits(self):
+        def rows():
+            yield self.menu_row("Pho")
+            # the first batch is complete before the second is read
+            self.assertEqual(
+                list(DishCard.objects.values_list("name", flat=True)),
+                ["Pho"],
+            )
+            self.assertEqual(read_counters()["dishes"], 1)
+            yield self.menu_row("Ramen")
+
+        MenuImporter(batch_size=1).run(rows())
+        self.assertEqual(DishCard.objects.count(), 2)
+        self.assertEqual(DishType.objects.get().dish_count, 2)
+
+    @staticmethod
+    def menu_row(name):
+        return {
+            "name": name, "description": "Soup", "price": "9",
+            "dish_type": "Soup", "ingredients": [], "cooks": [],
+        }
+
+    def test_only_imported_dishes_are_added(self):
+        stew = Dish.objects.create(
+            name="Stew", description="", price=8, dish_type=self.soup
+        )
+        stew.cooks.add(self.cook)
+        # a rebuild would put the name back
+        DishCard.objects.filter(dish=stew).update(name="Stale")
+        path = self.write_file(
+            "menu.csv",
+            "name,description,price,dish_type,ingredients,cooks\n"
+            "Pho,Soup,9,Soup,Noodles,gordon\n",
+        )
+        self.call("import_menu", path)
+        self.assertEqual(
+            sorted(DishCard.objects.values_list("name", flat=True)),
+            ["Pho", "Stale"],
+        )
+        self.assertEqual(read_counters()["dishes"], 2)
+        self.soup.refresh_from_db()
+        self.cook.refresh_from_db()
+        self.assertEqual(self.soup.dish_count, 2)
+        self.assertEqual(self.cook.dish_count, 2)
+        self.assertEqual(reconcile(dry_run=True), {})
+
+    def test_unknown_format(self):
+        path = self.write_file("menu.txt", "")
+        with self.assertRaises(CommandError):
+            self.call("import_menu", path)
+
+
+class ExportTests(CommandTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = get_user_model().objects.create_user(
+            username="gordon", password="pass", is_staff=True
+        )
+        soup = DishType.objects.create(name="Soup")
+        cls.borscht = Dish.objects.create(
+            name="Borscht", description="Beet soup", price="7.50",
+            dish_type=soup,
+        )
+        cls.borscht.ingredients.add(
+            Ingredient.objects.create(name="Beet"),
+            Ingredient.objects.create(name="Cabbage"),
+        )
+        cls.borscht.cooks.add(cls.cook)
+        Dish.objects.create(
+            name="Consomme", description="Clear soup", price=6,
+            dish_type=soup,
+        )
+        Suggestion.objects.create(
+            cook=cls.cook, dish=cls.borscht, text="More dill"
+        )
+
+    def test_dish_csv_flattens_relations(self):
+        stdout, _ = self.call("export_kitchen", "dishes")
+        lines = stdout.splitlines()
+        self.assertEqual(
+            lines[0], "id,name,description,price,dish_type,ingredients,cooks"
+        )
+        self.assertEqual(
+            lines[1],
+            f"{self.borscht.pk},Borscht,Beet soup,7.50,Soup,"
+            f"Beet|Cabbage,gordon",
+        )
+        self.assertTrue(lines[2].endswith(",Soup,,"))
+
+    def test_jsonl(self):
+        stdout, _ = self.call("export_kitchen", "suggestions", format="jsonl")
+        row = json.loads(stdout.splitlines()[0])
+        self.assertEqual(row["dish"], "Borscht")
+        self.assertEqual(row["cook"], "gordon")
+
+    def test_cook_export_leaves_out_passwords(self):
+        stdout, _ = self.call("export_kitchen", "cooks")
+        self.assertNotIn("password", stdout)
+        self.assertNotIn(self.cook.password, stdout)
+
+    def test_export_round_trips_through_import(self):
+        path = self.write_file("menu.csv", "")
+        self.call("export_kitchen", "dishes", output=path)
+        Dish.objects.all().delete()
+        self.call("import_menu", path)
+        borscht = Dish.objects.get(name="Borscht")
+        self.assertEqual(borscht.ingredients.count(), 2)
+        self.assertEqual(list(borscht.cooks.all()), [self.cook])
+
+    def test_endpoint_streams_for_staff(self):
+        self.client.force_login(self.cook)
+        response = self.client.get(
+            reverse("kitchen:export", args=["dishes", "csv"])
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("Borscht", content)
+
+    def test_endpoint_is_staff_only(self):
+        user = get_user_model().objects.create_user(
+            username="line", password="pass"
+        )
+        self.client.force_login(user)
+        response = self.client.get(
+            reverse("kitchen:export", args=["cooks", "jsonl"])
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class SeedKitchenCommandTests(CommandTestCase):
+    options = {
+        "dishes": 40, "cooks": 8, "ingredients": 20, "suggestions": 150,
+        "dish_types": 5, "batch_size": 16,
+    }
+
+    def snapshot(self):
+        return (
+            list(Dish.objects.order_by("pk").values_list(
+                "name", "price", "dish_type__name"
+            )),
+            list(Dish.ingredients.through.objects.order_by(
+                "dish_id", "ingredient_id"
+            ).values_list("dish__name", "ingredient__name")),
+            list(Suggestion.objects.order_by("pk").values_list(
+                "cook__username", "dish__name", "text", "approved"
+            )),
+        )
+
+    def test_creates_requested_counts(self):
+        self.call("seed_kitchen", seed=1, **self.options)
+        self.assertEqual(Dish.objects.count(), 40)
+        self.assertEqual(DishType.objects.count(), 5)
+        self.assertEqual(Ingredient.objects.count(), 20)
+        self.assertEqual(get_user_model().objects.count(), 8)
+        self.assertEqual(Suggestion.objects.count(), 150)
+        self.assertTrue(Dish.ingredients.through.objects.exists())
+        self.assertEqual(read_counters()["dishes"], 40)
+        self.assertEqual(reconcile(dry_run=True), {})
+
+    def test_suggestion_dates_are_spread_out(self):
+        self.call("seed_kitchen", seed=1, **self.options)
+        self.assertGreater(
+            Suggestion.objects.dates("created_at", "day").count(), 1
+        )
+
+    def test_failed_seed_leaves_nothing_behind(self):
+        self.call("seed_kitchen", seed=1, **self.options)
+        with self.assertRaisesMessage(CommandError, "seed an empty database"):
+            self.call("seed_kitchen", seed=1, **self.options)
+        self.assertEqual(DishType.objects.count(), 5)
+        self.assertEqual(Suggestion.objects.count(), 150)
+
+    def test_same_seed_same_data(self):
+        self.call("seed_kitchen", seed=7, **self.options)
+        first = self.snapshot()
+        for model in (Suggestion, Dish, Ingredient, DishType):
+            model.objects.all().delete()
+        get_user_model().objects.all().delete()
+        self.call("seed_kitchen", seed=7, **self.options)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_cooks_can_log_in(self):
+        self.call("seed_kitchen", seed=1, cooks=1, dishes=0, suggestions=0)
+        cook = get_user_model().objects.get()
+        self.assertTrue(cook.check_password("kitchen"))
+
+
+class ReconcileDishCountsCommandTests(CommandTestCase):
+    def setUp(self):
+        self.salt = Ingredient.objects.create(name="Salt")
+        Ingredient.objects.filter(pk=self.salt.pk).update(dish_count=3)
+
+    def test_dry_run_reports_without_writing(self):
+        stdout, _ = self.call("reconcile_dish_counts", dry_run=True)
+        self.assertIn(
+            f"kitchen.Ingredient {self.salt.pk}: stored 3, actual 0", stdout
+        )
+        self.salt.refresh_from_db()
+        self.assertEqual(self.salt.dish_count, 3)
+
+    def test_repairs_drift(self):
+        stdout, _ = self.call("reconcile_dish_counts")
+        self.assertIn("Repaired 1 dish count(s).", stdout)
+        self.salt.refresh_from_db()
+        self.assertEqual(self.salt.dish_count, 0)
+        stdout, _ = self.call("reconcile_dish_counts")
+        self.assertIn("All dish counts are accurate.", stdout)
+
+
+class RebuildDishCardsCommandTests(CommandTestCase):
+    def test_rebuilds_every_card(self):
+        dish_type = DishType.objects.create(name="Soup")
+        dish = Dish.objects.create(
+            name="Borscht", description="desc", price=8, dish_type=dish_type
+        )
+        DishCard.objects.all().delete()
+        DishType.objects.filter(pk=dish_type.pk).update(name="Soups")
+
+        stdout, _ = self.call("rebuild_dish_cards")
+        self.assertIn("Rebuilt 1 dish card(s).", stdout)
+        self.assertEqual(dish.card.dish_type_name, "Soups")
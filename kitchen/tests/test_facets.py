@@ -0,0 +1,156 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase
+
+from kitchen.facets import (
+    MATCH_ALL,
+    DishFilters,
+    build_facets,
+    count_facets,
+    facet_counts,
+)
+from kitchen.forms import DishFilterForm
+from kitchen.models import Dish, DishType, Ingredient
+
+
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = get_user_model().objects.create_user(
+            username="cook", password="pw"
+        )
+        cls.soup = DishType.objects.create(name="Soup")
+        cls.main = DishType.objects.create(name="Main")
+        cls.salt = Ingredient.objects.create(name="Salt")
+        cls.dill = Ingredient.objects.create(name="Dill")
+        cls.borscht = cls.create_dish("Borscht", cls.soup, 8)
+        cls.okroshka = cls.create_dish("Okroshka", cls.soup, 12)
+        cls.steak = cls.create_dish("Steak", cls.main, 60)
+        cls.borscht.ingredients.add(cls.salt, cls.dill)
+        cls.okroshka.ingredients.add(cls.dill)
+        cls.steak.ingredients.add(cls.salt)
+        cls.steak.cooks.add(cls.cook)
+
+    @classmethod
+    def create_dish(cls, name, dish_type, price):
+        return Dish.objects.create(
+            name=name, description="desc", price=price, dish_type=dish_type
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self, **filters):
+        return {
+            facet: {key: dishes for key, _label, dishes in rows}
+            for facet, rows in count_facets(DishFilters(**filters)).items()
+        }
+
+    def matching(self, **filters):
+        return set(
+            DishFilters(**filters).apply(Dish.objects.all()).values_list(
+                "name", flat=True
+            )
+        )
+
+    def test_counts_every_facet_in_one_query(self):
+        with self.assertNumQueries(1):
+            counts = self.counts()
+        self.assertEqual(
+            counts["dish_type"], {self.soup.pk: 2, self.main.pk: 1}
+        )
+        self.assertEqual(
+            counts["ingredient"], {self.salt.pk: 2, self.dill.pk: 2}
+        )
+        self.assertEqual(counts["cook"], {self.cook.pk: 1})
+        # under 10, 10-20 and 50 and over
+        self.assertEqual(counts["price"], {0: 1, 1: 1, 3: 1})
+
+    def test_counts_ignore_their_own_facet(self):
+        counts = self.counts(dish_type=(self.soup.pk,))
+        self.assertEqual(
+            counts["dish_type"], {self.soup.pk: 2, self.main.pk: 1}
+        )
+        self.assertEqual(
+            counts["ingredient"], {self.salt.pk: 1, self.dill.pk: 2}
+        )
+        self.assertEqual(counts["cook"], {})
+
+    def test_ingredients_match_any_or_all(self):
+        ingredients = (self.salt.pk, self.dill.pk)
+        self.assertEqual(
+            self.matching(ingredient=ingredients),
+            {"Borscht", "Okroshka", "Steak"},
+        )
+        self.assertEqual(
+            self.matching(ingredient=ingredients, ingredient_match=MATCH_ALL),
+            {"Borscht"},
+        )
+        counts = self.counts(
+            ingredient=(self.salt.pk,), ingredient_match=MATCH_ALL
+        )
+        self.assertEqual(
+            counts["ingredient"], {self.salt.pk: 2, self.dill.pk: 1}
+        )
+
+    def test_price_range_and_cook(self):
+        self.assertEqual(
+            self.matching(min_price=Decimal(10), max_price=Decimal(20)),
+            {"Okroshka"},
+        )
+        self.assertEqual(self.matching(cook=(self.cook.pk,)), {"Steak"})
+
+    def test_counts_are_cached_until_a_write(self):
+        filters = DishFilters()
+        facet_counts(filters)
+        with self.assertNumQueries(0):
+            facet_counts(filters)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.okroshka.cooks.add(self.cook)
+        with self.assertNumQueries(1):
+            counts = facet_counts(filters)
+        self.assertEqual(counts["cook"], [(self.cook.pk, "cook", 2)])
+
+    def test_options_toggle_their_value(self):
+        params = QueryDict(f"dish_type={self.soup.pk}&page=2")
+        filters = DishFilters.from_form(DishFilterForm(params))
+        dish_type, _ingredient, _cook, price = build_facets(filters, params)
+
+        soup, main = dish_type.options
+        self.assertEqual((soup.label, soup.dishes), ("Soup", 2))
+        self.assertTrue(soup.selected)
+        self.assertEqual(soup.query, "")
+        self.assertEqual(
+            main.query,
+            f"dish_type={min(self.soup.pk, self.main.pk)}"
+            f"&dish_type={max(self.soup.pk, self.main.pk)}",
+        )
+        self.assertEqual(
+            [option.label for option in price.options],
+            ["Under $10", "$10 – $20", "$20 – $50", "$50 and over"],
+        )
+        self.assertEqual(
+            price.options[1].query,
+            f"dish_type={self.soup.pk}&min_price=10&max_price=20",
+        )
+
+    def test_selected_options_without_dishes_stay_listed(self):
+        params = QueryDict(f"dish_type={self.soup.pk}&cook={self.cook.pk}")
+        filters = DishFilters.from_form(DishFilterForm(params))
+        dish_type, *_rest = build_facets(filters, params)
+
+        main, soup = dish_type.options
+        self.assertEqual((main.label, main.dishes), ("Main", 1))
+        self.assertEqual((soup.label, soup.dishes), ("Soup", 0))
+        self.assertTrue(soup.selected)
+        self.assertEqual(soup.query, f"cook={self.cook.pk}")
+
+    def test_invalid_parameters_are_ignored(self):
+        filters = DishFilters.from_form(
+            DishFilterForm(QueryDict("dish_type=x&min_price=abc&name=+soup"))
+        )
+        self.assertEqual(filters, DishFilters(name="soup"))
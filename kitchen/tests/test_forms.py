@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
 from kitchen.forms import (
@@ -10,7 +11,10 @@ from kitchen.forms import (
     IngredientSearchForm,
     DishTypeSearchForm,
     SuggestionSearchForm,
+    DishForm,
+    DishCookAssignForm,
 )
+from kitchen.models import Dish, DishType, Ingredient
 
 
 class CookCreationFormTests(TestCase):
@@ -52,6 +56,21 @@ class CookPasswordResetFormTests(TestCase):
             ["password1", "password2"]
         )
 
+    def test_save_writes_only_the_password(self):
+        cook = get_user_model().objects.create_user(
+            username="cook", password="old password"
+        )
+        cook.username = "unsaved"
+        form = CookPasswordResetForm(
+            {"password1": "N3w-passw0rd!", "password2": "N3w-passw0rd!"},
+            instance=cook,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        cook = get_user_model().objects.get(pk=cook.pk)
+        self.assertEqual(cook.username, "cook")
+        self.assertTrue(cook.check_password("N3w-passw0rd!"))
+
 
 class SuggestionFormTests(TestCase):
     def test_form_uses_only_text_field(self):
@@ -95,3 +114,41 @@ class SearchFormsTests(TestCase):
     def test_suggestion_search_form_placeholder(self):
         form = SuggestionSearchForm()
         self.assertPlaceholder(form.fields["dish_name"], "Search by dish name")
+
+
+class DishFormWidgetTests(TestCase):
+    def test_pickers_render_only_selected_options(self):
+        selected = Ingredient.objects.create(name="Basil")
+        Ingredient.objects.create(name="Garlic")
+        form = DishForm(initial={"ingredients": [selected.pk]})
+
+        html = str(form["ingredients"])
+        self.assertIn("Basil", html)
+        self.assertNotIn("Garlic", html)
+        self.assertIn("/ingredients/autocomplete/", html)
+        self.assertIn("/cooks/autocomplete/", str(form["cooks"]))
+
+    def test_assign_form_pickers_use_autocomplete(self):
+        dish_type = DishType.objects.create(name="Main")
+        Dish.objects.create(
+            name="Pesto", description="desc", price=5, dish_type=dish_type
+        )
+        form = DishCookAssignForm()
+
+        html = str(form["dishes"])
+        self.assertNotIn("Pesto", html)
+        self.assertIn("/dishes/autocomplete/", html)
+        self.assertIn("/cooks/autocomplete/", str(form["cooks"]))
+
+    def test_form_saves_picked_ingredients(self):
+        dish_type = DishType.objects.create(name="Main")
+        basil = Ingredient.objects.create(name="Basil")
+        form = DishForm(data={
+            "name": "Pesto",
+            "description": "desc",
+            "price": 5,
+            "dish_type": dish_type.pk,
+            "ingredients": [basil.pk],
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertQuerySetEqual(form.save().ingredients.all(), [basil])
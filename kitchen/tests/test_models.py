@@ -1,7 +1,21 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-from kitchen.models import DishType, Ingredient, Dish, Suggestion
+from kitchen import dish_counts
+from kitchen.assignments import assign_cook, bulk_assign, unassign_cook
+from kitchen.buffered import visits
+from kitchen.counters import read_counters, reconcile_counters
+from kitchen.models import (
+    DashboardCounter,
+    DishType,
+    Ingredient,
+    Dish,
+    Suggestion,
+    VisitCount,
+)
 
 
 class ModelTests(TestCase):
@@ -62,3 +76,217 @@ class ModelTests(TestCase):
         self.assertTrue(
             self.cook.check_password(self.cook_data["password"])
         )
+
+
+class DashboardCounterTests(TestCase):
+    def test_counters_follow_creates_and_deletes(self):
+        before = read_counters()
+        dish_type = DishType.objects.create(name="Soup")
+        Dish.objects.create(
+            name="Borscht",
+            description="desc",
+            price=5,
+            dish_type=dish_type,
+        )
+        counters = read_counters()
+        self.assertEqual(counters["dish_types"], before["dish_types"] + 1)
+        self.assertEqual(counters["dishes"], before["dishes"] + 1)
+
+        # cascades through to the dish
+        dish_type.delete()
+        self.assertEqual(read_counters(), before)
+
+    def test_reconcile_repairs_drift(self):
+        Ingredient.objects.create(name="Salt")
+        DashboardCounter.objects.filter(name="ingredients").update(value=42)
+
+        drift = reconcile_counters()
+
+        self.assertEqual(drift, {"ingredients": (42, 1)})
+        self.assertEqual(read_counters()["ingredients"], 1)
+        self.assertEqual(reconcile_counters(), {})
+
+    def test_missing_counter_is_recounted(self):
+        DashboardCounter.objects.filter(name="cooks").delete()
+        get_user_model().objects.create_user(username="cook", password="pw")
+        self.assertEqual(read_counters()["cooks"], 1)
+
+
+class DishCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.soup = DishType.objects.create(name="Soup")
+        cls.main = DishType.objects.create(name="Main")
+        cls.salt = Ingredient.objects.create(name="Salt")
+        cls.dill = Ingredient.objects.create(name="Dill")
+        cls.cook = get_user_model().objects.create_user(
+            username="cook", password="pw"
+        )
+
+    def create_dish(self, name="Borscht", dish_type=None):
+        return Dish.objects.create(
+            name=name,
+            description="desc",
+            price=5,
+            dish_type=dish_type or self.soup,
+        )
+
+    def assertCounts(self, *expected):
+        for obj, count in expected:
+            obj.refresh_from_db(fields=["dish_count"])
+            self.assertEqual(obj.dish_count, count, obj)
+        self.assertEqual(dish_counts.reconcile(dry_run=True), {})
+
+    def test_dish_type_follows_create_change_and_delete(self):
+        dish = self.create_dish()
+        self.assertCounts((self.soup, 1), (self.main, 0))
+
+        dish.dish_type = self.main
+        dish.save()
+        self.assertCounts((self.soup, 0), (self.main, 1))
+
+        dish.delete()
+        self.assertCounts((self.soup, 0), (self.main, 0))
+
+    def test_links_follow_both_sides_of_the_relation(self):
+        dish = self.create_dish()
+        other = self.create_dish("Okroshka")
+        dish.ingredients.add(self.salt, self.dill)
+        self.salt.dishes.add(other)
+        self.assertCounts((self.salt, 2), (self.dill, 1))
+
+        dish.ingredients.remove(self.salt)
+        self.assertCounts((self.salt, 1), (self.dill, 1))
+
+        dish.ingredients.clear()
+        self.salt.dishes.clear()
+        self.assertCounts((self.salt, 0), (self.dill, 0))
+
+    def test_deleting_a_dish_uncounts_its_links(self):
+        dish = self.create_dish()
+        dish.ingredients.add(self.salt)
+        dish.cooks.add(self.cook)
+
+        dish.delete()
+
+        self.assertCounts((self.salt, 0), (self.cook, 0))
+
+    def create_soups(self, dish_type, count):
+        for index in range(count):
+            dish = self.create_dish(f"Soup {index}", dish_type)
+            dish.ingredients.add(self.salt, self.dill)
+            dish.cooks.add(self.cook)
+
+    def test_deleting_a_dish_type_uncounts_its_dishes_at_once(self):
+        self.create_dish("Steak", self.main).ingredients.add(self.salt)
+        stew = DishType.objects.create(name="Stew")
+        self.create_soups(stew, 2)
+        self.create_soups(self.soup, 20)
+        with CaptureQueriesContext(connection) as queries:
+            stew.delete()
+
+        # twenty dishes cost what two did
+        with self.assertNumQueries(len(queries)):
+            self.soup.delete()
+
+        self.assertCounts(
+            (self.salt, 1), (self.dill, 0), (self.cook, 0), (self.main, 1)
+        )
+        self.assertEqual(read_counters()["dishes"], 1)
+
+    def test_assignments_are_counted(self):
+        dish = self.create_dish()
+        other = self.create_dish("Okroshka")
+        assign_cook(self.cook, dish.pk)
+        self.assertCounts((self.cook, 1))
+
+        bulk_assign([self.cook], [dish, other])
+        self.assertCounts((self.cook, 2))
+
+        unassign_cook(self.cook, dish.pk)
+        self.assertCounts((self.cook, 1))
+
+    def test_reconcile_repairs_drift(self):
+        self.create_dish().ingredients.add(self.salt)
+        Ingredient.objects.filter(pk=self.salt.pk).update(dish_count=7)
+
+        drift = dish_counts.reconcile()
+
+        self.assertEqual(drift, {("kitchen.Ingredient", self.salt.pk): (7, 1)})
+        self.assertCounts((self.salt, 1))
+
+    def test_drifted_count_never_goes_negative(self):
+        dish = self.create_dish()
+        dish.ingredients.add(self.salt)
+        Ingredient.objects.filter(pk=self.salt.pk).update(dish_count=0)
+
+        dish.ingredients.remove(self.salt)
+
+        self.salt.refresh_from_db()
+        self.assertEqual(self.salt.dish_count, 0)
+
+
+@override_settings(
+    KITCHEN_VISITS_FLUSH_SIZE=1000, KITCHEN_VISITS_FLUSH_SECONDS=3600
+)
+class BufferedVisitsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = get_user_model().objects.create_user(
+            username="cook", password="pw"
+        )
+
+    def setUp(self):
+        self.addCleanup(visits.discard)
+
+    def test_increments_stay_in_memory_until_flushed(self):
+        with self.assertNumQueries(0):
+            visits.increment(self.cook.pk)
+            visits.increment(self.cook.pk)
+        self.assertFalse(VisitCount.objects.exists())
+        self.assertEqual(visits.value(self.cook.pk), 2)
+
+        visits.flush()
+
+        self.assertEqual(VisitCount.objects.get(cook=self.cook).value, 2)
+        self.assertEqual(visits.value(self.cook.pk), 2)
+
+    def test_flush_adds_to_stored_value(self):
+        VisitCount.objects.create(cook=self.cook, value=5)
+        visits.increment(self.cook.pk, 3)
+        visits.flush()
+        self.assertEqual(VisitCount.objects.get(cook=self.cook).value, 8)
+
+    def test_flush_skips_deleted_cooks(self):
+        other = get_user_model().objects.create_user(
+            username="other", password="pw"
+        )
+        visits.increment(self.cook.pk)
+        visits.increment(other.pk)
+        other.delete()
+
+        visits.flush()
+
+        self.assertEqual(
+            list(VisitCount.objects.values_list("cook", "value")),
+            [(self.cook.pk, 1)],
+        )
+
+    def test_flush_when_buffer_is_full(self):
+        with self.settings(KITCHEN_VISITS_FLUSH_SIZE=2):
+            visits.increment(self.cook.pk)
+            self.assertFalse(VisitCount.objects.exists())
+            visits.increment(self.cook.pk)
+        self.assertEqual(VisitCount.objects.get(cook=self.cook).value, 2)
+        self.assertEqual(visits.pending(self.cook.pk), 0)
+
+    def test_home_page_writes_nothing(self):
+        self.client.force_login(self.cook)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("kitchen:index"))
+        self.assertEqual(response.context["num_visits"], 1)
+        writes = [
+            query["sql"] for query in queries
+            if not query["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(writes, [])
@@ -0,0 +1,165 @@
+from django.contrib.auth import get_user_model
+from django.core.paginator import EmptyPage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from kitchen.models import DishType, Dish, Suggestion
+from kitchen.pagination import (
+    ApproximateCountPaginator,
+    KeysetPaginator,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class PaginationTestData(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="cook",
+            password="pass",
+            is_staff=True,
+        )
+        cls.dish_type = DishType.objects.create(name="Soup")
+        cls.dishes = [
+            Dish.objects.create(
+                name=f"Dish {index % 7}",
+                description="desc",
+                price=10,
+                dish_type=cls.dish_type,
+            )
+            for index in range(20)
+        ]
+
+
+class CursorTokenTests(TestCase):
+    def test_round_trip(self):
+        token = encode_cursor(["name", 3], forward=False)
+        self.assertEqual(decode_cursor(token), (["name", 3], False))
+
+    def test_malformed_token_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class KeysetPaginatorTests(PaginationTestData):
+    def walk(self, paginator):
+        seen = []
+        page = paginator.page()
+        while True:
+            seen.extend(page.object_list)
+            if not page.has_next():
+                return seen, page
+            page = paginator.page(page.next_cursor)
+
+    def test_walks_every_row_once_in_order(self):
+        queryset = Dish.objects.all()
+        paginator = KeysetPaginator(queryset, ("name", "id"), 6)
+        seen, _ = self.walk(paginator)
+        self.assertEqual(
+            seen,
+            list(queryset.order_by("name", "id")),
+        )
+
+    def test_previous_cursor_returns_previous_page(self):
+        paginator = KeysetPaginator(Dish.objects.all(), ("name", "id"), 6)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        back = paginator.page(second.previous_cursor)
+        self.assertEqual(back.object_list, first.object_list)
+        self.assertFalse(back.has_previous())
+
+    def test_mixed_direction_ordering(self):
+        for index in range(5):
+            Suggestion.objects.create(
+                cook=self.user,
+                dish=self.dishes[0],
+                text=f"text {index}",
+                approved=index % 2 == 0,
+            )
+        ordering = ("approved", "-created_at", "id")
+        paginator = KeysetPaginator(Suggestion.objects.all(), ordering, 2)
+        seen, _ = self.walk(paginator)
+        self.assertEqual(
+            seen,
+            list(Suggestion.objects.order_by(*ordering)),
+        )
+
+
+class ApproximateCountPaginatorTests(PaginationTestData):
+    def test_small_results_are_exact(self):
+        paginator = ApproximateCountPaginator(
+            Dish.objects.order_by("id"), 5, count_limit=100
+        )
+        self.assertEqual(paginator.count, 20)
+        self.assertTrue(paginator.count_is_exact)
+
+    def test_count_is_capped(self):
+        paginator = ApproximateCountPaginator(
+            Dish.objects.order_by("id"), 5, count_limit=8
+        )
+        self.assertEqual(paginator.count, 8)
+        self.assertFalse(paginator.count_is_exact)
+        self.assertTrue(paginator.count_is_capped)
+
+    def test_pages_past_a_capped_count_stay_reachable(self):
+        paginator = ApproximateCountPaginator(
+            Dish.objects.order_by("id"), 5, count_limit=8
+        )
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertTrue(paginator.page(2).has_next())
+
+        page = paginator.page(4)
+        self.assertEqual(list(page), self.dishes[15:])
+        self.assertFalse(page.has_next())
+        self.assertEqual(page.end_index(), 20)
+        with self.assertRaises(EmptyPage):
+            paginator.page(5)
+
+
+class ListViewPaginationModeTests(PaginationTestData):
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    @override_settings(KITCHEN_PAGINATION_MODE="cursor")
+    def test_cursor_mode_links_to_next_cursor(self):
+        response = self.client.get(reverse("kitchen:dish-list"))
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_next())
+        self.assertContains(response, f"cursor={page.next_cursor}")
+
+        response = self.client.get(
+            reverse("kitchen:dish-list"), {"cursor": page.next_cursor}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["page_obj"].has_previous())
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(
+            reverse("kitchen:dish-list"), {"cursor": "garbage"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(
+        KITCHEN_PAGINATION_MODE="approximate",
+        KITCHEN_PAGINATION_COUNT_LIMIT=16,
+    )
+    def test_approximate_mode_caps_count(self):
+        response = self.client.get(reverse("kitchen:dish-list"))
+        self.assertEqual(response.context["paginator"].count, 16)
+        self.assertContains(response, "16+ results")
+
+    @override_settings(
+        KITCHEN_PAGINATION_MODE="approximate",
+        KITCHEN_PAGINATION_COUNT_LIMIT=4,
+    )
+    def test_approximate_mode_reaches_pages_past_the_count(self):
+        url = reverse("kitchen:dish-list")
+        response = self.client.get(url, {"page": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["dish_list"]), 5)
+        self.assertFalse(response.context["page_obj"].has_next())
+        self.assertEqual(self.client.get(url, {"page": 3}).status_code, 404)
+
+        response = self.client.get(url, {"page": "last"})
+        self.assertEqual(response.context["page_obj"].number, 2)
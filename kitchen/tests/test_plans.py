@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from kitchen.models import DishType, Ingredient, Dish, Suggestion
+from kitchen.plans import problems
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cook = get_user_model().objects.create_user(
+            username="gordon", password="pass"
+        )
+        dish_type = DishType.objects.create(name="Soup")
+        Ingredient.objects.create(name="Salt")
+        dishes = Dish.objects.bulk_create(
+            Dish(
+                name=f"Soup {index}", description="Soup", price=5,
+                dish_type=dish_type,
+            )
+            for index in range(3)
+        )
+        Suggestion.objects.bulk_create(
+            Suggestion(cook=cook, dish=dish, text="More salt")
+            for dish in dishes
+        )
+
+    def audit(self, *args, **options):
+        stdout = StringIO()
+        call_command(
+            "audit_query_plans", *args, stdout=stdout, stderr=StringIO(),
+            **options
+        )
+        return stdout.getvalue()
+
+    def test_problems(self):
+        sql = 'SELECT * FROM "kitchen_dish" ORDER BY "name"'
+        plan = ["SCAN kitchen_dish", "USE TEMP B-TREE FOR ORDER BY"]
+        self.assertEqual(
+            problems(plan, sql, {"kitchen_dish"}),
+            ["full scan of kitchen_dish", "sort over kitchen_dish"],
+        )
+        self.assertEqual(problems(plan, sql, {"kitchen_suggestion"}), [])
+        self.assertEqual(
+            problems(
+                ["SCAN kitchen_dish USING INDEX dish_name_idx"], sql,
+                {"kitchen_dish"},
+            ),
+            [],
+        )
+        self.assertEqual(
+            problems(
+                ["Limit", "  Sort by name", "    Seq Scan on kitchen_dish"],
+                sql, {"kitchen_dish"},
+            ),
+            ["full scan of kitchen_dish", "sort over kitchen_dish"],
+        )
+
+    def test_suggestion_list_uses_the_ordering_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("plan text is SQLite's")
+        output = self.audit(case=["suggestion-list"], min_rows=1, verbosity=2)
+        self.assertIn("suggestion_order_idx", output)
+        self.assertNotIn("full scan of kitchen_suggestion", output)
+
+    def test_strict_fails_on_flags(self):
+        with self.assertRaises(CommandError):
+            self.audit(case=["dish-list"], min_rows=1, strict=True)
@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase, override_settings
+
+from kitchen.models import Dish, DishType, Ingredient
+from kitchen.repository import LRUCache, cooks, dishes
+
+
+class RepositoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cook = get_user_model().objects.create_user(
+            username="cook", password="pw", first_name="Ann"
+        )
+        cls.dish_type = DishType.objects.create(name="Soup")
+        cls.salt = Ingredient.objects.create(name="Salt")
+        cls.dish = Dish.objects.create(
+            name="Borscht", description="desc", price=5,
+            dish_type=cls.dish_type,
+        )
+        cls.dish.ingredients.add(cls.salt)
+        cls.dish.cooks.add(cls.cook)
+
+    def setUp(self):
+        cache.clear()
+        dishes.local.clear()
+        cooks.local.clear()
+
+    def test_snapshot(self):
+        snapshot = dishes.get(self.dish.pk)
+        self.assertEqual(snapshot.name, "Borscht")
+        self.assertEqual(snapshot.dish_type.name, "Soup")
+        self.assertEqual(snapshot.ingredient_ids, {self.salt.pk})
+        self.assertEqual(snapshot.cook_ids, {self.cook.pk})
+        self.assertEqual(snapshot.cooks[0].first_name, "Ann")
+
+    def test_served_from_memory_then_shared_cache(self):
+        dishes.get(self.dish.pk)
+        # one cache round trip for the version, no query
+        with self.assertNumQueries(0):
+            dishes.get(self.dish.pk)
+
+        dishes.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(dishes.get(self.dish.pk).name, "Borscht")
+        self.assertEqual(len(dishes.local), 1)
+
+    def test_changes_invalidate_snapshots(self):
+        dishes.get(self.dish.pk)
+
+        self.dish.name = "Ukrainian borscht"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.save()
+        self.assertEqual(dishes.get(self.dish.pk).name, "Ukrainian borscht")
+
+        pepper = Ingredient.objects.create(name="Pepper")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.ingredients.add(pepper)
+        self.assertEqual(
+            dishes.get(self.dish.pk).ingredient_ids, {self.salt.pk, pepper.pk}
+        )
+
+        self.cook.first_name = "Anna"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cook.save()
+        self.assertEqual(cooks.get(self.cook.pk).first_name, "Anna")
+        self.assertEqual(dishes.get(self.dish.pk).cooks[0].first_name, "Anna")
+
+        self.dish_type.name = "Soups"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish_type.save()
+        self.assertEqual(dishes.get(self.dish.pk).dish_type.name, "Soups")
+
+    def test_versions_move_when_the_write_commits(self):
+        dishes.get(self.dish.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.name = "Ukrainian borscht"
+            self.dish.save()
+            # read inside the transaction, before the commit
+            self.assertEqual(dishes.get(self.dish.pk).name, "Borscht")
+        self.assertEqual(dishes.get(self.dish.pk).name, "Ukrainian borscht")
+
+    def test_deleted_objects_are_missing(self):
+        pk = self.dish.pk
+        dishes.get(pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.delete()
+
+        with self.assertRaises(Dish.DoesNotExist):
+            dishes.get(pk)
+        with self.assertRaises(Http404):
+            dishes.get_or_404(pk)
+        self.assertEqual(dishes.get_many([pk]), {})
+
+    def test_get_many_loads_misses_together(self):
+        other = Dish.objects.create(
+            name="Okroshka", description="desc", price=4,
+            dish_type=self.dish_type,
+        )
+        dishes.get(self.dish.pk)
+        found = dishes.get_many([self.dish.pk, other.pk])
+        self.assertEqual(set(found), {self.dish.pk, other.pk})
+        self.assertEqual(found[other.pk].cooks, ())
+
+
+@override_settings(KITCHEN_SNAPSHOT_LRU_SIZE=2)
+class LRUCacheTests(TestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache("KITCHEN_SNAPSHOT_LRU_SIZE")
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+
+        self.assertEqual(len(lru), 2)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("c"), 3)
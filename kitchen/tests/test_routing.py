@@ -0,0 +1,116 @@
+from importlib import import_module
+from time import time
+
+from django.conf import settings
+from django.db import connection, router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from kitchen.metrics import registry
+from kitchen.middleware import ReplicaRoutingMiddleware
+from kitchen.models import Dish
+from kitchen.routing import (
+    STICKY_SESSION_KEY,
+    ReplicaRouter,
+    reading_from,
+    settled_reads,
+)
+
+
+@override_settings(KITCHEN_READ_REPLICAS=["replica"])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        self.routed = []
+
+    def get_response(self, request):
+        self.routed.append(router.db_for_read(Dish))
+        return HttpResponse()
+
+    async def aget_response(self, request):
+        self.routed.append(router.db_for_read(Dish))
+        return HttpResponse()
+
+    def request(self, method, url):
+        request = getattr(self.factory, method)(url)
+        request.session = self.session
+        ReplicaRoutingMiddleware(self.get_response)(request)
+        return self.routed[-1]
+
+    def test_router(self):
+        replica_router = ReplicaRouter()
+        self.assertIsNone(replica_router.db_for_read(Dish))
+        with reading_from("replica"):
+            self.assertEqual(replica_router.db_for_read(Dish), "replica")
+            self.assertEqual(replica_router.db_for_write(Dish), "default")
+        self.assertFalse(replica_router.allow_migrate("replica", "kitchen"))
+        self.assertTrue(replica_router.allow_migrate("default", "kitchen"))
+
+    def test_list_and_detail_reads_go_to_a_replica(self):
+        self.assertEqual(
+            self.request("get", reverse("kitchen:dish-list")), "replica"
+        )
+        self.assertEqual(
+            self.request("get", reverse("kitchen:dish-detail", args=[1])),
+            "replica",
+        )
+        self.assertEqual(
+            self.request("get", reverse("kitchen:api-dish-list")), "replica"
+        )
+
+    def test_other_views_read_from_the_primary(self):
+        self.assertEqual(
+            self.request("get", reverse("kitchen:index")), "default"
+        )
+        self.assertEqual(
+            self.request("get", reverse("kitchen:dish-create")), "default"
+        )
+
+    def test_writes_stick_the_session_to_the_primary(self):
+        self.assertEqual(
+            self.request("post", reverse("kitchen:dish-create")), "default"
+        )
+        self.assertIn(STICKY_SESSION_KEY, self.session)
+        self.assertEqual(
+            self.request("get", reverse("kitchen:dish-list")), "default"
+        )
+
+        self.session[STICKY_SESSION_KEY] = 0
+        self.assertEqual(
+            self.request("get", reverse("kitchen:dish-list")), "replica"
+        )
+
+    def test_get_views_that_write_stick_too(self):
+        url = reverse("kitchen:dish-toggle-button", args=[1])
+        self.assertEqual(self.request("get", url), "default")
+        self.assertIn(STICKY_SESSION_KEY, self.session)
+
+    def test_recent_changes_are_read_from_the_primary(self):
+        with reading_from("replica"):
+            with settled_reads(int(time())) as on_primary:
+                self.assertTrue(on_primary)
+                self.assertEqual(router.db_for_read(Dish), "default")
+            with settled_reads(0) as on_primary:
+                self.assertFalse(on_primary)
+                self.assertEqual(router.db_for_read(Dish), "replica")
+
+    async def test_async(self):
+        middleware = ReplicaRoutingMiddleware(self.aget_response)
+        request = self.factory.get(reverse("kitchen:dish-list"))
+        request.session = self.session
+        await middleware(request)
+        self.assertEqual(self.routed, ["replica"])
+
+        request = self.factory.post(reverse("kitchen:dish-create"))
+        request.session = self.session
+        await middleware(request)
+        self.assertIn(STICKY_SESSION_KEY, self.session)
+
+    def test_queries_are_counted_per_alias(self):
+        list(Dish.objects.all())
+        self.assertIn(
+            f'kitchen_db_alias_queries_total{{alias="{connection.alias}"}}',
+            registry.render(),
+        )
@@ -0,0 +1,173 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from kitchen.models import DishType, Ingredient, Dish, Suggestion
+from kitchen.plans import explain
+from kitchen.search import (
+    TrigramSearchBackend,
+    install_search_indexes,
+    prefix_search,
+    search,
+    search_related,
+)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dish_type = DishType.objects.create(name="Main")
+        cls.cook = get_user_model().objects.create_user(
+            username="gordon",
+            password="pass",
+            first_name="Gordon",
+            last_name="Ramsay",
+        )
+        cls.pizza = Dish.objects.create(
+            name="Pizza Margherita",
+            description="desc",
+            price=10,
+            dish_type=cls.dish_type,
+        )
+        cls.pasta = Dish.objects.create(
+            name="Pasta Carbonara",
+            description="desc",
+            price=12,
+            dish_type=cls.dish_type,
+        )
+
+    def test_substring_match(self):
+        self.assertQuerySetEqual(
+            search(Dish.objects.all(), "arghe"),
+            [self.pizza],
+        )
+
+    def test_is_case_insensitive(self):
+        self.assertQuerySetEqual(
+            search(Dish.objects.all(), "CARBON"),
+            [self.pasta],
+        )
+
+    def test_short_query_falls_back_to_substring(self):
+        self.assertQuerySetEqual(
+            search(Dish.objects.all(), "pa"),
+            [self.pasta],
+        )
+
+    def test_index_follows_updates_and_deletes(self):
+        ingredient = Ingredient.objects.create(name="Basil")
+        self.assertEqual(search(Ingredient.objects.all(), "basil").count(), 1)
+
+        ingredient.name = "Oregano"
+        ingredient.save()
+        self.assertEqual(search(Ingredient.objects.all(), "basil").count(), 0)
+        self.assertEqual(search(Ingredient.objects.all(), "regan").count(), 1)
+
+        ingredient.delete()
+        self.assertEqual(search(Ingredient.objects.all(), "regan").count(), 0)
+
+    def test_cook_search_covers_all_name_columns(self):
+        for query in ("gordon", "amsa"):
+            with self.subTest(query=query):
+                self.assertQuerySetEqual(
+                    search(get_user_model().objects.all(), query),
+                    [self.cook],
+                )
+
+    def test_better_matches_rank_first(self):
+        exact = Dish.objects.create(
+            name="Soup",
+            description="desc",
+            price=5,
+            dish_type=self.dish_type,
+        )
+        Dish.objects.create(
+            name="Soup of the day with extra soup toppings and bread",
+            description="desc",
+            price=5,
+            dish_type=self.dish_type,
+        )
+        self.assertEqual(search(Dish.objects.all(), "soup").first(), exact)
+
+    def test_search_related(self):
+        suggestion = Suggestion.objects.create(
+            cook=self.cook, dish=self.pizza, text="More basil"
+        )
+        self.assertQuerySetEqual(
+            search_related(Suggestion.objects.all(), "dish", "margh"),
+            [suggestion],
+        )
+
+    def test_trigram_lookup_ignores_case_and_wildcards(self):
+        lookup = TrigramSearchBackend().lookup
+        self.assertQuerySetEqual(
+            Dish.objects.filter(lookup(Dish, "ARGHE")), [self.pizza]
+        )
+        self.assertFalse(Dish.objects.filter(lookup(Dish, "p%a")).exists())
+
+    def test_trigram_lookup_uses_the_trigram_index(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("trigram indexes are Postgres only")
+        queryset = Dish.objects.filter(
+            TrigramSearchBackend().lookup(Dish, "arghe")
+        ).values("pk")
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # too few rows for the planner to prefer an index otherwise
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = " ".join(explain(sql, params))
+        self.assertIn("kitchen_dish_name_trgm", plan)
+
+    def test_install_is_idempotent(self):
+        install_search_indexes(connection)
+        self.assertQuerySetEqual(
+            search(Dish.objects.all(), "pizza"),
+            [self.pizza],
+        )
+
+
+class PrefixSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tomato, cls.tofu, cls.thyme, cls.potato = (
+            Ingredient.objects.create(name=name)
+            for name in ("Tomato", "tofu", "Thyme", "Potato")
+        )
+        cls.cook = get_user_model().objects.create_user(
+            username="gr", password="pass", first_name="Gordon",
+            last_name="Ramsay",
+        )
+
+    def test_matches_start_ignoring_case_in_order(self):
+        self.assertQuerySetEqual(
+            prefix_search(Ingredient.objects.all(), "TO"),
+            [self.tofu, self.tomato],
+        )
+        self.assertQuerySetEqual(
+            prefix_search(Ingredient.objects.all(), "tom"), [self.tomato]
+        )
+        self.assertQuerySetEqual(
+            prefix_search(Ingredient.objects.all(), "ato"), []
+        )
+
+    def test_empty_prefix_lists_everything_in_order(self):
+        self.assertQuerySetEqual(
+            prefix_search(Ingredient.objects.all(), ""),
+            [self.potato, self.thyme, self.tofu, self.tomato],
+        )
+
+    def test_cook_prefix_covers_all_name_columns(self):
+        for prefix in ("gr", "gord", "rams"):
+            with self.subTest(prefix=prefix):
+                self.assertQuerySetEqual(
+                    prefix_search(get_user_model().objects.all(), prefix),
+                    [self.cook],
+                )
+
+    def test_uses_the_lower_index(self):
+        queryset = prefix_search(Ingredient.objects.all(), "to")[:20]
+        sql, params = queryset.query.sql_with_params()
+        plan = " ".join(explain(sql, params))
+        self.assertIn("ingredient_name_lower_idx", plan)
+        if connection.vendor == "sqlite":
+            self.assertNotIn("TEMP B-TREE", plan)
@@ -1,8 +1,18 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import m2m_changed
+from django.test import TestCase, override_settings
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from kitchen.buffered import visits
+from kitchen.metrics import registry
 from kitchen.models import DishType, Ingredient, Dish, Suggestion
+from kitchen.moderation import moderate
+from kitchen.nplusone import QueryRepeatDetector
+from kitchen.versions import get_versions
 from kitchen.forms import (
     DishTypeSearchForm,
     DishSearchForm,
@@ -67,7 +77,8 @@ class DishToggleButtonTests(BaseViewTest):
         self.client.force_login(self.normal_user)
         url = reverse("kitchen:dish-toggle-button", args=[self.dish.pk])
 
-        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(url)
         self.normal_user.refresh_from_db()
         self.assertIn(self.dish, self.normal_user.dishes.all())
 
@@ -76,6 +87,104 @@ class DishToggleButtonTests(BaseViewTest):
         self.assertNotIn(self.dish, self.normal_user.dishes.all())
 
 
+class DishAssignmentTests(BaseViewTest):
+    def setUp(self):
+        self.client.force_login(self.normal_user)
+        self.assign_url = reverse("kitchen:dish-assign", args=[self.dish.pk])
+        self.unassign_url = reverse(
+            "kitchen:dish-unassign", args=[self.dish.pk]
+        )
+
+    def test_assign_is_idempotent(self):
+        for changed in (True, False):
+            with self.subTest(changed=changed):
+                response = self.client.post(
+                    self.assign_url, HTTP_ACCEPT="application/json"
+                )
+                self.assertEqual(
+                    response.json(),
+                    {"dish": self.dish.pk, "assigned": True,
+                     "changed": changed},
+                )
+        self.assertEqual(
+            list(self.dish.cooks.all()), [self.normal_user]
+        )
+
+    def test_unassign_is_idempotent(self):
+        self.dish.cooks.add(self.normal_user)
+        for changed in (True, False):
+            with self.subTest(changed=changed):
+                response = self.client.post(
+                    self.unassign_url, HTTP_ACCEPT="application/json"
+                )
+                self.assertFalse(response.json()["assigned"])
+                self.assertEqual(response.json()["changed"], changed)
+        self.assertFalse(self.dish.cooks.exists())
+
+    def test_assign_runs_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.assign_url)
+        writes = [
+            query["sql"] for query in queries
+            if "kitchen_dish_cooks" in query["sql"]
+            and not query["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith("INSERT"))
+
+    def test_fragment_response(self):
+        response = self.client.post(
+            self.assign_url, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+        self.assertContains(response, "Remove me from cooks")
+        self.assertContains(response, self.unassign_url)
+
+    def test_plain_post_redirects_to_dish(self):
+        response = self.client.post(self.assign_url)
+        self.assertRedirects(
+            response, reverse("kitchen:dish-detail", args=[self.dish.pk])
+        )
+
+    def test_get_is_not_allowed(self):
+        self.assertEqual(self.client.get(self.assign_url).status_code, 405)
+
+    def test_missing_dish_is_not_found(self):
+        url = reverse("kitchen:dish-assign", args=[self.dish.pk + 100])
+        self.assertEqual(self.client.post(url).status_code, 404)
+
+    def test_assignment_invalidates_dish_card(self):
+        before = get_versions("dish", [self.dish.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.assign_url)
+        self.assertNotEqual(get_versions("dish", [self.dish.pk]), before)
+
+    def test_bulk_assign_is_staff_only(self):
+        url = reverse("kitchen:dish-cook-assign")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_bulk_assign(self):
+        self.client.force_login(self.staff_user)
+        other = Dish.objects.create(
+            name="Pasta",
+            description="desc",
+            price=12,
+            dish_type=self.dish_type,
+        )
+        self.dish.cooks.add(self.normal_user)
+        response = self.client.post(
+            reverse("kitchen:dish-cook-assign"),
+            {
+                "dishes": [self.dish.pk, other.pk],
+                "cooks": [self.normal_user.pk, self.staff_user.pk],
+            },
+        )
+        self.assertRedirects(response, reverse("kitchen:dish-list"))
+        for dish in (self.dish, other):
+            self.assertCountEqual(
+                dish.cooks.all(), [self.normal_user, self.staff_user]
+            )
+
+
 class DishViewTests(BaseViewTest):
     def test_dish_list_filters_by_name(self):
         self.client.force_login(self.normal_user)
@@ -88,14 +197,56 @@ class DishViewTests(BaseViewTest):
             "piz"
         )
 
-    def test_dish_detail_view_prefetches_related(self):
+    def test_dish_list_ignores_out_of_range_ids(self):
+        self.client.force_login(self.normal_user)
+        for pk in ("99999999999999999999999", "0", "-1"):
+            with self.subTest(pk=pk):
+                response = self.client.get(
+                    reverse("kitchen:dish-list"), {"dish_type": pk}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_dish_list_filters_by_facets(self):
+        self.client.force_login(self.normal_user)
+        other_type = DishType.objects.create(name="Other Type")
+        Dish.objects.create(
+            name="Salad", description="desc", price=4, dish_type=other_type
+        )
+        url = reverse("kitchen:dish-list")
+
+        response = self.client.get(
+            url, {"dish_type": other_type.pk, "max_price": "10"}
+        )
+        self.assertEqual(
+            [dish.name for dish in response.context["dish_list"]], ["Salad"]
+        )
+        # Pizza is over the price limit
+        dish_types = response.context["facets"][0]
+        self.assertEqual(
+            [(o.label, o.dishes, o.selected) for o in dish_types.options],
+            [("Other Type", 1, True)],
+        )
+        self.assertContains(response, "Clear filters")
+
+        response = self.client.get(url, {"ingredient": self.ingredient.pk})
+        self.assertEqual(
+            [dish.name for dish in response.context["dish_list"]], ["Pizza"]
+        )
+
+    def test_dish_detail_view_serves_cached_snapshot(self):
         self.client.force_login(self.normal_user)
         url = reverse("kitchen:dish-detail", args=[self.dish.pk])
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertIn(
-            "ingredients",
-            response.context["dish"]._prefetched_objects_cache
+        self.assertEqual(
+            response.context["dish"].ingredient_ids,
+            set(self.dish.ingredients.values_list("pk", flat=True)),
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(
+            any("kitchen_dish" in query["sql"] for query in queries)
         )
 
 
@@ -113,6 +264,33 @@ class IngredientViewTests(BaseViewTest):
         self.assertIsInstance(form, DishSearchForm)
         self.assertEqual(form.initial["name"], "tom")
 
+    def test_ingredient_list_sorts_by_dish_count(self):
+        self.client.force_login(self.normal_user)
+        Ingredient.objects.create(name="Basil")
+        url = reverse("kitchen:ingredient-list")
+
+        response = self.client.get(url, {"sort": "popular"})
+        self.assertEqual(
+            [i.name for i in response.context["ingredient_list"]],
+            ["Tomato", "Basil"],
+        )
+        self.assertEqual(response.context["sort"], "popular")
+        self.assertContains(response, "Used in 1 dish")
+
+        response = self.client.get(url, {"sort": "popular", "cursor": ""})
+        self.assertEqual(
+            [i.name for i in response.context["ingredient_list"]],
+            ["Tomato", "Basil"],
+        )
+
+    def test_unknown_sort_is_ignored(self):
+        self.client.force_login(self.normal_user)
+        response = self.client.get(
+            reverse("kitchen:ingredient-list"), {"sort": "price"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["sort"])
+
     def test_staff_can_create_update_delete(self):
         self.client.force_login(self.staff_user)
         urls = [
@@ -261,6 +439,499 @@ class SuggestionViewTests(BaseViewTest):
         )
         response = self.client.get(detail_url)
         self.assertEqual(response.status_code, 200)
-        self.client.get(approve_url)
+        self.assertEqual(self.client.get(approve_url).status_code, 405)
+        self.client.post(approve_url)
         self.suggestion.refresh_from_db()
         self.assertTrue(self.suggestion.approved)
+
+        self.client.post(
+            reverse("kitchen:suggestion-reject", args=[self.suggestion.pk])
+        )
+        self.suggestion.refresh_from_db()
+        self.assertFalse(self.suggestion.approved)
+        self.assertTrue(self.suggestion.rejected)
+
+    def test_only_staff_decide_suggestions(self):
+        self.client.force_login(self.normal_user)
+        response = self.client.post(
+            reverse("kitchen:suggestion-approve", args=[self.suggestion.pk])
+        )
+        self.assertEqual(response.status_code, 403)
+        self.suggestion.refresh_from_db()
+        self.assertFalse(self.suggestion.approved)
+
+        self.client.force_login(self.staff_user)
+        response = self.client.post(
+            reverse("kitchen:suggestion-approve", args=[0])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class DishUpdateM2MTests(BaseViewTest):
+    def setUp(self):
+        self.ingredients = [self.ingredient] + Ingredient.objects.bulk_create(
+            Ingredient(name=f"Spice {index}") for index in range(50)
+        )
+        self.dish.ingredients.add(*self.ingredients)
+        self.dish.cooks.add(self.normal_user)
+        self.client.force_login(self.staff_user)
+
+    def post_update(self, ingredients, cooks):
+        changes = []
+
+        def record(sender, action, pk_set, **kwargs):
+            changes.append((sender, action, pk_set))
+
+        m2m_changed.connect(record)
+        self.addCleanup(m2m_changed.disconnect, record)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("kitchen:dish-update", args=[self.dish.pk]),
+                {
+                    "name": self.dish.name,
+                    "description": self.dish.description,
+                    "price": self.dish.price,
+                    "dish_type": self.dish_type.pk,
+                    "ingredients": [obj.pk for obj in ingredients],
+                    "cooks": [obj.pk for obj in cooks],
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        return changes, [query["sql"] for query in queries]
+
+    def test_only_the_difference_is_written(self):
+        basil = Ingredient.objects.create(name="Basil")
+        ingredients = self.ingredients[1:] + [basil]
+        changes, queries = self.post_update(ingredients, [self.staff_user])
+
+        self.assertCountEqual(self.dish.ingredients.all(), ingredients)
+        self.assertCountEqual(self.dish.cooks.all(), [self.staff_user])
+        through_writes = [
+            sql for sql in queries
+            if sql.startswith(("INSERT", "DELETE"))
+            and ("dish_cooks" in sql or "dish_ingredients" in sql)
+        ]
+        self.assertEqual(len(through_writes), 4)
+        self.assertEqual(
+            [(action, pk_set) for _, action, pk_set in changes],
+            [
+                ("pre_remove", {self.ingredients[0].pk}),
+                ("post_remove", {self.ingredients[0].pk}),
+                ("pre_add", {basil.pk}),
+                ("post_add", {basil.pk}),
+                ("pre_remove", {self.normal_user.pk}),
+                ("post_remove", {self.normal_user.pk}),
+                ("pre_add", {self.staff_user.pk}),
+                ("post_add", {self.staff_user.pk}),
+            ],
+        )
+
+    def test_unchanged_relations_are_not_written(self):
+        changes, queries = self.post_update(
+            self.ingredients, [self.normal_user]
+        )
+        self.assertEqual(changes, [])
+        self.assertFalse(
+            any(sql.startswith(("INSERT", "DELETE")) for sql in queries)
+        )
+
+
+class AutocompleteViewTests(BaseViewTest):
+    def test_requires_login(self):
+        url = reverse("kitchen:ingredient-autocomplete")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_ingredient_pages(self):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f"Tomato {index:02}") for index in range(25)
+        )
+        self.client.force_login(self.staff_user)
+        url = reverse("kitchen:ingredient-autocomplete")
+
+        with self.assertNumQueries(2):
+            first = self.client.get(url, {"term": "tom"}).json()
+        self.assertEqual(len(first["results"]), 20)
+        self.assertTrue(first["more"])
+        self.assertEqual(first["results"][0]["text"], "Tomato")
+
+        second = self.client.get(url, {"term": "tom", "page": 2}).json()
+        self.assertEqual(
+            [result["text"] for result in second["results"]],
+            [f"Tomato {index:02}" for index in range(19, 25)],
+        )
+        self.assertFalse(second["more"])
+
+    def test_dish_pages(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(
+            reverse("kitchen:dish-autocomplete"), {"term": self.dish.name[:3]}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.dish.pk, "text": self.dish.name}],
+        )
+
+    def test_cook_labels(self):
+        get_user_model().objects.filter(pk=self.normal_user.pk).update(
+            first_name="Nora", last_name="Ng"
+        )
+        self.client.force_login(self.staff_user)
+        response = self.client.get(
+            reverse("kitchen:cook-autocomplete"), {"term": "no"}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.normal_user.pk, "text": "Nora Ng (normal)"}],
+        )
+
+
+class SuggestionModerationTests(BaseViewTest):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.soup = Dish.objects.create(
+            name="Soup", description="desc", price=4,
+            dish_type=cls.dish_type,
+        )
+        cls.pending = Suggestion.objects.bulk_create(
+            Suggestion(cook=cook, dish=dish, text=f"Idea {index}")
+            for index, (cook, dish) in enumerate(
+                [(cls.staff_user, cls.soup), (cls.normal_user, cls.soup)] * 3
+            )
+        )
+        cls.approved = Suggestion.objects.create(
+            cook=cls.normal_user, dish=cls.dish, text="Done",
+            approved=True,
+        )
+        cls.url = reverse("kitchen:suggestion-moderation")
+
+    def test_queue_is_staff_only(self):
+        self.client.force_login(self.normal_user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        response = self.client.post(
+            self.url,
+            {"action": "approve", "suggestions": [self.suggestion.pk]},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_queue_lists_pending_and_filters(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(self.url)
+        self.assertNotIn(self.approved, response.context["suggestion_list"])
+        self.assertEqual(len(response.context["suggestion_list"]), 7)
+
+        response = self.client.get(self.url, {"dish_name": "soup"})
+        self.assertEqual(len(response.context["suggestion_list"]), 6)
+
+        response = self.client.get(
+            self.url, {"dish_name": "soup", "cook": "normal"}
+        )
+        self.assertEqual(
+            {s.cook for s in response.context["suggestion_list"]},
+            {self.normal_user},
+        )
+        self.assertEqual(len(response.context["suggestion_list"]), 3)
+
+    def test_bulk_decisions_run_one_update(self):
+        self.client.force_login(self.staff_user)
+        ids = [suggestion.pk for suggestion in self.pending]
+        url = f"{self.url}?dish_name=soup"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                url, {"action": "reject", "suggestions": ids}
+            )
+        self.assertRedirects(
+            response, url, fetch_redirect_response=False
+        )
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            Suggestion.objects.filter(pk__in=ids, rejected=True).count(),
+            len(ids),
+        )
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.context["suggestion_list"]), 0)
+
+    def test_out_of_range_ids_are_rejected(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.post(self.url, {
+            "action": "approve",
+            "suggestions": [self.pending[0].pk, 2 ** 63],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(
+            Suggestion.objects.filter(pk=self.pending[0].pk, approved=True)
+            .exists()
+        )
+
+    def test_moderate_batches_and_skips_decided_rows(self):
+        ids = [suggestion.pk for suggestion in self.pending]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                moderate(ids + [self.approved.pk], True, batch_size=4), 6
+            )
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(moderate(ids, True), 0)
+
+
+class PerformanceInstrumentationTests(BaseViewTest):
+    def setUp(self):
+        registry.reset()
+
+    def test_server_timing_header(self):
+        self.client.force_login(self.normal_user)
+        response = self.client.get(reverse("kitchen:dish-list"))
+        header = response["Server-Timing"]
+        for metric in ("db;dur=", "tpl;dur=", "view;dur=", "total;dur="):
+            self.assertIn(metric, header)
+
+    @override_settings(KITCHEN_SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        self.client.force_login(self.normal_user)
+        response = self.client.get(reverse("kitchen:dish-list"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_metrics_endpoint_reports_views_by_url_name(self):
+        self.client.force_login(self.staff_user)
+        self.client.get(reverse("kitchen:dish-list"))
+        response = self.client.get(reverse("kitchen:metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(
+            response,
+            "kitchen_request_duration_seconds_count"
+            '{view="kitchen:dish-list"} 1',
+        )
+        self.assertContains(response, "kitchen_db_queries_bucket")
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.client.force_login(self.normal_user)
+        response = self.client.get(reverse("kitchen:metrics"))
+        self.assertEqual(response.status_code, 403)
+
+
+class QueryBudgetTests(BaseViewTest):
+    """Query counts must not grow with the number of rows on a page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cooks = [
+            get_user_model().objects.create_user(
+                username=f"cook{index}", password="pass"
+            )
+            for index in range(3)
+        ]
+        for index in range(3):
+            dish = Dish.objects.create(
+                name=f"Dish {index}",
+                description="desc",
+                price=5,
+                dish_type=cls.dish_type,
+            )
+            dish.cooks.add(*cooks)
+            dish.ingredients.add(
+                cls.ingredient,
+                Ingredient.objects.create(name=f"Ingredient {index}"),
+            )
+            Suggestion.objects.create(
+                cook=cls.normal_user, dish=dish, text="Idea"
+            )
+
+    def assertQueryBudget(self, url, budget):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{url} ran {len(queries)} queries, budget is {budget}",
+        )
+
+    @override_settings(
+        KITCHEN_VISITS_FLUSH_SIZE=1000, KITCHEN_VISITS_FLUSH_SECONDS=3600
+    )
+    def test_list_and_detail_views_stay_within_budget(self):
+        # Visits are flushed in batches; a hit only buffers its count.
+        self.addCleanup(visits.discard)
+        self.client.force_login(self.staff_user)
+        budgets = {
+            reverse("kitchen:index"): 3,
+            reverse("kitchen:dish-list"): 6,
+            reverse("kitchen:dish-detail", args=[self.dish.pk]): 5,
+            reverse("kitchen:ingredient-list"): 4,
+            reverse("kitchen:dish-type-list"): 4,
+            reverse(
+                "kitchen:dish-type-detail", args=[self.dish_type.pk]
+            ): 4,
+            reverse("kitchen:cook-list"): 4,
+            reverse("kitchen:cook-detail", args=[self.normal_user.pk]): 4,
+            reverse("kitchen:suggestion-list"): 4,
+            reverse(
+                "kitchen:suggestion-detail", args=[self.suggestion.pk]
+            ): 3,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget)
+
+
+class NPlusOneDetectionTests(BaseViewTest):
+    def test_repeated_query_from_one_site_is_reported(self):
+        detector = QueryRepeatDetector(threshold=2)
+        with connection.execute_wrapper(detector):
+            for dish_id in Dish.objects.values_list("pk", flat=True):
+                Dish.objects.get(pk=dish_id)
+            Dish.objects.get(pk=self.dish.pk)
+        self.assertEqual(detector.offenders(), [])
+
+        with connection.execute_wrapper(detector):
+            for _ in range(2):
+                Dish.objects.get(pk=self.dish.pk)
+        (site, shape, count), = detector.offenders()
+        self.assertIn("test_views.py", site)
+        self.assertEqual(count, 2)
+
+    def test_template_call_site_is_reported(self):
+        Ingredient.objects.create(name="Cheese")
+        template = Template(
+            "{% for ingredient in ingredients %}"
+            "{{ ingredient.dishes.count }}"
+            "{% endfor %}"
+        )
+        detector = QueryRepeatDetector(threshold=2)
+        with connection.execute_wrapper(detector):
+            template.render(Context({"ingredients": Ingredient.objects.all()}))
+        (site, shape, count), = detector.offenders()
+        self.assertTrue(site.endswith(":1"))
+        self.assertIn("COUNT(*)", shape)
+
+
+class DishCardCacheTests(BaseViewTest):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.normal_user)
+
+    def get_card(self):
+        response = self.client.get(reverse("kitchen:dish-list"))
+        (card,) = response.context["dish_cards"]
+        return card
+
+    def test_cached_cards_skip_m2m_queries(self):
+        self.get_card()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_card()
+        through_tables = (
+            Dish.ingredients.through._meta.db_table,
+            Dish.cooks.through._meta.db_table,
+        )
+        for query in queries:
+            for table in through_tables:
+                self.assertNotIn(table, query["sql"])
+
+    def test_card_follows_dish_relation_changes(self):
+        self.assertIn("Tomato", self.get_card())
+
+        basil = Ingredient.objects.create(name="Basil")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.ingredients.add(basil)
+        self.assertIn("Basil", self.get_card())
+
+        basil.name = "Thai basil"
+        with self.captureOnCommitCallbacks(execute=True):
+            basil.save()
+        self.assertIn("Thai basil", self.get_card())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.cooks.add(self.staff_user)
+        self.assertIn("staff", self.get_card())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.staff_user.delete()
+        self.assertNotIn("staff", self.get_card())
+
+    def test_card_follows_dish_type_rename(self):
+        self.dish_type.name = "Renamed Type"
+        self.dish_type.save()
+        self.assertIn("Renamed Type", self.get_card())
+
+    def test_login_does_not_invalidate_cards(self):
+        self.dish.cooks.add(self.normal_user)
+        card = self.get_card()
+        versions = get_versions("dish", [self.dish.pk])
+        self.client.login(username="normal", password="pass")
+        self.assertEqual(get_versions("dish", [self.dish.pk]), versions)
+        self.assertEqual(self.get_card(), card)
+
+
+class ConditionalGetTests(BaseViewTest):
+    def setUp(self):
+        self.client.force_login(self.normal_user)
+        self.url = reverse("kitchen:dish-list")
+
+    def revalidate(self, response, url=None):
+        return self.client.get(
+            url or self.url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+
+    def test_unchanged_page_is_not_modified_without_queries(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as queries:
+            revalidated = self.revalidate(response)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["ETag"], response["ETag"])
+        self.assertFalse(
+            any("kitchen_dish" in query["sql"] for query in queries)
+        )
+
+    def test_change_to_rendered_model_invalidates(self):
+        response = self.client.get(self.url)
+        self.ingredient.name = "Cherry tomato"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ingredient.save()
+        self.assertEqual(self.revalidate(response).status_code, 200)
+
+    def test_cascades_touch_each_watermark_once(self):
+        soup = Dish.objects.create(
+            name="Soup", description="", price=5, dish_type=self.dish_type
+        )
+        Suggestion.objects.bulk_create(
+            Suggestion(cook=self.normal_user, dish=soup, text=f"No. {index}")
+            for index in range(5)
+        )
+        with self.captureOnCommitCallbacks() as one_suggestion:
+            self.dish.delete()
+        with self.captureOnCommitCallbacks() as five_suggestions:
+            soup.delete()
+        self.assertEqual(len(five_suggestions), len(one_suggestion))
+
+    def test_m2m_change_invalidates(self):
+        response = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.cooks.add(self.staff_user)
+        self.assertEqual(self.revalidate(response).status_code, 200)
+
+    def test_validators_differ_per_user_and_query(self):
+        response = self.client.get(self.url)
+        searched = self.client.get(self.url, {"name": "piz"})
+        self.assertNotEqual(response["ETag"], searched["ETag"])
+
+        self.client.force_login(self.staff_user)
+        self.assertEqual(self.revalidate(response).status_code, 200)
+
+    def test_detail_view_supports_conditional_get(self):
+        url = reverse("kitchen:dish-detail", args=[self.dish.pk])
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(response, url).status_code, 304)
+
+    def test_missing_object_is_not_cached(self):
+        url = reverse("kitchen:dish-detail", args=[self.dish.pk + 100])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response)
@@ -1,135 +1,246 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 
+from kitchen import async_views, views
+from kitchen.api import (
+    CookApiView,
+    DishApiView,
+    DishTypeApiView,
+    IngredientApiView,
+    SuggestionApiView,
+)
 from kitchen.views import (
-    index,
+    metrics_view,
+    export_view,
     dish_toggle_button,
+    dish_assign_view,
+    dish_unassign_view,
     suggestion_approve_view,
+    suggestion_reject_view,
 
-    DishListView,
-    DishDetailView,
     DishCreateView,
     DishUpdateView,
     DishDeleteView,
+    DishCookAssignView,
+    DishAutocompleteView,
+    IngredientAutocompleteView,
+    CookAutocompleteView,
 
-    IngredientListView,
     IngredientCreateView,
     IngredientUpdateView,
     IngredientDeleteView,
 
-    DishTypeListView,
-    DishTypeDetailView,
     DishTypeCreateView,
     DishTypeUpdateView,
     DishTypeDeleteView,
 
-    CookListView,
-    CookDetailView,
     CookCreateView,
     CookUpdateView,
     CookDeleteView,
     CookPasswordResetView,
 
     SuggestionCreateView,
-    SuggestionListView,
-    SuggestionDetailView
+    SuggestionModerationView,
 )
 
-urlpatterns = [
-    path("", index, name="index"),
-    path("dishes/", DishListView.as_view(), name="dish-list"),
-    path("dishes/create/", DishCreateView.as_view(), name="dish-create"),
-    path("dishes/<int:pk>/", DishDetailView.as_view(), name="dish-detail"),
-    path(
-        "dishes/<int:pk>/update/",
-        DishUpdateView.as_view(),
-        name="dish-update"
-    ),
-    path(
-        "dishes/<int:pk>/delete/",
-        DishDeleteView.as_view(),
-        name="dish-delete"
-    ),
-    path(
-        "dishes/<int:pk>/toggle-button/",
-        dish_toggle_button,
-        name="dish-toggle-button"
-    ),
-
-    path("ingredients/", IngredientListView.as_view(), name="ingredient-list"),
-    path(
-        "ingredients/create/",
-        IngredientCreateView.as_view(),
-        name="ingredient-create"
-    ),
-    path(
-        "ingredients/<int:pk>/update/",
-        IngredientUpdateView.as_view(),
-        name="ingredient-update"
-    ),
-    path(
-        "ingredients/<int:pk>/delete/",
-        IngredientDeleteView.as_view(),
-        name="ingredient-delete"
-    ),
-
-    path("dish_types/", DishTypeListView.as_view(), name="dish-type-list"),
-    path(
-        "dish_types/create/",
-        DishTypeCreateView.as_view(),
-        name="dish-type-create"
-    ),
-    path(
-        "dish_types/<int:pk>/",
-        DishTypeDetailView.as_view(),
-        name="dish-type-detail"
-    ),
-    path(
-        "dish_types/<int:pk>/update/",
-        DishTypeUpdateView.as_view(),
-        name="dish-type-update"
-    ),
-    path(
-        "dish_types/<int:pk>/delete/",
-        DishTypeDeleteView.as_view(),
-        name="dish-type-delete"
-    ),
-
-    path("cooks/", CookListView.as_view(), name="cook-list"),
-    path("cooks/<int:pk>/", CookDetailView.as_view(), name="cook-detail"),
-    path("cooks/create/", CookCreateView.as_view(), name="cook-create"),
-    path(
-        "cooks/<int:pk>/update/",
-        CookUpdateView.as_view(),
-        name="cook-update"
-    ),
-    path(
-        "cooks/<int:pk>/password-reset/",
-        CookPasswordResetView.as_view(),
-        name="cook-password-reset"
-    ),
-    path(
-        "cooks/<int:pk>/delete/",
-        CookDeleteView.as_view(),
-        name="cook-delete"
-    ),
-    path(
-        "dishes/<int:dish_id>/suggest/",
-        SuggestionCreateView.as_view(),
-        name="suggestion-create"
-    ),
-    path("suggestions/", SuggestionListView.as_view(), name="suggestion-list"),
-    path(
-        "suggestions/<int:pk>/",
-        SuggestionDetailView.as_view(),
-        name="suggestion-detail"
-    ),
-    path(
-        "suggestions/<int:pk>/approve/",
-        suggestion_approve_view,
-        name="suggestion-approve"
-    ),
-
-]
+
+def build_urlpatterns(read_views):
+    """
+    The kitchen routes with ``index`` and the list/detail views taken
+    from ``read_views``: ``kitchen.views`` or ``kitchen.async_views``.
+    """
+    return [
+        path("", read_views.index, name="index"),
+        path("metrics/", metrics_view, name="metrics"),
+        re_path(
+            r"^exports/(?P<name>dishes|cooks|suggestions)"
+            r"\.(?P<file_format>csv|jsonl)$",
+            export_view,
+            name="export"
+        ),
+        path("dishes/", read_views.DishListView.as_view(), name="dish-list"),
+        path("dishes/create/", DishCreateView.as_view(), name="dish-create"),
+        path(
+            "dishes/autocomplete/",
+            DishAutocompleteView.as_view(),
+            name="dish-autocomplete"
+        ),
+        path(
+            "dishes/<int:pk>/",
+            read_views.DishDetailView.as_view(),
+            name="dish-detail"
+        ),
+        path(
+            "dishes/<int:pk>/update/",
+            DishUpdateView.as_view(),
+            name="dish-update"
+        ),
+        path(
+            "dishes/<int:pk>/delete/",
+            DishDeleteView.as_view(),
+            name="dish-delete"
+        ),
+        path(
+            "dishes/<int:pk>/toggle-button/",
+            dish_toggle_button,
+            name="dish-toggle-button"
+        ),
+        path(
+            "dishes/<int:pk>/assign/",
+            dish_assign_view,
+            name="dish-assign"
+        ),
+        path(
+            "dishes/<int:pk>/unassign/",
+            dish_unassign_view,
+            name="dish-unassign"
+        ),
+        path(
+            "dishes/assign-cooks/",
+            DishCookAssignView.as_view(),
+            name="dish-cook-assign"
+        ),
+
+        path(
+            "ingredients/",
+            read_views.IngredientListView.as_view(),
+            name="ingredient-list"
+        ),
+        path(
+            "ingredients/autocomplete/",
+            IngredientAutocompleteView.as_view(),
+            name="ingredient-autocomplete"
+        ),
+        path(
+            "ingredients/create/",
+            IngredientCreateView.as_view(),
+            name="ingredient-create"
+        ),
+        path(
+            "ingredients/<int:pk>/update/",
+            IngredientUpdateView.as_view(),
+            name="ingredient-update"
+        ),
+        path(
+            "ingredients/<int:pk>/delete/",
+            IngredientDeleteView.as_view(),
+            name="ingredient-delete"
+        ),
+
+        path(
+            "dish_types/",
+            read_views.DishTypeListView.as_view(),
+            name="dish-type-list"
+        ),
+        path(
+            "dish_types/create/",
+            DishTypeCreateView.as_view(),
+            name="dish-type-create"
+        ),
+        path(
+            "dish_types/<int:pk>/",
+            read_views.DishTypeDetailView.as_view(),
+            name="dish-type-detail"
+        ),
+        path(
+            "dish_types/<int:pk>/update/",
+            DishTypeUpdateView.as_view(),
+            name="dish-type-update"
+        ),
+        path(
+            "dish_types/<int:pk>/delete/",
+            DishTypeDeleteView.as_view(),
+            name="dish-type-delete"
+        ),
+
+        path("cooks/", read_views.CookListView.as_view(), name="cook-list"),
+        path(
+            "cooks/<int:pk>/",
+            read_views.CookDetailView.as_view(),
+            name="cook-detail"
+        ),
+        path("cooks/create/", CookCreateView.as_view(), name="cook-create"),
+        path(
+            "cooks/autocomplete/",
+            CookAutocompleteView.as_view(),
+            name="cook-autocomplete"
+        ),
+        path(
+            "cooks/<int:pk>/update/",
+            CookUpdateView.as_view(),
+            name="cook-update"
+        ),
+        path(
+            "cooks/<int:pk>/password-reset/",
+            CookPasswordResetView.as_view(),
+            name="cook-password-reset"
+        ),
+        path(
+            "cooks/<int:pk>/delete/",
+            CookDeleteView.as_view(),
+            name="cook-delete"
+        ),
+        path(
+            "dishes/<int:dish_id>/suggest/",
+            SuggestionCreateView.as_view(),
+            name="suggestion-create"
+        ),
+        path(
+            "suggestions/",
+            read_views.SuggestionListView.as_view(),
+            name="suggestion-list"
+        ),
+        path(
+            "suggestions/moderation/",
+            SuggestionModerationView.as_view(),
+            name="suggestion-moderation"
+        ),
+        path(
+            "suggestions/<int:pk>/",
+            read_views.SuggestionDetailView.as_view(),
+            name="suggestion-detail"
+        ),
+        path(
+            "suggestions/<int:pk>/approve/",
+            suggestion_approve_view,
+            name="suggestion-approve"
+        ),
+        path(
+            "suggestions/<int:pk>/reject/",
+            suggestion_reject_view,
+            name="suggestion-reject"
+        ),
+
+    ] + api_urlpatterns()
+
+
+def api_urlpatterns():
+    patterns = []
+    for prefix, name, view in (
+        ("dishes", "dish", DishApiView),
+        ("ingredients", "ingredient", IngredientApiView),
+        ("dish_types", "dish-type", DishTypeApiView),
+        ("cooks", "cook", CookApiView),
+        ("suggestions", "suggestion", SuggestionApiView),
+    ):
+        patterns += [
+            path(
+                f"api/{prefix}/",
+                view.as_view(),
+                name=f"api-{name}-list"
+            ),
+            path(
+                f"api/{prefix}/<int:pk>/",
+                view.as_view(),
+                name=f"api-{name}-detail"
+            ),
+        ]
+    return patterns
+
+
+urlpatterns = build_urlpatterns(
+    async_views if settings.KITCHEN_ASYNC_VIEWS else views
+)
 
 
 app_name = "kitchen"
@@ -0,0 +1,45 @@
+"""
+Per-object version tokens stored in the default cache.
+
+Cache entries derived from an object embed its current version in their
+key; bumping the version makes every derived entry unreachable at once.
+A version missing from the cache (evicted, cold start) is replaced by a
+fresh random token, so stale entries are never matched by accident.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _key(namespace, pk) -> str:
+    return f"kitchen:version:{namespace}:{pk}"
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def get_versions(namespace, pks) -> dict:
+    """Return ``{pk: version}`` for ``pks`` with one cache round trip."""
+    keys = {_key(namespace, pk): pk for pk in pks}
+    found = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys.keys() - found.keys()}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {pk: found[key] for key, pk in keys.items()}
+
+
+def bump_versions(namespace, pks):
+    """
+    Give ``pks`` new versions once the current transaction commits;
+    anything read before then still sees the old rows and must not be
+    stored under the new versions.
+    """
+    pks = set(pks)
+    if pks:
+        transaction.on_commit(lambda: cache.set_many(
+            {_key(namespace, pk): _new_version() for pk in pks},
+            timeout=None,
+        ))
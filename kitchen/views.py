@@ -1,42 +1,71 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Q, Count
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
-from django.shortcuts import render
+from django.core.exceptions import PermissionDenied
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy, reverse
 from django.views import generic
-
+from django.views.decorators.http import require_POST
+
+from kitchen.assignments import assign_cook, bulk_assign, unassign_cook
+from kitchen.buffered import visits
+from kitchen.conditional import ConditionalGetMixin
+from kitchen.facets import DishFilters, build_facets
+from kitchen.counters import read_counters
+from kitchen.exporting import CONTENT_TYPES, export
+from kitchen.fragments import render_dish_cards
 from kitchen.forms import (
     CookCreationForm,
     CookUpdateForm,
+    DishFilterForm,
     DishSearchForm,
     DishTypeSearchForm,
     CookSearchForm,
     CookPasswordResetForm,
     SuggestionForm,
     SuggestionSearchForm, DishForm,
+    DishCookAssignForm,
+    SuggestionModerationForm,
+    SuggestionModerationSearchForm,
+    cook_label,
 )
+from kitchen.metrics import registry
+from kitchen.moderation import moderate
 from kitchen.models import (
     Dish,
+    DishCard,
     Ingredient,
     DishType,
     Suggestion
 )
+from kitchen.pagination import KitchenPaginationMixin
+from kitchen.repository import dishes
+from kitchen.routing import primary
+from kitchen.search import prefix_search, search, search_related
 
 
 @login_required
 def index(request: HttpRequest) -> HttpResponse:
-    num_dishes = Dish.objects.count()
-    num_ingredients = Ingredient.objects.count()
-    num_dish_types = DishType.objects.count()
-    num_cooks = get_user_model().objects.count()
-    num_visits = request.session.get("num_visits", 0) + 1
-    request.session["num_visits"] = num_visits
-
-    return render(
+    counters = read_counters()
+    num_dishes = counters["dishes"]
+    num_ingredients = counters["ingredients"]
+    num_dish_types = counters["dish_types"]
+    num_cooks = counters["cooks"]
+    visits.increment(request.user.pk)
+    num_visits = visits.value(request.user.pk)
+
+    return TemplateResponse(
         request=request,
-        template_name="kitchen/index.html",
+        template="kitchen/index.html",
         context={
             "num_dishes": num_dishes,
             "num_ingredients": num_ingredients,
@@ -48,37 +77,131 @@ def index(request: HttpRequest) -> HttpResponse:
 
 
 @login_required
-def dish_toggle_button(request: HttpRequest, pk: int) -> HttpResponse:
-    dish = Dish.objects.get(pk=pk)
-    user = request.user
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return HttpResponse(
+        registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@login_required
+def export_view(
+    request: HttpRequest, name: str, file_format: str
+) -> HttpResponse:
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return StreamingHttpResponse(
+        export(name, file_format),
+        content_type=CONTENT_TYPES[file_format],
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="{name}.{file_format}"',
+        },
+    )
 
-    if dish in user.dishes.all():
-        user.dishes.remove(dish)
+
+@login_required
+@primary
+def dish_toggle_button(request: HttpRequest, pk: int) -> HttpResponse:
+    # Toggle what the cook was shown rather than probing with a DELETE.
+    if request.user.pk in dishes.get_or_404(pk).cook_ids:
+        unassign_cook(request.user, pk)
     else:
-        user.dishes.add(dish)
+        assign_cook(request.user, pk)
 
     return HttpResponseRedirect(
         reverse(
             "kitchen:dish-detail",
-            kwargs={"pk": dish.pk}
+            kwargs={"pk": pk}
         )
     )
 
 
-class DishListView(LoginRequiredMixin, generic.ListView):
+def assignment_response(
+    request: HttpRequest, pk: int, assigned: bool, changed: bool
+) -> HttpResponse:
+    # Nothing changed can also mean there is no such dish; only that
+    # case pays for the extra lookup.
+    if not changed:
+        dishes.get_or_404(pk)
+
+    preferred = request.get_preferred_type(["text/html", "application/json"])
+    if preferred == "application/json":
+        return JsonResponse(
+            {"dish": pk, "assigned": assigned, "changed": changed}
+        )
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return HttpResponse(
+            render_to_string(
+                "includes/dish_cook_button.html",
+                {"dish_id": pk, "is_dish_cook": assigned},
+                request=request,
+            )
+        )
+    return HttpResponseRedirect(
+        reverse(
+            "kitchen:dish-detail",
+            kwargs={"pk": pk}
+        )
+    )
+
+
+@login_required
+@require_POST
+def dish_assign_view(request: HttpRequest, pk: int) -> HttpResponse:
+    changed = assign_cook(request.user, pk)
+    return assignment_response(request, pk, assigned=True, changed=changed)
+
+
+@login_required
+@require_POST
+def dish_unassign_view(request: HttpRequest, pk: int) -> HttpResponse:
+    changed = unassign_cook(request.user, pk)
+    return assignment_response(request, pk, assigned=False, changed=changed)
+
+
+class DishCookAssignView(
+    LoginRequiredMixin,
+    UserPassesTestMixin,
+    generic.FormView
+):
+    form_class = DishCookAssignForm
+    template_name = "kitchen/dish_cook_assign_form.html"
+    success_url = reverse_lazy("kitchen:dish-list")
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def form_valid(self, form):
+        bulk_assign(form.cleaned_data["cooks"], form.cleaned_data["dishes"])
+        return super().form_valid(form)
+
+
+class DishListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KitchenPaginationMixin,
+    generic.ListView
+):
     model = Dish
+    template_name = "kitchen/dish_list.html"
+    context_object_name = "dish_list"
     paginate_by = 15
+    cursor_ordering = ("name", "dish_id")
+    watermark_models = (Dish, DishType, Ingredient, get_user_model())
+
+    def get_filters(self):
+        return DishFilters.from_form(DishFilterForm(self.request.GET))
 
     def get_queryset(self):
-        queryset = Dish.objects.select_related("dish_type").prefetch_related(
-            "ingredients", "cooks"
-        )
-        name = self.request.GET.get("name")
-        if name:
-            name = name.strip()
-            queryset = queryset.filter(name__icontains=name)
+        self.filters = self.get_filters()
+        queryset = DishCard.objects.all()
+        if self.filters.name:
+            queryset = search(queryset, self.filters.name, model=Dish)
 
-        return queryset
+        return self.filters.apply(queryset, skip="name")
 
     def get_context_data(
         self, *, object_list=..., **kwargs
@@ -90,13 +213,84 @@ class DishListView(LoginRequiredMixin, generic.ListView):
                 "name": name.strip()
             }
         )
+        context["filter_form"] = DishFilterForm(self.request.GET)
+        context["filters"] = self.filters
+        context["facets"] = build_facets(self.filters, self.request.GET)
+        context["dish_cards"] = render_dish_cards(context["dish_list"])
 
         return context
 
 
-class DishDetailView(LoginRequiredMixin, generic.DetailView):
+class DishDetailView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    generic.DetailView
+):
     model = Dish
-    queryset = Dish.objects.prefetch_related("ingredients", "cooks")
+    context_object_name = "dish"
+    watermark_models = (Dish, DishType, Ingredient)
+
+    def get_object(self, queryset=None):
+        return dishes.get_or_404(self.kwargs["pk"])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["is_dish_cook"] = self.request.user.pk in self.object.cook_ids
+        return context
+
+
+class AutocompleteView(LoginRequiredMixin, generic.View):
+    """
+    Select2 results for ``?term=`` by prefix, ``paginate_by`` a page.
+    ``prefix_search`` reads them off an index in order, so a page costs
+    the same however many rows there are.
+    """
+
+    model = None
+    only = ()
+    paginate_by = 20
+    use_replica = True
+
+    def label(self, obj) -> str:
+        return str(obj)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        start = (page - 1) * self.paginate_by
+        queryset = prefix_search(
+            self.model._default_manager.only(*self.only),
+            request.GET.get("term", "").strip(),
+        )
+        # one extra row tells whether there is a next page
+        rows = list(queryset[start:start + self.paginate_by + 1])
+        return JsonResponse({
+            "results": [
+                {"id": obj.pk, "text": self.label(obj)}
+                for obj in rows[:self.paginate_by]
+            ],
+            "more": len(rows) > self.paginate_by,
+        })
+
+
+class DishAutocompleteView(AutocompleteView):
+    model = Dish
+    only = ("name",)
+
+
+class IngredientAutocompleteView(AutocompleteView):
+    model = Ingredient
+    only = ("name",)
+
+
+class CookAutocompleteView(AutocompleteView):
+    model = get_user_model()
+    only = ("username", "first_name", "last_name")
+
+    def label(self, obj) -> str:
+        return cook_label(obj)
 
 
 class DishCreateView(
@@ -142,18 +336,24 @@ class DishDeleteView(
         return self.request.user.is_staff
 
 
-class IngredientListView(LoginRequiredMixin, generic.ListView):
+class IngredientListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KitchenPaginationMixin,
+    generic.ListView
+):
     model = Ingredient
     paginate_by = 15
+    cursor_ordering = ("name", "id")
+    watermark_models = (Ingredient, Dish)
+    sort_orderings = {"popular": ("-dish_count", "id")}
 
     def get_queryset(self):
-        queryset = Ingredient.objects.annotate(
-            num_dishes=Count("dishes")
-        )
+        queryset = Ingredient.objects.all()
         name = self.request.GET.get("name")
         if name:
             name = name.strip()
-            queryset = queryset.filter(name__icontains=name)
+            queryset = search(queryset, name)
 
         return queryset
 
@@ -212,20 +412,26 @@ class IngredientDeleteView(
     success_url = reverse_lazy("kitchen:ingredient-list")
 
 
-class DishTypeListView(LoginRequiredMixin, generic.ListView):
+class DishTypeListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KitchenPaginationMixin,
+    generic.ListView
+):
     model = DishType
     context_object_name = "dish_type_list"
     template_name = "kitchen/dish_type_list.html"
     paginate_by = 21
+    cursor_ordering = ("name", "id")
+    watermark_models = (DishType, Dish)
+    sort_orderings = {"popular": ("-dish_count", "id")}
 
     def get_queryset(self):
-        queryset = DishType.objects.annotate(
-            num_dishes=Count("dishes")
-        )
+        queryset = DishType.objects.all()
         name = self.request.GET.get("name")
         if name:
             name = name.strip()
-            queryset = queryset.filter(name__icontains=name)
+            queryset = search(queryset, name)
 
         return queryset
 
@@ -285,29 +491,37 @@ class DishTypeDeleteView(
         return self.request.user.is_staff
 
 
-class DishTypeDetailView(LoginRequiredMixin, generic.DetailView):
+class DishTypeDetailView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    generic.DetailView
+):
     model = DishType
+    watermark_models = (DishType, Dish)
     context_object_name = "dish_type"
     template_name = "kitchen/dish_type detail.html"
+    queryset = DishType.objects.prefetch_related("dishes")
 
 
-class CookListView(LoginRequiredMixin, generic.ListView):
+class CookListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KitchenPaginationMixin,
+    generic.ListView
+):
     model = get_user_model()
     paginate_by = 5
+    cursor_ordering = ("username", "id")
+    watermark_models = (Dish,)
+    sort_orderings = {"popular": ("-dish_count", "id")}
 
     def get_queryset(self):
-        queryset = get_user_model().objects.annotate(
-            num_dishes=Count("dishes")
-        )
+        queryset = get_user_model().objects.all()
 
         username = self.request.GET.get("username")
         if username:
             username = username.strip()
-            queryset = queryset.filter(
-                Q(username__icontains=username)
-                | Q(first_name__icontains=username)
-                | Q(last_name__icontains=username)
-            )
+            queryset = search(queryset, username)
 
         return queryset
 
@@ -324,8 +538,13 @@ class CookListView(LoginRequiredMixin, generic.ListView):
         return context
 
 
-class CookDetailView(LoginRequiredMixin, generic.DetailView):
+class CookDetailView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    generic.DetailView
+):
     model = get_user_model()
+    watermark_models = (Dish, DishType)
     queryset = get_user_model().objects.prefetch_related("dishes__dish_type")
 
 
@@ -351,10 +570,9 @@ class CookUpdateView(
     form_class = CookUpdateForm
 
     def test_func(self):
-        self.object = self.get_object()
         return (
             self.request.user.is_staff
-            or self.request.user.pk == self.object.pk
+            or self.request.user.pk == self.kwargs["pk"]
         )
 
     def get_success_url(self):
@@ -374,10 +592,9 @@ class CookPasswordResetView(
     template_name = "kitchen/cook_password_reset_form.html"
 
     def test_func(self):
-        self.object = self.get_object()
         return (
             self.request.user.is_staff
-            or self.request.user.pk == self.object.pk
+            or self.request.user.pk == self.kwargs["pk"]
         )
 
     def get_success_url(self):
@@ -396,10 +613,9 @@ class CookDeleteView(
     success_url = reverse_lazy("kitchen:cook-list")
 
     def test_func(self):
-        self.object = self.get_object()
         return (
             self.request.user.is_staff
-            or self.request.user.pk == self.object.pk
+            or self.request.user.pk == self.kwargs["pk"]
         )
 
 
@@ -410,7 +626,7 @@ class SuggestionCreateView(LoginRequiredMixin, generic.CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["dish"] = Dish.objects.get(pk=self.kwargs["dish_id"])
+        context["dish"] = dishes.get_or_404(self.kwargs["dish_id"])
 
         return context
 
@@ -426,9 +642,16 @@ class SuggestionCreateView(LoginRequiredMixin, generic.CreateView):
         )
 
 
-class SuggestionListView(LoginRequiredMixin, generic.ListView):
+class SuggestionListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KitchenPaginationMixin,
+    generic.ListView
+):
     model = Suggestion
     paginate_by = 9
+    cursor_ordering = ("approved", "-created_at", "id")
+    watermark_models = (Suggestion, Dish)
 
     def get_queryset(self):
         queryset = Suggestion.objects.select_related(
@@ -442,9 +665,7 @@ class SuggestionListView(LoginRequiredMixin, generic.ListView):
         dish_name = self.request.GET.get("dish_name")
         if dish_name:
             dish_name = dish_name.strip()
-            queryset = queryset.filter(
-                dish__name__icontains=dish_name
-            )
+            queryset = search_related(queryset, "dish", dish_name)
 
         return queryset
 
@@ -461,18 +682,84 @@ class SuggestionListView(LoginRequiredMixin, generic.ListView):
         return context
 
 
-class SuggestionDetailView(LoginRequiredMixin, generic.DetailView):
+class SuggestionDetailView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    generic.DetailView
+):
     model = Suggestion
+    watermark_models = (Suggestion, Dish)
+    queryset = Suggestion.objects.select_related("dish", "cook")
 
 
-def suggestion_approve_view(request: HttpRequest, pk: int) -> HttpResponse:
-    suggestion = Suggestion.objects.get(pk=pk)
-    suggestion.approved = True
-    suggestion.save()
+class SuggestionModerationView(UserPassesTestMixin, SuggestionListView):
+    """Pending suggestions, decided in bulk by staff."""
+
+    paginate_by = 100
+    template_name = "kitchen/suggestion_moderation.html"
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(
+            approved=False, rejected=False
+        )
+        cook = self.request.GET.get("cook")
+        if cook:
+            queryset = search_related(queryset, "cook", cook.strip())
+        return queryset
+
+    def get_context_data(
+        self, *, object_list=..., **kwargs
+    ):
+        context = super().get_context_data(**kwargs)
+        context["search_form"] = SuggestionModerationSearchForm(
+            initial={
+                "dish_name": self.request.GET.get("dish_name", "").strip(),
+                "cook": self.request.GET.get("cook", "").strip(),
+            }
+        )
+        return context
+
+    def post(self, request, *args, **kwargs):
+        form = SuggestionModerationForm(request.POST)
+        if form.is_valid():
+            moderate(
+                form.cleaned_data["suggestions"],
+                approve=form.cleaned_data["action"] == "approve",
+            )
+        return HttpResponseRedirect(request.get_full_path())
+
+
+def decide_suggestion(
+    request: HttpRequest, pk: int, approve: bool
+) -> HttpResponse:
+    if not request.user.is_staff:
+        raise PermissionDenied
+    # Nothing updated can also mean there is no such suggestion; only
+    # that case pays for the extra lookup.
+    if (
+        not moderate([pk], approve)
+        and not Suggestion.objects.filter(pk=pk).exists()
+    ):
+        raise Http404("No suggestion found matching the query")
 
     return HttpResponseRedirect(
         reverse(
             "kitchen:suggestion-detail",
-            kwargs={"pk": suggestion.pk}
+            kwargs={"pk": pk}
         )
     )
+
+
+@login_required
+@require_POST
+def suggestion_approve_view(request: HttpRequest, pk: int) -> HttpResponse:
+    return decide_suggestion(request, pk, approve=True)
+
+
+@login_required
+@require_POST
+def suggestion_reject_view(request: HttpRequest, pk: int) -> HttpResponse:
+    return decide_suggestion(request, pk, approve=False)
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "restaurant_kitchen_service.settings")
 
 application = get_asgi_application()
+
+# Open the database pools now, when the worker starts, rather than in
+# its first requests.
+from kitchen.pooling import warm_connections  # noqa: E402
+
+warm_connections()
@@ -35,12 +35,16 @@ INSTALLED_APPS = [
     "kitchen",
     "crispy_forms",
     "crispy_bootstrap4",
+    "django_select2",
 ]
 
 MIDDLEWARE = [
+    "kitchen.middleware.PerformanceMiddleware",
+    "kitchen.middleware.NPlusOneMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "kitchen.middleware.ReplicaRoutingMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -121,3 +125,75 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap4"
 CRISPY_TEMPLATE_PACK = "bootstrap4"
 
 LOGIN_REDIRECT_URL = "/"
+
+# List view pagination: "offset" (exact page numbers), "approximate"
+# (bounded COUNT) or "cursor" (keyset pagination, no COUNT at all)
+KITCHEN_PAGINATION_MODE = os.environ.get("KITCHEN_PAGINATION_MODE", "offset")
+
+KITCHEN_PAGINATION_COUNT_LIMIT = 1000
+
+# Emit a Server-Timing header (db/tpl/view/total) on every response
+KITCHEN_SERVER_TIMING = True
+
+# Repeated-query detection: None (off), "log" or "raise"
+KITCHEN_NPLUSONE_MODE = None
+
+KITCHEN_NPLUSONE_THRESHOLD = 2
+
+# Lifetime of cached dish card fragments; they are also invalidated by
+# version bumps whenever a dish or anything shown on its card changes
+KITCHEN_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Mixed into conditional GET validators so a deploy invalidates pages
+# that browsers cached under the previous templates
+KITCHEN_RELEASE = os.environ.get("RENDER_GIT_COMMIT", "")
+
+# Route index and the list/detail views to kitchen.async_views; only
+# worthwhile when serving through asgi.py (see README)
+KITCHEN_ASYNC_VIEWS = os.environ.get("KITCHEN_ASYNC_VIEWS", "") == "1"
+
+# Let an async view run its independent queries on separate connections
+# at the same time instead of one after another on the request's thread;
+# set to 0 to keep to one connection per request
+KITCHEN_ASYNC_PARALLEL_QUERIES = (
+    os.environ.get("KITCHEN_ASYNC_PARALLEL_QUERIES", "1") == "1"
+)
+
+DATABASE_ROUTERS = ["kitchen.routing.ReplicaRouter"]
+
+# Database aliases of read replicas; GETs of the list and detail views
+# are spread over them (see kitchen.routing)
+KITCHEN_READ_REPLICAS = []
+
+# After a write, the session reads from the primary for this long so it
+# sees its own changes while the replicas catch up
+KITCHEN_REPLICA_STICKY_SECONDS = 10
+
+# Sessions live in a signed cookie: reading or updating one never
+# touches the database. Keep what is stored in them small
+SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+
+# Dish and cook snapshots (kitchen.repository): how many each worker
+# keeps in memory, and how long the shared cache keeps them
+KITCHEN_SNAPSHOT_LRU_SIZE = 1024
+
+KITCHEN_SNAPSHOT_CACHE_TIMEOUT = 60 * 60
+
+# Dish list facets (kitchen.facets): options shown per facet, and how
+# long counted facets stay cached (writes invalidate them sooner)
+KITCHEN_FACET_OPTIONS = 10
+
+KITCHEN_FACET_CACHE_TIMEOUT = 5 * 60
+
+# Home page visits are buffered per worker and written once this many
+# are pending or this many seconds passed (see kitchen.buffered)
+KITCHEN_VISITS_FLUSH_SIZE = 100
+
+KITCHEN_VISITS_FLUSH_SECONDS = 30
+
+# Select2 and the jQuery it needs, both vendored by django.contrib.admin;
+# the site itself doesn't load jQuery
+SELECT2_JS = [
+    "admin/js/vendor/jquery/jquery.min.js",
+    "admin/js/vendor/select2/select2.full.min.js",
+]
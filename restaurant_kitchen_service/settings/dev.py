@@ -1,3 +1,5 @@
+import sys
+
 from .base import *
 DEBUG = True
 
@@ -13,3 +15,13 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+
+TESTING = sys.argv[1:2] == ["test"]
+
+# Fail the test suite on N+1 queries, log them while developing
+KITCHEN_NPLUSONE_MODE = "raise" if TESTING else "log"
+
+# Tests roll back the database after each test; nothing may stay
+# buffered in memory across them
+if TESTING:
+    KITCHEN_VISITS_FLUSH_SIZE = 1
@@ -1,5 +1,8 @@
+import copy
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *
 DEBUG = False
 
@@ -22,3 +25,66 @@ DATABASES = {
         "PORT": int(os.environ["POSTGRES_DB_PORT"]),
     }
 }
+
+# "pool": each worker process keeps a bounded psycopg pool of connections
+# that are health-checked before use. "pgbouncer": POSTGRES_HOST is a
+# pgbouncer in transaction mode that does the pooling; Django keeps one
+# persistent, health-checked connection per thread to it.
+POSTGRES_POOL_MODE = os.environ.get("POSTGRES_POOL_MODE", "pool")
+
+if POSTGRES_POOL_MODE == "pool":
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 8)),
+            # seconds a request waits for a free connection before failing
+            "timeout": float(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+            # idle connections above min_size are closed after this long
+            "max_idle": float(os.environ.get("POSTGRES_POOL_MAX_IDLE", 300)),
+        },
+    }
+elif POSTGRES_POOL_MODE == "pgbouncer":
+    DATABASES["default"].update({
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        # Transaction pooling hands each transaction to any server
+        # connection, so neither named cursors nor prepared statements
+        # survive between them.
+        "DISABLE_SERVER_SIDE_CURSORS": True,
+        "OPTIONS": {"prepare_threshold": None},
+    })
+else:
+    raise ImproperlyConfigured(
+        f"POSTGRES_POOL_MODE must be pool or pgbouncer, "
+        f"not {POSTGRES_POOL_MODE!r}."
+    )
+
+# Comma separated hosts of streaming replicas of the database above
+for index, host in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(","))
+):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    KITCHEN_READ_REPLICAS.append(alias)
+
+# Versioned fragments and watermarks are invalidated by signals in the
+# worker that handled the write, so every worker must share one cache.
+# It is read on every page, which a database table would turn into
+# extra queries.
+REDIS_URL = os.environ.get("REDIS_URL")
+if not REDIS_URL:
+    raise ImproperlyConfigured(
+        "REDIS_URL must point at the Redis instance the workers share."
+    )
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+}